@@ -0,0 +1,136 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : compression_benchmark.py
+
+Compare the compression options for the report archive
+
+    python benchmarks/compression_benchmark.py -file report.spdx.json
+    python benchmarks/compression_benchmark.py -size 256
+'''
+import sys, os, argparse, io, json, random, time, zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+import report_compression
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-file", "--file", help="Existing SPDX document to compress")
+parser.add_argument("-size", "--size", type=int, default=64, help="Size in MB of the generated document if no file is given")
+parser.add_argument("-levels", "--levels", default="1,6,9", help="Comma separated compression levels")
+parser.add_argument("-threads", "--threads", default="1,%s" %os.cpu_count(), help="Comma separated thread counts for deflate and gzip")
+
+#----------------------------------------------------------------------#
+def main():
+
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(",")]
+    threadCounts = sorted(set(int(threads) for threads in args.threads.split(",")))
+
+    if args.file:
+        file_ptr = open(args.file, "rb")
+        documentData = file_ptr.read()
+        file_ptr.close()
+    else:
+        documentData = create_document(args.size * 1024 * 1024)
+
+    print("Document size: %.1f MB" %(len(documentData) / 1024 / 1024))
+    print("%-8s %-6s %-8s %10s %10s %8s" %("format", "level", "threads", "seconds", "MB/s", "ratio"))
+
+    for level in levels:
+        for threads in threadCounts:
+            report_result("zip", level, threads, documentData, compress_zip)
+            report_result("gzip", level, threads, documentData, compress_gzip)
+        report_result("xz", level, 1, documentData, compress_xz)
+
+#----------------------------------------------------------------------#
+def report_result(standaloneFormat, level, threads, documentData, compressFunction):
+
+    startTime = time.time()
+    compressedSize = compressFunction(documentData, level, threads)
+    elapsedTime = time.time() - startTime
+
+    throughput = len(documentData) / 1024 / 1024 / elapsedTime
+    ratio = compressedSize / len(documentData)
+
+    print("%-8s %-6s %-8s %10.2f %10.1f %8.3f" %(standaloneFormat, level, threads, elapsedTime, throughput, ratio))
+
+#----------------------------------------------------------------------#
+def compress_zip(documentData, level, threads):
+
+    output_ptr = ByteCounter()
+    zipFile = zipfile.ZipFile(output_ptr, "w", zipfile.ZIP_DEFLATED)
+    zipInfo = zipfile.ZipInfo("report.spdx.json")
+    zipInfo.compress_type = zipfile.ZIP_DEFLATED
+    zipInfo._compresslevel = level
+    entry_ptr = report_compression.use_parallel_compression(zipFile.open(zipInfo, "w", force_zip64=True), level, threads)
+    write_in_chunks(entry_ptr, documentData)
+    zipFile.close()
+
+    return output_ptr.bytesWritten
+
+#----------------------------------------------------------------------#
+def compress_gzip(documentData, level, threads):
+
+    output_ptr = ByteCounter()
+    write_in_chunks(report_compression.open_standalone_file(output_ptr, "gzip", level, threads), documentData)
+
+    return output_ptr.bytesWritten
+
+#----------------------------------------------------------------------#
+def compress_xz(documentData, level, threads):
+
+    output_ptr = ByteCounter()
+    write_in_chunks(report_compression.open_standalone_file(output_ptr, "xz", level, threads), documentData)
+
+    return output_ptr.bytesWritten
+
+#----------------------------------------------------------------------#
+def write_in_chunks(file_ptr, documentData):
+
+    chunkSize = 1024 * 1024
+    for position in range(0, len(documentData), chunkSize):
+        file_ptr.write(documentData[position:position + chunkSize])
+    file_ptr.close()
+
+#----------------------------------------------------------------------#
+class ByteCounter(io.RawIOBase):
+    # Only the compressed size is needed so nothing is kept in memory
+
+    def __init__(self):
+        self.bytesWritten = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.bytesWritten += len(data)
+        return len(data)
+
+#----------------------------------------------------------------------#
+def create_document(documentSize):
+
+    # File entries dominate large SPDX documents so generate something with a similar shape
+    random.seed(0)
+    files = []
+    approximateSize = 0
+
+    while approximateSize < documentSize:
+        fileDetails = {}
+        fileDetails["fileName"] = "src/module%s/component%s/file%x.c" %(random.randint(1, 500), random.randint(1, 50), random.getrandbits(32))
+        fileDetails["SPDXID"] = "SPDXRef-file-%s" %len(files)
+        fileDetails["checksums"] = [{"algorithm" : "SHA1", "checksumValue" : "%040x" %random.getrandbits(160)}, {"algorithm" : "MD5", "checksumValue" : "%032x" %random.getrandbits(128)}]
+        fileDetails["licenseConcluded"] = "NOASSERTION"
+        fileDetails["licenseInfoInFiles"] = [random.choice(["MIT", "Apache-2.0", "BSD-3-Clause", "GPL-2.0-only", "NOASSERTION"])]
+        fileDetails["copyrightText"] = "NOASSERTION"
+        files.append(fileDetails)
+        approximateSize += 650
+
+    return json.dumps({"files" : files}, indent=4).encode("utf-8")
+
+#----------------------------------------------------------------------#
+if __name__ == "__main__":
+    main()
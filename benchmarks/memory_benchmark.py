@@ -0,0 +1,123 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : memory_benchmark.py
+
+Measure the memory held for the file level data of a large project with and
+without interning the repeated SPDX values
+
+    python benchmarks/memory_benchmark.py
+    python benchmarks/memory_benchmark.py -files 100000
+'''
+import sys, os, argparse, gc, json, logging, pickle, random, time, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+import report_intern
+import report_data_files
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-files", "--files", type=int, default=1000000, help="Number of files in the generated project")
+
+LICENSES = ["MIT", "Apache-2.0", "BSD-3-Clause", "GPL-2.0-only", "Public Domain", "Acme Commercial License (v2)", "Generic Notice"]
+COPYRIGHTS = ["Copyright (c) %s Example Corp" %year for year in range(1995, 2025)]
+
+#----------------------------------------------------------------------#
+def main():
+
+    args = parser.parse_args()
+    random.seed(0)
+    logging.disable(logging.CRITICAL)  # No need for the per file messages
+
+    print("Files: %s" %args.files)
+    print("%-32s %-10s %12s %10s" %("data", "interning", "MB held", "seconds"))
+
+    # File evidence normalized in worker processes arrives as pickled copies
+    evidenceRecords = create_evidence_records(args.files)
+    report_result("file evidence (processes)", False, lambda: merge_file_evidence(evidenceRecords, False))
+    report_result("file evidence (processes)", True, lambda: merge_file_evidence(evidenceRecords, True))
+    del evidenceRecords
+
+    # Processed project data reloaded from the report cache
+    projectDataJSON = create_project_data_json(args.files)
+    report_result("cached project data", False, lambda: json.loads(projectDataJSON))
+    report_result("cached project data", True, lambda: json.loads(projectDataJSON, object_hook=report_intern.intern_json_object))
+
+#----------------------------------------------------------------------#
+def report_result(dataDescription, interning, build_function):
+
+    report_intern.sharedLists.clear()
+    gc.collect()
+
+    tracemalloc.start()
+    startTime = time.time()
+    builtData = build_function()
+    elapsedTime = time.time() - startTime
+    heldMemory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print("%-32s %-10s %12.1f %10.2f" %(dataDescription, "yes" if interning else "no", heldMemory / 1024 / 1024, elapsedTime))
+
+    del builtData
+
+#----------------------------------------------------------------------#
+def merge_file_evidence(evidenceRecords, interning):
+
+    fileDetails = {}
+
+    for fileEvidenceDetails in evidenceRecords:
+        uniqueFileID, copyrightText, licenseInfoInFiles, extractedLicensingInfos = pickle.loads(pickle.dumps(report_data_files.transform_file_evidence(fileEvidenceDetails, True)))
+
+        if interning:
+            copyrightText = report_intern.intern_string(copyrightText)
+            licenseInfoInFiles = report_intern.share_list(licenseInfoInFiles)
+
+        fileDetails[uniqueFileID] = {"copyrightText" : copyrightText, "licenseConcluded" : "NOASSERTION", "licenseInfoInFiles" : licenseInfoInFiles}
+
+    return fileDetails
+
+#----------------------------------------------------------------------#
+def create_evidence_records(fileCount):
+
+    evidenceRecords = []
+
+    for fileIndex in range(fileCount):
+        fileEvidenceDetails = {}
+        fileEvidenceDetails["scannedFileId"] = fileIndex
+        fileEvidenceDetails["remote"] = False
+        fileEvidenceDetails["copyRightMatches"] = random.sample(COPYRIGHTS, random.randint(0, 2))
+        fileEvidenceDetails["licenseMatches"] = random.sample(LICENSES, random.randint(0, 2))
+        evidenceRecords.append(fileEvidenceDetails)
+
+    return evidenceRecords
+
+#----------------------------------------------------------------------#
+def create_project_data_json(fileCount):
+
+    # The shape of the files and relationships held for each project
+    files = []
+    relationships = []
+
+    for fileIndex in range(fileCount):
+        fileSPDXID = "SPDXRef-File-%s-s" %fileIndex
+        packageSPDXID = "SPDXRef-Pkg-component-%s-1.0-%s" %(fileIndex % 2000, fileIndex % 2000)
+
+        fileDetails = {}
+        fileDetails["SPDXID"] = fileSPDXID
+        fileDetails["fileName"] = "src/module%s/file%s.c" %(fileIndex % 500, fileIndex)
+        fileDetails["checksums"] = [{"algorithm" : "MD5", "checksumValue" : "%032x" %random.getrandbits(128)}, {"algorithm" : "SHA1", "checksumValue" : "%040x" %random.getrandbits(160)}]
+        fileDetails["licenseConcluded"] = "NOASSERTION"
+        fileDetails["copyrightText"] = random.choice(COPYRIGHTS + ["NONE"])
+        fileDetails["licenseInfoInFiles"] = sorted(random.sample(LICENSES[:4], random.randint(1, 2)))
+        files.append(fileDetails)
+
+        relationships.append({"spdxElementId" : packageSPDXID, "relationshipType" : "CONTAINS", "relatedSpdxElement" : fileSPDXID})
+
+    return json.dumps({"files" : files, "fileRelationships" : relationships})
+
+#----------------------------------------------------------------------#
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : relationship_benchmark.py
+
+Compare the memory held, serialization time and JSON document size for the
+package files of a large project written as CONTAINS relationships and as
+hasFiles lists on each package
+
+    python benchmarks/relationship_benchmark.py
+    python benchmarks/relationship_benchmark.py -files 100000 -packages 500
+'''
+import sys, os, argparse, gc, time, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+import report_artifacts_json
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-files", "--files", type=int, default=1000000, help="Number of files in the generated project")
+parser.add_argument("-packages", "--packages", type=int, default=2000, help="Number of packages the files are spread over")
+
+#----------------------------------------------------------------------#
+def main():
+
+    args = parser.parse_args()
+
+    print("Files: %s  Packages: %s" %(args.files, args.packages))
+    print("%-24s %12s %12s %14s" %("package files as", "MB held", "seconds", "document MB"))
+
+    for useHasFiles in [False, True]:
+        gc.collect()
+
+        tracemalloc.start()
+        reportDetails = create_report_details(args.files, args.packages, useHasFiles)
+        heldMemory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        startTime = time.time()
+        report_ptr = CountingWriter()
+        report_artifacts_json.write_json_report(reportDetails, report_ptr)
+        elapsedTime = time.time() - startTime
+
+        print("%-24s %12.1f %12.2f %14.1f" %("hasFiles" if useHasFiles else "CONTAINS relationships", heldMemory / 1024 / 1024, elapsedTime, report_ptr.size / 1024 / 1024))
+
+        del reportDetails
+
+#----------------------------------------------------------------------#
+def create_report_details(fileCount, packageCount, useHasFiles):
+
+    # Only the parts of the document that differ between the two encodings
+    packages = []
+    relationships = []
+
+    for packageIndex in range(packageCount):
+        packageDetails = {}
+        packageDetails["SPDXID"] = "SPDXRef-Pkg-component-%s-1.0-%s" %(packageIndex, packageIndex)
+        packageDetails["name"] = "component-%s" %packageIndex
+        packageDetails["filesAnalyzed"] = True
+        if useHasFiles:
+            packageDetails["hasFiles"] = []
+        packages.append(packageDetails)
+
+        relationships.append({"spdxElementId" : packageDetails["SPDXID"], "relationshipType" : "PACKAGE_OF", "relatedSpdxElement" : "SPDXRef-Pkg-Application-1"})
+
+    for fileIndex in range(fileCount):
+        packageDetails = packages[fileIndex % packageCount]
+        fileSPDXID = "SPDXRef-File-%s-s" %fileIndex
+
+        if useHasFiles:
+            packageDetails["hasFiles"].append(fileSPDXID)
+        else:
+            relationships.append({"spdxElementId" : packageDetails["SPDXID"], "relationshipType" : "CONTAINS", "relatedSpdxElement" : fileSPDXID})
+
+    return {"packages" : packages, "relationships" : relationships}
+
+#----------------------------------------------------------------------#
+class CountingWriter(object):
+    # Measure the document without holding it in memory
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text.encode("utf-8"))
+
+#----------------------------------------------------------------------#
+if __name__ == "__main__":
+    main()
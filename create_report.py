@@ -7,15 +7,24 @@ Author : sgeary
 Created On : Wed Oct 21 2020
 File : create_report.py
 '''
-import sys, os, logging, argparse, json, re
+import sys, os, logging, argparse, json, re, glob, shutil, tempfile, time
 from datetime import datetime
 
 import _version
 import report_data
 import report_artifacts
+import report_artifacts_archive
+import report_compression
+import report_concurrency
+import report_http_cache
 import report_errors
-import common.api.project.upload_reports
+import report_replay
+import report_cache
+import report_upload
+import report_store
+import report_startup
 import common.api.system.release
+import common.project_heirarchy
 import common.report_archive
 
 
@@ -29,7 +38,9 @@ else:
 
 propertiesFile = "../server_properties.json"  # Created by installer or manually
 propertiesFile = logfileName = os.path.dirname(os.path.realpath(__file__)) + "/" +  propertiesFile
-logfileName = os.path.dirname(os.path.realpath(__file__)) + "/_spdx_report.log"
+# Each run has its own log so reports running at the same time do not overwrite each other
+logfileName = os.path.dirname(os.path.realpath(__file__)) + "/_spdx_report-" + datetime.now().strftime("%Y%m%d-%H%M%S") + "-" + str(os.getpid()) + ".log"
+MAXLOGFILES = 25  # Number of per run log files kept
 
 ###################################################################################
 #  Set up logging handler to allow for different levels of logging to be capture
@@ -45,17 +56,226 @@ parser.add_argument("-rid", "--reportID", help="Report ID")
 parser.add_argument("-authToken", "--authToken", help="Code Insight Authorization Token")
 parser.add_argument("-baseURL", "--baseURL", help="Code Insight Core Server Protocol/Domain Name/Port.  i.e. http://localhost:8888 or https://sca.codeinsight.com:8443")
 parser.add_argument("-reportOpts", "--reportOptions", help="Options for report content")
+parser.add_argument("-record", "--recordBundle", help="Capture all API responses to this compressed bundle file")
+parser.add_argument("-replay", "--replayBundle", help="Generate the report from a previously recorded bundle file without a server")
+
+reportName = "SPDX Report"
+reportVersion = _version.__version__
 
 #----------------------------------------------------------------------#
 def main():
 
-	reportName = "SPDX Report"
-	reportVersion = _version.__version__
-
 	logger.info("Creating %s - %s" %(reportName, reportVersion))
 	print("Creating %s - %s" %(reportName, reportVersion))
 	print("    Logfile: %s" %(logfileName))
 
+	remove_old_log_files()
+
+	serverProperties = load_server_properties()
+
+	# See what if any arguments were provided
+	args = parser.parse_args()
+	projectID = args.projectID
+	reportID = args.reportID
+	authToken = args.authToken
+	reportOptions = args.reportOptions
+	recordBundle = args.recordBundle
+	replayBundle = args.replayBundle
+	outputDirectory = os.getcwd()
+
+	# The bundles are given relative to where the script was started
+	if recordBundle:
+		recordBundle = os.path.abspath(recordBundle)
+	if replayBundle:
+		replayBundle = os.path.abspath(replayBundle)
+
+	# All artifacts are written to a work directory for this run only
+	workDirectory = create_work_directory(serverProperties.get("report.work.directory"))
+	os.chdir(workDirectory)
+
+	try:
+		run_report(serverProperties, projectID, reportID, authToken, reportOptions, recordBundle, replayBundle, outputDirectory)
+	finally:
+		# Keep what was recorded before a failure so the next attempt can resume from it
+		report_replay.stop_recording()
+		report_http_cache.log_cache_statistics()
+		os.chdir(outputDirectory)
+		remove_work_directory(workDirectory)
+
+	logger.info("Completed creating %s" %reportName)
+	print("Completed creating %s" %reportName)
+
+#----------------------------------------------------------------------#
+def run_report(serverProperties, projectID, reportID, authToken, reportOptions, recordBundle, replayBundle, outputDirectory):
+
+	baseURL = serverProperties["core.server.url"]
+
+	# Requests to the Code Insight server adapt to its response times up to this ceiling
+	apiConcurrency = report_concurrency.install_adaptive_concurrency(serverProperties.get("report.api.concurrency", report_concurrency.DEFAULTMAXCONCURRENCY))
+
+	# Responses that have not changed since a previous run are served from a local cache
+	if serverProperties.get("report.http.cache"):
+		report_http_cache.install_http_cache(os.path.join(report_cache.cacheDirectory, "http"), serverProperties.get("report.http.cache.size", report_http_cache.DEFAULTCACHESIZE), serverProperties.get("report.http.cache.ttl", report_http_cache.DEFAULTCACHETTL))
+
+	if replayBundle:
+		# All of the API responses and the original arguments come from the bundle
+		print("    Replaying API responses from: %s" %replayBundle)
+		bundleArguments = report_replay.start_replay(replayBundle, baseURL, authToken)
+		if projectID is None:
+			projectID = bundleArguments["projectID"]
+		reportOptions = bundleArguments["reportOptions"]
+	else:
+		# Based on how the shell pass the arguemnts clean up the options if on a linux system:w
+		if sys.platform.startswith('linux'):
+			reportOptions = reportOptions.replace('""', '"')[1:-1]
+
+	if recordBundle:
+		print("    Recording API responses to: %s" %recordBundle)
+		report_replay.start_recording(recordBundle, baseURL, authToken, {"projectID" : projectID, "reportOptions" : reportOptions})
+	
+	reportOptions = json.loads(reportOptions)
+	reportOptions = verifyOptions(reportOptions) 
+
+	logger.debug("Custom Report Provided Arguments:")	
+	logger.debug("    projectID:  %s" %projectID)	
+	logger.debug("    reportID:   %s" %reportID)	
+	logger.debug("    baseURL:  %s" %baseURL)	
+	logger.debug("    reportOptions:  %s" %reportOptions)
+
+	requestKey = None
+	reportLock = None
+	uploadZipfile = None
+
+	if "errorMsg" not in reportOptions.keys() and not recordBundle and not replayBundle:
+		# Identical requests running at the same time wait for the first one and reuse its report.
+		# This is checked before anything is requested so a run that waits requests nothing
+		requestKey = report_cache.create_request_key(projectID, reportOptions, reportVersion)
+		reportLock, waitStartTime = report_cache.acquire_report_lock(requestKey)
+		uploadZipfile = report_cache.get_coalesced_report(requestKey, waitStartTime)
+
+	if uploadZipfile:
+		print("    Reusing report generated by a concurrent request")
+	else:
+		uploadZipfile = generate_report_archive(serverProperties, baseURL, projectID, authToken, reportOptions, requestKey, apiConcurrency)
+
+	# Each run has its own work directory so waiting runs can carry on once the archive is cached
+	report_cache.release_report_lock(reportLock)
+	report_replay.stop_recording()
+
+	if replayBundle:
+		# There is no server to upload to so keep the archive where the script was started
+		uploadZipfile = shutil.move(uploadZipfile, os.path.join(outputDirectory, os.path.basename(uploadZipfile)))
+		logger.info("Replay mode - report archive retained: %s" %uploadZipfile)
+		print("    Replay mode - report archive retained: %s" %uploadZipfile)
+		return
+
+	report_upload.upload_project_report_data(baseURL, projectID, reportID, authToken, uploadZipfile)
+	print("    Report uploaded to Code Insight")
+
+	#########################################################
+	# Remove the file since it has been uploaded to Code Insight
+	try:
+		os.remove(uploadZipfile)
+	except OSError:
+		logger.error("Error removing %s" %uploadZipfile)
+		print("Error removing %s" %uploadZipfile)
+
+
+#----------------------------------------------------------------------#
+def generate_report_archive(serverProperties, baseURL, projectID, authToken, reportOptions, requestKey, apiConcurrency):
+
+	compressionLevel = serverProperties.get("report.compression.level", report_artifacts_archive.DEFAULTCOMPRESSIONLEVEL)
+	compressionThreads = serverProperties.get("report.compression.threads", 1)
+	standaloneFormat = serverProperties.get("report.standalone.compression")
+
+	if standaloneFormat and standaloneFormat not in report_compression.STANDALONEFORMATS:
+		logger.warning("Unsupported standalone compression format %s - using zip only" %standaloneFormat)
+		standaloneFormat = None
+
+	# The requests that do not depend on each other are made at the same time
+	startupDetails = report_startup.collect_startup_details(baseURL, projectID, authToken, reportOptions)
+	releaseDetails = startupDetails.pop("releaseDetails")
+	releaseVersion = releaseDetails["fnci.release.name"].replace(" ", "")
+
+	logger.debug("Code Insight Release: %s" %releaseVersion)
+
+	reportData = create_report_data(projectID, reportOptions, releaseVersion)
+	reportData["apiConcurrency"] = apiConcurrency
+	reportData.update(startupDetails)
+	fileNameTimeStamp = reportData["fileNameTimeStamp"]
+
+	freshnessKey = None
+	uploadZipfile = None
+
+	# Collect the data for the report
+	
+	if "errorMsg" in reportOptions.keys():
+
+		reportFileNameBase = reportName.replace(" ", "_") + "-Creation_Error-" + fileNameTimeStamp
+
+		reportData["errorMsg"] = reportOptions["errorMsg"]
+		reportData["reportName"] = reportName
+		reportData["reportFileNameBase"] = reportFileNameBase
+
+		reports = report_errors.create_error_report(reportData)
+		print("    *** ERROR  ***  Error found validating report options")
+	else:
+		reportData = determine_project_heirarchy(baseURL, projectID, authToken, reportData)
+		reportFileNameBase = reportData["reportFileNameBase"]
+
+		if requestKey:
+			# Has anything changed since the last time this report was generated?
+			reportData["requestKey"] = requestKey
+			freshnessKey = report_cache.create_freshness_key(baseURL, authToken, reportData)
+			uploadZipfile = report_cache.get_cached_report(requestKey, freshnessKey)
+
+			if uploadZipfile:
+				print("    Project data has not changed - reusing previously generated report")
+
+		if not uploadZipfile:
+			# Very large projects can keep the file level data on disk rather than in memory
+			if serverProperties.get("report.intermediate.store") == "sqlite":
+				reportData["reportStore"] = report_store.ReportStore(os.path.abspath("_report_store.sqlite"))
+
+			# Hosts with many cores can spread the transformation of inventory and file evidence
+			reportData["transformProcesses"] = serverProperties.get("report.transform.processes", 1)
+
+			# Reuse the projects processed by a failed attempt at the same report and checkpoint this one
+			if serverProperties.get("report.checkpoints") and "requestKey" in reportData:
+				reportData["checkpointDirectory"] = report_cache.start_checkpoint(reportData["requestKey"], freshnessKey)
+
+			reportData = collect_report_data(baseURL, projectID, authToken, reportData)
+
+			if "errorMsg" in reportData.keys():
+				reports = report_errors.create_error_report(reportData)
+				print("    Error report artifacts have been created")
+			else:
+				# The documents are written straight into the upload archive
+				print("    Create report archive for upload")
+				uploadZipfile = report_artifacts_archive.create_report_archive(reportData, compressionLevel, compressionThreads, standaloneFormat)
+				print("    Upload zip file creation completed")
+
+				report_cache.save_cached_report(reportData.get("requestKey"), freshnessKey, uploadZipfile, reportData)
+
+				# The report has been created so the API responses are no longer needed
+				if "requestKey" in reportData:
+					report_cache.remove_checkpoint(reportData["requestKey"])
+
+			if "reportStore" in reportData:
+				reportData.pop("reportStore").close()
+
+	if not uploadZipfile:
+		print("    Create report archive for upload")
+		uploadZipfile = common.report_archive.create_report_zipfile(reports, reportFileNameBase)
+		print("    Upload zip file creation completed")
+
+	return uploadZipfile
+
+#----------------------------------------------------------------------#
+def load_server_properties():
+
+	configData = {}
+
     #####################################################################################################
     #  Code Insight System Information
     #  Pull the base URL from the same file that the installer is creating
@@ -82,33 +302,51 @@ def main():
 		baseURL = "http://localhost:8888"   # Required if the core.server.properties files is not used
 		logger.info("Using baseURL from create_report.py")
 
-	# See what if any arguments were provided
-	args = parser.parse_args()
-	projectID = args.projectID
-	reportID = args.reportID
-	authToken = args.authToken
-	reportOptions = args.reportOptions
+	configData["core.server.url"] = baseURL
 
-	fileNameTimeStamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-	reportTimeStamp = datetime.strptime(fileNameTimeStamp, "%Y%m%d-%H%M%S").strftime("%B %d, %Y at %H:%M:%S")
-	spdxTimeStamp = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
+	return configData
 
-	# Based on how the shell pass the arguemnts clean up the options if on a linux system:w
-	if sys.platform.startswith('linux'):
-		reportOptions = reportOptions.replace('""', '"')[1:-1]
-	
-	reportOptions = json.loads(reportOptions)
-	reportOptions = verifyOptions(reportOptions) 
+#----------------------------------------------------------------------#
+def create_work_directory(workDirectoryRoot):
 
-	releaseDetails = common.api.system.release.get_release_details(baseURL, authToken)
-	releaseVersion = releaseDetails["fnci.release.name"].replace(" ", "")
+	# A tmpfs location such as /dev/shm can be configured to keep the artifacts off disk
+	if workDirectoryRoot and not os.path.isdir(workDirectoryRoot):
+		logger.warning("Work directory location %s does not exist - using the system temp directory" %workDirectoryRoot)
+		workDirectoryRoot = None
 
-	logger.debug("Code Insight Release: %s" %releaseVersion)
-	logger.debug("Custom Report Provided Arguments:")	
-	logger.debug("    projectID:  %s" %projectID)	
-	logger.debug("    reportID:   %s" %reportID)	
-	logger.debug("    baseURL:  %s" %baseURL)	
-	logger.debug("    reportOptions:  %s" %reportOptions)
+	workDirectory = tempfile.mkdtemp(prefix="spdx_report-", dir=workDirectoryRoot)
+	logger.info("Using work directory: %s" %workDirectory)
+
+	return workDirectory
+
+#----------------------------------------------------------------------#
+def remove_work_directory(workDirectory):
+
+	try:
+		shutil.rmtree(workDirectory)
+		logger.info("Removed work directory: %s" %workDirectory)
+	except OSError:
+		logger.error("Error removing work directory %s" %workDirectory)
+		print("Error removing work directory %s" %workDirectory)
+
+#----------------------------------------------------------------------#
+def remove_old_log_files():
+
+	# The timestamp in the name keeps the logs in creation order
+	logFiles = sorted(glob.glob(os.path.dirname(os.path.realpath(__file__)) + "/_spdx_report-*.log"))
+
+	for logFile in logFiles[:-MAXLOGFILES]:
+		try:
+			os.remove(logFile)
+		except OSError:
+			logger.warning("Unable to remove old log file %s" %logFile)
+
+#----------------------------------------------------------------------#
+def create_report_data(projectID, reportOptions, releaseVersion):
+
+	fileNameTimeStamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+	reportTimeStamp = datetime.strptime(fileNameTimeStamp, "%Y%m%d-%H%M%S").strftime("%B %d, %Y at %H:%M:%S")
+	spdxTimeStamp = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
 
 	reportData = {}
 	reportData["projectID"] = projectID
@@ -119,61 +357,59 @@ def main():
 	reportData["fileNameTimeStamp"] = fileNameTimeStamp
 	reportData["reportTimeStamp"] = reportTimeStamp
 	reportData["spdxTimeStamp"] = spdxTimeStamp
+	reportData["startTime"] = time.time()  # For the time budget
 
-	# Collect the data for the report
-	
-	if "errorMsg" in reportOptions.keys():
+	return reportData
 
-		reportFileNameBase = reportName.replace(" ", "_") + "-Creation_Error-" + fileNameTimeStamp
+#----------------------------------------------------------------------#
+def determine_project_heirarchy(baseURL, projectID, authToken, reportData):
 
-		reportData["errorMsg"] = reportOptions["errorMsg"]
-		reportData["reportName"] = reportName
-		reportData["reportFileNameBase"] = reportFileNameBase
+	# The hierarchy may have already been collected along with the other startup details
+	if "projectList" in reportData:
+		projectList = reportData["projectList"]
+	else:
+		projectList = common.project_heirarchy.create_project_heirarchy(baseURL, authToken, projectID, reportData["reportOptions"]["includeChildProjects"])
+		reportData["projectList"] = projectList
 
-		reports = report_errors.create_error_report(reportData)
-		print("    *** ERROR  ***  Error found validating report options")
+	projectName = projectList[0]["projectName"]
+	projectNameForFile = re.sub(r"[^a-zA-Z0-9]+", '-', projectName )  # Remove special characters from project name for artifacts
+	fileNameTimeStamp = reportData["fileNameTimeStamp"]
+
+	# Are there child projects involved?  If so have the artifact file names reflect this fact
+	if len(projectList)==1:
+		reportFileNameBase = projectNameForFile + "-" + str(projectID) + "-" + reportName.replace(" ", "_") + "-" + fileNameTimeStamp
 	else:
-		print("    Collect data for %s" %reportName)
-		reportData = report_data.gather_data_for_report(baseURL, projectID, authToken, reportData)
-		print("    Report data has been collected")
+		reportFileNameBase = projectNameForFile + "-with-children-" + str(projectID) + "-" + reportName.replace(" ", "_") + "-" + fileNameTimeStamp
 
-		projectName = reportData["topLevelProjectName"]
-		projectNameForFile = re.sub(r"[^a-zA-Z0-9]+", '-', projectName )  # Remove special characters from project name for artifacts
+	reportData["reportFileNameBase"] = reportFileNameBase
 
-		# Are there child projects involved?  If so have the artifact file names reflect this fact
-		if len(reportData["projectList"])==1:
-			reportFileNameBase = projectNameForFile + "-" + str(projectID) + "-" + reportName.replace(" ", "_") + "-" + fileNameTimeStamp
-		else:
-			reportFileNameBase = projectNameForFile + "-with-children-" + str(projectID) + "-" + reportName.replace(" ", "_") + "-" + fileNameTimeStamp
+	return reportData
 
-		reportData["reportFileNameBase"] = reportFileNameBase
+#----------------------------------------------------------------------#
+def collect_report_data(baseURL, projectID, authToken, reportData):
 
-		if "errorMsg" in reportData.keys():
-			reports = report_errors.create_error_report(reportData)
-			print("    Error report artifacts have been created")
-		else:
-			reports = report_artifacts.create_report_artifacts(reportData)
-			print("    Report artifacts have been created")
-			for report in reports["allFormats"]:
-				print("       - %s"%report)
-
-	print("    Create report archive for upload")
-	uploadZipfile = common.report_archive.create_report_zipfile(reports, reportFileNameBase)
-	print("    Upload zip file creation completed")
-	common.api.project.upload_reports.upload_project_report_data(baseURL, projectID, reportID, authToken, uploadZipfile)
-	print("    Report uploaded to Code Insight")
+	print("    Collect data for %s" %reportName)
+	reportData = report_data.gather_data_for_report(baseURL, projectID, authToken, reportData)
+	report_replay.stop_recording()
+	print("    Report data has been collected")
 
-	#########################################################
-	# Remove the file since it has been uploaded to Code Insight
-	try:
-		os.remove(uploadZipfile)
-	except OSError:
-		logger.error("Error removing %s" %uploadZipfile)
-		print("Error removing %s" %uploadZipfile)
+	return reportData
 
-	logger.info("Completed creating %s" %reportName)
-	print("Completed creating %s" %reportName)
+#----------------------------------------------------------------------#
+def generate_report(baseURL, projectID, authToken, reportData):
+
+	reportData = collect_report_data(baseURL, projectID, authToken, reportData)
 
+	if "errorMsg" in reportData.keys():
+		reports = report_errors.create_error_report(reportData)
+		print("    Error report artifacts have been created")
+	else:
+		reports = report_artifacts.create_report_artifacts(reportData)
+		print("    Report artifacts have been created")
+		for report in reports["allFormats"]:
+			print("       - %s"%report)
+
+	return reports
 
 #----------------------------------------------------------------------# 
 def verifyOptions(reportOptions):
@@ -236,6 +472,36 @@ def verifyOptions(reportOptions):
 	else:
 		reportOptions["errorMsg"].append("Invalid option for including copyright projects: <b>%s</b>.  Valid options are <b>True/False</b>" %includeCopyrightsData)
 
+	# Added after the original options so reports registered before it default to no limit
+	timeBudgetMinutes = str(reportOptions.get("timeBudgetMinutes", "0")).strip()
+
+	try:
+		reportOptions["timeBudgetMinutes"] = float(timeBudgetMinutes or "0")
+		if reportOptions["timeBudgetMinutes"] < 0:
+			raise ValueError
+	except ValueError:
+		reportOptions["errorMsg"].append("Invalid option for the time budget: <b>%s</b>.  Valid options are a number of minutes or <b>0</b> for no limit" %timeBudgetMinutes)
+
+	# Added after the original options so reports registered before it keep the scan based file IDs
+	deduplicateFiles = str(reportOptions.get("deduplicateFiles", "False"))
+
+	if deduplicateFiles.lower() in trueOptions:
+		reportOptions["deduplicateFiles"] = True
+	elif deduplicateFiles.lower() in falseOptions:
+		reportOptions["deduplicateFiles"] = False
+	else:
+		reportOptions["errorMsg"].append("Invalid option for including identical files once: <b>%s</b>.  Valid options are <b>True/False</b>" %deduplicateFiles)
+
+	# Added after the original options so reports registered before it keep the CONTAINS relationships
+	useHasFiles = str(reportOptions.get("useHasFiles", "False"))
+
+	if useHasFiles.lower() in trueOptions:
+		reportOptions["useHasFiles"] = True
+	elif useHasFiles.lower() in falseOptions:
+		reportOptions["useHasFiles"] = False
+	else:
+		reportOptions["errorMsg"].append("Invalid option for listing package files with hasFiles: <b>%s</b>.  Valid options are <b>True/False</b>" %useHasFiles)
+
 	if not reportOptions["errorMsg"]:
 		reportOptions.pop('errorMsg', None)
 
@@ -0,0 +1,208 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : create_report_batch.py
+'''
+import sys, os, logging, argparse, json, time, functools, multiprocessing
+from datetime import datetime
+
+###################################################################################
+#  Set up logging before the report modules are imported so create_report.py does
+#  not truncate the log of a report currently being run by Code Insight
+logfileName = os.path.dirname(os.path.realpath(__file__)) + "/_spdx_report_batch.log"
+logging.basicConfig(format='%(asctime)s,%(msecs)-3d  %(levelname)-8s [%(filename)-30s:%(lineno)-4d]  %(message)s', datefmt='%Y-%m-%d:%H:%M:%S', filename=logfileName, filemode='w',level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+logging.getLogger("urllib3").setLevel(logging.WARNING)  # Disable logging for requests module
+
+import create_report
+import report_cache
+import report_concurrency
+import report_http_cache
+import report_intern
+import common.api.system.release
+import common.api.component.get_component_details
+
+####################################################################################
+# Create command line argument options
+parser = argparse.ArgumentParser()
+parser.add_argument('-pids', "--projectIDs", help="Comma separated list of project IDs")
+parser.add_argument('-pidFile', "--projectIDFile", help="File containing one project ID per line")
+parser.add_argument("-authToken", "--authToken", help="Code Insight Authorization Token")
+parser.add_argument("-reportOpts", "--reportOptions", help="Options for report content (JSON)")
+parser.add_argument("-outputDir", "--outputDirectory", default="spdx_reports", help="Directory for the generated SPDX documents")
+parser.add_argument("-workers", "--workers", type=int, default=os.cpu_count(), help="Number of reports to generate at the same time")
+
+workerState = {}
+
+#----------------------------------------------------------------------#
+def main():
+
+	logger.info("Creating %s batch - %s" %(create_report.reportName, create_report.reportVersion))
+	print("Creating %s batch - %s" %(create_report.reportName, create_report.reportVersion))
+	print("    Logfile: %s" %(logfileName))
+
+	args = parser.parse_args()
+	authToken = args.authToken
+	outputDirectory = os.path.abspath(args.outputDirectory)
+	workers = max(1, args.workers)
+
+	projectIDs = []
+	if args.projectIDs:
+		projectIDs += [projectID.strip() for projectID in args.projectIDs.split(",") if projectID.strip()]
+	if args.projectIDFile:
+		file_ptr = open(args.projectIDFile, "r")
+		projectIDs += [projectID.strip() for projectID in file_ptr if projectID.strip()]
+		file_ptr.close()
+
+	projectIDs = list(dict.fromkeys(projectIDs))  # Remove duplicates but keep the order
+
+	if not projectIDs:
+		print("    *** ERROR  ***  No project IDs provided")
+		return
+
+	reportOptions = create_report.verifyOptions(json.loads(args.reportOptions))
+	if "errorMsg" in reportOptions:
+		for errorMsg in reportOptions["errorMsg"]:
+			print("    *** ERROR  ***  %s" %errorMsg)
+		return
+
+	# Everything that is the same for all projects is only determined once
+	serverProperties = create_report.load_server_properties()
+	baseURL = serverProperties["core.server.url"]
+	releaseDetails = common.api.system.release.get_release_details(baseURL, authToken)
+	releaseVersion = releaseDetails["fnci.release.name"].replace(" ", "")
+
+	os.makedirs(outputDirectory, exist_ok=True)
+
+	print("    Generating reports for %s project(s) using %s worker(s)" %(len(projectIDs), workers))
+	logger.info("Generating reports for %s project(s) using %s worker(s)" %(len(projectIDs), workers))
+
+	batchStartTime = time.time()
+	results = []
+
+	# The workers share the per server ceiling on API requests
+	workerConcurrency = max(1, serverProperties.get("report.api.concurrency", report_concurrency.DEFAULTMAXCONCURRENCY) // min(workers, len(projectIDs)))
+
+	workerArguments = (baseURL, authToken, reportOptions, releaseVersion, outputDirectory, workerConcurrency, serverProperties)
+	workerPool = multiprocessing.Pool(min(workers, len(projectIDs)), initialize_worker, workerArguments)
+
+	# Each project is independent so report them as they finish
+	for result in workerPool.imap_unordered(create_project_report, projectIDs):
+		results.append(result)
+		print("       - Project %s: %s in %ss" %(result["projectID"], result["status"], result["elapsedTime"]))
+		logger.info("Project %s: %s in %ss" %(result["projectID"], result["status"], result["elapsedTime"]))
+
+	workerPool.close()
+	workerPool.join()
+
+	failedProjects = [result["projectID"] for result in results if result["status"] != "completed"]
+
+	batchSummary = {}
+	batchSummary["reportVersion"] = create_report.reportVersion
+	batchSummary["reportOptions"] = reportOptions
+	batchSummary["elapsedTime"] = round(time.time() - batchStartTime, 1)
+	projectOrder = {projectID : projectIndex for projectIndex, projectID in enumerate(projectIDs)}
+	batchSummary["projects"] = sorted(results, key=lambda result: projectOrder[result["projectID"]])
+
+	summaryFile = os.path.join(outputDirectory, "_batch_summary-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+	file_ptr = open(summaryFile, "w")
+	json.dump(batchSummary, file_ptr, indent=4)
+	file_ptr.close()
+
+	print("    %s of %s report(s) created in %ss" %(len(results) - len(failedProjects), len(results), batchSummary["elapsedTime"]))
+	if failedProjects:
+		print("    Failed project(s): %s" %", ".join(failedProjects))
+	print("    Summary: %s" %summaryFile)
+
+	logger.info("Completed creating %s batch" %create_report.reportName)
+	print("Completed creating %s batch" %create_report.reportName)
+
+#----------------------------------------------------------------------#
+def initialize_worker(baseURL, authToken, reportOptions, releaseVersion, outputDirectory, apiConcurrency, serverProperties):
+
+	workerState["baseURL"] = baseURL
+	workerState["authToken"] = authToken
+	workerState["reportOptions"] = reportOptions
+	workerState["releaseVersion"] = releaseVersion
+
+	# Each worker gets its own log so the entries from different projects do not interleave
+	workerLogfile = os.path.join(outputDirectory, "_spdx_report_batch-worker-%s.log" %os.getpid())
+	rootLogger = logging.getLogger()
+	for handler in list(rootLogger.handlers):
+		rootLogger.removeHandler(handler)
+	workerHandler = logging.FileHandler(workerLogfile, mode="w")
+	workerHandler.setFormatter(logging.Formatter('%(asctime)s,%(msecs)-3d  %(levelname)-8s [%(filename)-30s:%(lineno)-4d]  %(message)s', datefmt='%Y-%m-%d:%H:%M:%S'))
+	rootLogger.addHandler(workerHandler)
+
+	# Progress is in the batch output and the worker logs
+	sys.stdout = open(os.devnull, "w")
+
+	workerState["apiConcurrency"] = report_concurrency.install_adaptive_concurrency(apiConcurrency)
+
+	# Connections cannot be shared between processes so each worker keeps one session, and
+	# its connection pool, for every project it handles rather than connecting for each request
+	report_concurrency.get_session()
+
+	# The workers share the response cache on disk
+	if serverProperties.get("report.http.cache"):
+		report_http_cache.install_http_cache(os.path.join(report_cache.cacheDirectory, "http"), serverProperties.get("report.http.cache.size", report_http_cache.DEFAULTCACHESIZE), serverProperties.get("report.http.cache.ttl", report_http_cache.DEFAULTCACHETTL))
+
+	# Component details do not depend on the project so share them across every project this worker handles
+	componentDetailsFunction = common.api.component.get_component_details.get_component_details_v3_summary
+	common.api.component.get_component_details.get_component_details_v3_summary = functools.lru_cache(maxsize=None)(componentDetailsFunction)
+
+	# Artifacts are written to the current directory
+	os.chdir(outputDirectory)
+
+#----------------------------------------------------------------------#
+def create_project_report(projectID):
+
+	baseURL = workerState["baseURL"]
+	authToken = workerState["authToken"]
+
+	result = {}
+	result["projectID"] = projectID
+	startTime = time.time()
+
+	try:
+		logger.info("Creating %s for project %s" %(create_report.reportName, projectID))
+
+		reportData = create_report.create_report_data(projectID, workerState["reportOptions"], workerState["releaseVersion"])
+		reportData["apiConcurrency"] = workerState["apiConcurrency"]
+		reportData = create_report.determine_project_heirarchy(baseURL, projectID, authToken, reportData)
+
+		# Also collects the project states so processed child projects are shared between reports
+		report_cache.create_freshness_key(baseURL, authToken, reportData)
+
+		reports = create_report.generate_report(baseURL, projectID, authToken, reportData)
+
+		if "errorMsg" in reportData:
+			result["status"] = "failed"
+			result["errorMsg"] = reportData["errorMsg"]
+		else:
+			result["status"] = "completed"
+		result["reports"] = reports["allFormats"]
+
+	except Exception as error:
+		# One failing project should not stop the rest of the batch
+		logger.exception("Unable to create report for project %s" %projectID)
+		result["status"] = "failed"
+		result["errorMsg"] = str(error)
+
+	result["elapsedTime"] = round(time.time() - startTime, 1)
+
+	# The worker goes on to other projects so nothing shared within this report is kept
+	report_intern.clear_shared_lists()
+
+	# Running totals for this worker
+	report_http_cache.log_cache_statistics()
+
+	return result
+
+#----------------------------------------------------------------------#
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,134 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_artifacts_archive.py
+'''
+import logging, sys, io, time, codecs, shutil, tempfile, zipfile
+
+import report_artifacts_json
+import report_artifacts_tagvalue
+import report_compression
+
+logger = logging.getLogger(__name__)
+
+DEFAULTCOMPRESSIONLEVEL = 6  # zlib default
+SPOOLSIZE = 64 * 1024 * 1024  # Keep the JSON document in memory up to this size
+COPYBUFFERSIZE = 1024 * 1024
+
+#--------------------------------------------------------------------------------#
+def create_report_archive(reportData, compressionLevel=DEFAULTCOMPRESSIONLEVEL, compressionThreads=1, standaloneFormat=None):
+    logger.info("Entering create_report_archive")
+
+    # Same layout as common.report_archive.create_report_zipfile but the documents
+    # are written straight into the zip entries rather than to files that are
+    # then read back and compressed again
+    reportFileNameBase = reportData["reportFileNameBase"]
+    reportDetails = reportData["reportDetails"]
+
+    jsonFile = reportFileNameBase + ".spdx.json"
+    tagvalueFile = reportFileNameBase + ".spdx"
+    allFormatZipFile = reportFileNameBase + ".zip"
+    uploadZipfile = reportFileNameBase + "_upload.zip"
+
+    # The JSON document is needed twice, once as the viewable file and once in the
+    # downloadable archive, so it is only serialized once
+    json_ptr = tempfile.SpooledTemporaryFile(max_size=SPOOLSIZE, mode="w+b", dir=".")
+    report_artifacts_json.write_json_report(reportDetails, codecs.getwriter("utf-8")(json_ptr))
+    logger.info("    JSON document size: %s bytes" %json_ptr.tell())
+
+    uploadZip = create_zipfile(uploadZipfile, compressionLevel)
+
+    # The downloadable archive is already compressed so it is stored as is
+    allFormatsZipInfo = create_zip_info(allFormatZipFile, compressionLevel)
+    allFormatsZipInfo.compress_type = zipfile.ZIP_STORED
+    allFormats_ptr = uploadZip.open(allFormatsZipInfo, "w", force_zip64=True)
+    allFormatsZip = create_zipfile(allFormats_ptr, compressionLevel)
+
+    if standaloneFormat:
+        # The downloadable documents are .gz or .xz files themselves so the zip only stores them
+        jsonFile += report_compression.get_standalone_extension(standaloneFormat)
+        tagvalueFile += report_compression.get_standalone_extension(standaloneFormat)
+
+    print("        Adding %s to archive" %jsonFile)
+    logger.debug("    Adding %s to archive" %jsonFile)
+    write_zip_entry(allFormatsZip, jsonFile, json_ptr, compressionLevel, compressionThreads, standaloneFormat)
+
+    print("        Adding %s to archive" %tagvalueFile)
+    logger.debug("    Adding %s to archive" %tagvalueFile)
+    tagvalue_ptr = open_zip_entry(allFormatsZip, tagvalueFile, compressionLevel, compressionThreads, standaloneFormat)
+    tagvalue_text_ptr = io.TextIOWrapper(tagvalue_ptr, encoding="utf-8")
+    report_artifacts_tagvalue.write_tagvalue_report(reportDetails, tagvalue_text_ptr, reportData.get("packageFiles"))
+    tagvalue_text_ptr.close()
+
+    allFormatsZip.close()
+    allFormats_ptr.close()
+
+    viewableFile = reportFileNameBase + ".spdx.json"
+    print("        Adding viewable %s to archive" %viewableFile)
+    logger.debug("    Adding viewable %s to archive" %viewableFile)
+    write_zip_entry(uploadZip, viewableFile, json_ptr, compressionLevel, compressionThreads)
+
+    uploadZip.close()
+    json_ptr.close()
+
+    logger.info("Exiting create_report_archive")
+
+    return uploadZipfile
+
+#--------------------------------------------------------------------------------#
+def create_zipfile(zipTarget, compressionLevel):
+
+    # compresslevel is only available from python 3.7
+    if sys.version_info >= (3, 7):
+        return zipfile.ZipFile(zipTarget, "w", zipfile.ZIP_DEFLATED, compresslevel=compressionLevel)
+    else:
+        return zipfile.ZipFile(zipTarget, "w", zipfile.ZIP_DEFLATED)
+
+#--------------------------------------------------------------------------------#
+def create_zip_info(fileName, compressionLevel):
+
+    zipInfo = zipfile.ZipInfo(fileName, date_time=time.localtime()[:6])
+    zipInfo.compress_type = zipfile.ZIP_DEFLATED
+    zipInfo.external_attr = 0o100644 << 16  # Regular file, rw-r--r--
+
+    # The level of an entry opened with a ZipInfo can only be set from python 3.13
+    if hasattr(zipInfo, "compress_level"):
+        zipInfo.compress_level = compressionLevel
+
+    return zipInfo
+
+#--------------------------------------------------------------------------------#
+def open_zip_entry(zipFile, fileName, compressionLevel, compressionThreads, standaloneFormat=None, fileSize=None):
+
+    zipInfo = create_zip_info(fileName, compressionLevel)
+
+    if standaloneFormat:
+        zipInfo.compress_type = zipfile.ZIP_STORED
+        entry_ptr = zipFile.open(zipInfo, "w", force_zip64=True)
+        return report_compression.open_standalone_file(entry_ptr, standaloneFormat, compressionLevel, compressionThreads)
+
+    if not hasattr(zipInfo, "compress_level"):
+        # Entries opened by name use the level the ZipFile was created with
+        entry_ptr = zipFile.open(fileName, "w", force_zip64=True)
+    elif fileSize is None:
+        entry_ptr = zipFile.open(zipInfo, "w", force_zip64=True)
+    else:
+        zipInfo.file_size = fileSize  # A known size lets zipfile decide if zip64 is needed
+        entry_ptr = zipFile.open(zipInfo, "w")
+
+    return report_compression.use_parallel_compression(entry_ptr, compressionLevel, compressionThreads)
+
+#--------------------------------------------------------------------------------#
+def write_zip_entry(zipFile, fileName, source_ptr, compressionLevel, compressionThreads, standaloneFormat=None):
+
+    source_ptr.seek(0, 2)
+    fileSize = source_ptr.tell()
+
+    source_ptr.seek(0)
+    entry_ptr = open_zip_entry(zipFile, fileName, compressionLevel, compressionThreads, standaloneFormat, fileSize)
+    shutil.copyfileobj(source_ptr, entry_ptr, COPYBUFFERSIZE)
+    entry_ptr.close()
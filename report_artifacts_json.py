@@ -8,6 +8,7 @@ Created On : Fri Aug 18 2023
 File : report_artifacts_json.py
 '''
 import logging, json
+import report_store
 logger = logging.getLogger(__name__)
 
 #--------------------------------------------------------------------------------#
@@ -29,10 +30,30 @@ def generate_json_report(reportData):
         logger.error("Failed to open file %s:" %jsonFile)
         return {"errorMsg" : "Failed to open file %s:" %jsonFile}
 
-    json.dump(reportDetails, report_ptr, indent=4)
+    write_json_report(reportDetails, report_ptr)
 
     report_ptr.close() 
 
     logger.info("    Exiting generate_json_report")
 
     return jsonFile
+
+#--------------------------------------------------------------------------------#
+def write_json_report(reportDetails, report_ptr):
+
+    # Write the document one list item at a time so lists held in a report store
+    # never need to be in memory.  The output matches json.dump(indent=4)
+    report_ptr.write("{")
+
+    for index, (key, value) in enumerate(reportDetails.items()):
+        report_ptr.write("%s\n    %s: " %("," if index else "", json.dumps(key)))
+
+        if report_store.is_list(value) and len(value):
+            report_ptr.write("[")
+            for itemIndex, item in enumerate(value):
+                report_ptr.write("%s\n        %s" %("," if itemIndex else "", json.dumps(item, indent=4).replace("\n", "\n        ")))
+            report_ptr.write("\n    ]")
+        else:
+            report_ptr.write(json.dumps(value if not report_store.is_list(value) else [], indent=4).replace("\n", "\n    "))
+
+    report_ptr.write("\n}" if reportDetails else "}")
@@ -29,6 +29,20 @@ def generate_tagvalue_report(reportData):
         logger.error("Failed to open file %s:" %tagvalueFile)
         return {"errorMsg" : "Failed to open file %s:" %tagvalueFile}
 
+    write_tagvalue_report(reportDetails, report_ptr, reportData.get("packageFiles"))
+
+    report_ptr.close() 
+
+    logger.info("    Exiting generate_tagvalue_report")
+
+    return tagvalueFile
+
+#--------------------------------------------------------------------------------#
+def write_tagvalue_report(reportDetails, report_ptr, packageFiles=None):
+
+    packageFiles = packageFiles or {}  # Package SPDXID to the files it contains
+    inlineFileCount = 0
+
     report_ptr.write("SPDXVersion: %s\n" %reportDetails["spdxVersion"])
     report_ptr.write("DataLicense: %s\n" %reportDetails["dataLicense"])
     report_ptr.write("SPDXID: %s\n" %reportDetails["SPDXID"])
@@ -37,6 +51,8 @@ def generate_tagvalue_report(reportData):
     for creator in reportDetails["creationInfo"]["creators"]:
         report_ptr.write("Creator: %s\n" %creator)
     report_ptr.write("Created:  %s\n" %reportDetails["creationInfo"]["created"])
+    if "comment" in reportDetails:
+        report_ptr.write("DocumentComment: <text>%s</text>\n" %reportDetails["comment"])
 
  
     report_ptr.write("\n")
@@ -108,56 +124,34 @@ def generate_tagvalue_report(reportData):
 
         report_ptr.write("\n")
 
-        # if packageDetails["SPDXID"] in reportData["packageFiles"]:
-
-        #     report_ptr.write("##------------------------------\n")
-        #     report_ptr.write("##  Package File Details\n")
-        #     report_ptr.write("##------------------------------\n")
-        #     report_ptr.write("\n")
-
-        #     for fileDetails in reportData["packageFiles"][packageDetails["SPDXID"]]:
-        #         report_ptr.write("## ----------------------- File -----------------------\n")
-        #         report_ptr.write("FileName: ./%s\n" %fileDetails["fileName"])
-        #         report_ptr.write("SPDXID: %s\n" %fileDetails["SPDXID"])
-
-        #         for checksum in fileDetails["checksums"]:
-        #             report_ptr.write("FileChecksum: %s: %s\n" %(checksum["algorithm"], checksum["checksumValue"] ))
-                                    
-        #         report_ptr.write("LicenseConcluded: %s\n" %fileDetails["licenseConcluded"])
-
-        #         if len(fileDetails["copyrightText"]) > 0:
-        #             report_ptr.write("FileCopyrightText: <text>%s</text>\n" %fileDetails["copyrightText"])
-                    
+        # Files are written inline with the package that contains them
+        if packageDetails["SPDXID"] in packageFiles:
 
-        #         for license in fileDetails["licenseInfoInFiles"]:
-        #             report_ptr.write("LicenseInfoInFile: %s\n" %license)
+            report_ptr.write("##------------------------------\n")
+            report_ptr.write("##  Package File Details\n")
+            report_ptr.write("##------------------------------\n")
+            report_ptr.write("\n")
 
-        #         report_ptr.write("\n")
+            for fileDetails in packageFiles[packageDetails["SPDXID"]]:
+                write_file_details(fileDetails, report_ptr)
+                inlineFileCount += 1
 
 
-    if "files" in reportDetails:
+    # Only files not contained by any package are left to list on their own.  Without
+    # the index every file is listed here and linked to its package by relationship
+    if "files" in reportDetails and inlineFileCount < len(reportDetails["files"]):
         report_ptr.write("##------------------------------\n")
         report_ptr.write("##  File Details\n")
         report_ptr.write("##------------------------------\n")
         report_ptr.write("\n")  
         
-        for file in reportDetails["files"]: 
-            report_ptr.write("FileName: ./%s\n" %file["fileName"])
-            report_ptr.write("SPDXID: %s\n" %file["SPDXID"])
-
-            for checksum in file["checksums"]:
-                report_ptr.write("FileChecksum: %s: %s\n" %(checksum["algorithm"], checksum["checksumValue"] ))
-                                
-            report_ptr.write("LicenseConcluded: %s\n" %file["licenseConcluded"])
+        if packageFiles:
+            remainingFiles = packageFiles.get(None, [])
+        else:
+            remainingFiles = reportDetails["files"]
 
-            if len(file["copyrightText"]) > 0:
-                report_ptr.write("FileCopyrightText: <text>%s</text>\n" %file["copyrightText"])
-                
-
-            for license in file["licenseInfoInFiles"]:
-                report_ptr.write("LicenseInfoInFile: %s\n" %license)
-
-            report_ptr.write("\n")
+        for file in remainingFiles: 
+            write_file_details(file, report_ptr)
 
     ##########################################################
     #  Enter the relationship details in to the report
@@ -170,8 +164,26 @@ def generate_tagvalue_report(reportData):
         for relationship in reportDetails["relationships"]:
             report_ptr.write("Relationship: %s %s %s\n" %(relationship["spdxElementId"], relationship["relationshipType"], relationship["relatedSpdxElement"]))
 
-    report_ptr.close() 
+        # Tag/value has no equivalent of hasFiles so the package files are written as relationships
+        for packageDetails in reportDetails["packages"]:
+            for fileSPDXID in packageDetails.get("hasFiles", []):
+                report_ptr.write("Relationship: %s CONTAINS %s\n" %(packageDetails["SPDXID"], fileSPDXID))
 
-    logger.info("    Exiting generate_tagvalue_report")
+#--------------------------------------------------------------------------------#
+def write_file_details(fileDetails, report_ptr):
+
+    report_ptr.write("FileName: ./%s\n" %fileDetails["fileName"])
+    report_ptr.write("SPDXID: %s\n" %fileDetails["SPDXID"])
+
+    for checksum in fileDetails["checksums"]:
+        report_ptr.write("FileChecksum: %s: %s\n" %(checksum["algorithm"], checksum["checksumValue"] ))
+                        
+    report_ptr.write("LicenseConcluded: %s\n" %fileDetails["licenseConcluded"])
 
-    return tagvalueFile
\ No newline at end of file
+    if len(fileDetails["copyrightText"]) > 0:
+        report_ptr.write("FileCopyrightText: <text>%s</text>\n" %fileDetails["copyrightText"])
+
+    for license in fileDetails["licenseInfoInFiles"]:
+        report_ptr.write("LicenseInfoInFile: %s\n" %license)
+
+    report_ptr.write("\n")
@@ -0,0 +1,175 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_budget.py
+'''
+import logging, time
+
+logger = logging.getLogger(__name__)
+
+SAFETYMARGIN = 0.9  # Fraction of the time budget the report aims to finish within
+ARTIFACTTIMEFRACTION = 0.25  # Expected time to write and upload the documents relative to collecting the data
+
+# The report content given up, in order, when the report would not finish in time, with
+# the fraction of the remaining collection time that leaving it out is expected to save
+DEGRADATIONS = [
+    ("includeUnassociatedFiles", "files not associated to inventory items", 0.2),
+    ("includeFileDetails", "file level details", 0.7),
+    ("includeCopyrightsData", "copyright data", 0.1),
+]
+
+# Fraction of a project's collection time that has passed at the end of each phase
+PHASEPROGRESS = {"inventory" : 0.1, "scannedFiles" : 0.6, "project" : 1.0}
+
+#-------------------------------------------------------------------#
+def start_time_budget(reportData):
+
+    timeBudgetMinutes = reportData["reportOptions"].get("timeBudgetMinutes", 0)
+    if not timeBudgetMinutes:
+        return
+
+    # The options may be reduced for this report so do not change a dict shared with other reports
+    reportData["reportOptions"] = dict(reportData["reportOptions"])
+
+    startTime = reportData.get("startTime", time.time())
+
+    timeBudget = {}
+    timeBudget["deadline"] = startTime + timeBudgetMinutes * 60 * SAFETYMARGIN
+    timeBudget["collectionStart"] = time.time()
+    timeBudget["measureStart"] = time.time()
+    timeBudget["measuredWeight"] = 0
+    timeBudget["projectWeights"] = {}
+    timeBudget["completedWeights"] = {}
+    timeBudget["remainingWeight"] = 0
+    timeBudget["degradations"] = []
+
+    reportData["timeBudget"] = timeBudget
+
+    logger.info("Time budget of %s minutes - aiming to finish within %.0f seconds" %(timeBudgetMinutes, timeBudget["deadline"] - time.time()))
+
+#-------------------------------------------------------------------#
+def set_project_weights(reportData, projectList):
+
+    if "timeBudget" not in reportData:
+        return
+
+    # Collecting the file level data takes most of the time so the number of files
+    # in each project's inventory is used to estimate the progress of the report
+    projectInventories = reportData.get("projectInventories", {})
+    projectWeights = {}
+
+    for project in projectList:
+        projectID = project["projectID"]
+
+        if projectID in projectInventories:
+            projectWeights[projectID] = 1 + sum(len(inventoryItem.get("filePaths", [])) for inventoryItem in projectInventories[projectID]["inventoryItems"])
+        else:
+            projectWeights[projectID] = 1
+
+    # Mixing file counts with projects that have no inventory yet would skew the estimate
+    if any(projectID not in projectInventories for projectID in projectWeights):
+        projectWeights = dict.fromkeys(projectWeights, 1)
+
+    reportData["timeBudget"]["projectWeights"] = projectWeights
+    reportData["timeBudget"]["remainingWeight"] = sum(projectWeights.values())
+
+#-------------------------------------------------------------------#
+def check_time_budget(reportData, projectID=None, phase="project"):
+    # Called after the inventory and the scanned files of each project are collected,
+    # after each project and again before the documents are written.  If the report
+    # is predicted to finish after the deadline, content is left out until it is not
+
+    timeBudget = reportData.get("timeBudget")
+    if timeBudget is None:
+        return
+
+    currentTime = time.time()
+
+    if projectID is not None:
+        record_progress(timeBudget, projectID, phase)
+
+    # Only the work done since the last degradation reflects the current options
+    predictedCollectionTime = 0
+    if timeBudget["measuredWeight"] > 0:
+        collectionRate = (currentTime - timeBudget["measureStart"]) / timeBudget["measuredWeight"]
+        predictedCollectionTime = collectionRate * timeBudget["remainingWeight"]
+
+    elapsedCollectionTime = currentTime - timeBudget["collectionStart"]
+    predictedTime = predict_remaining_time(elapsedCollectionTime, predictedCollectionTime)
+
+    logger.debug("    Predicted to finish in %.0f seconds with %.0f seconds left" %(predictedTime, timeBudget["deadline"] - currentTime))
+
+    if currentTime + predictedTime > timeBudget["deadline"]:
+        degrade_report(reportData, elapsedCollectionTime, predictedCollectionTime, timeBudget["deadline"] - currentTime)
+
+#-------------------------------------------------------------------#
+def record_progress(timeBudget, projectID, phase):
+
+    # A phase counts the part of the project's weight not already counted by an earlier phase
+    projectWeight = timeBudget["projectWeights"].get(projectID, 0)
+    completedWeight = projectWeight * PHASEPROGRESS[phase]
+    progressWeight = completedWeight - timeBudget["completedWeights"].get(projectID, 0)
+
+    timeBudget["remainingWeight"] -= progressWeight
+    timeBudget["measuredWeight"] += progressWeight
+
+    if phase == "project":
+        timeBudget["projectWeights"].pop(projectID, None)
+        timeBudget["completedWeights"].pop(projectID, None)
+    else:
+        timeBudget["completedWeights"][projectID] = completedWeight
+
+#-------------------------------------------------------------------#
+def predict_remaining_time(elapsedCollectionTime, predictedCollectionTime):
+
+    # Writing and uploading the documents takes time in proportion to the collection
+    return predictedCollectionTime + ARTIFACTTIMEFRACTION * (elapsedCollectionTime + predictedCollectionTime)
+
+#-------------------------------------------------------------------#
+def degrade_report(reportData, elapsedCollectionTime, predictedCollectionTime, remainingTime):
+
+    reportOptions = reportData["reportOptions"]
+    timeBudget = reportData["timeBudget"]
+    predictedTime = predict_remaining_time(elapsedCollectionTime, predictedCollectionTime)
+    degradationCount = len(timeBudget["degradations"])
+
+    # Leave out as much as the prediction says is needed in one go rather than one step per check
+    for optionName, description, expectedSaving in DEGRADATIONS:
+        if predictedTime <= remainingTime:
+            break
+
+        if not reportOptions[optionName]:
+            continue
+
+        reportOptions[optionName] = False
+        timeBudget["degradations"].append(description)
+
+        print("        Report predicted to exceed its time budget - leaving out %s" %description)
+        logger.warning("Report predicted to need %.0f seconds with %.0f seconds left - leaving out %s" %(predictedTime, remainingTime, description))
+
+        predictedCollectionTime *= 1 - expectedSaving
+        predictedTime = predict_remaining_time(elapsedCollectionTime, predictedCollectionTime)
+
+    if predictedTime > remainingTime:
+        logger.warning("Report predicted to need %.0f seconds with %.0f seconds left - no further content can be left out" %(predictedTime, remainingTime))
+
+    # Start measuring the progress again with the reduced content
+    if len(timeBudget["degradations"]) > degradationCount:
+        timeBudget["measureStart"] = time.time()
+        timeBudget["measuredWeight"] = 0
+
+#-------------------------------------------------------------------#
+def get_degradations(reportData):
+    return reportData.get("timeBudget", {}).get("degradations", [])
+
+#-------------------------------------------------------------------#
+def create_degradation_comment(reportData):
+
+    timeBudgetMinutes = reportData["reportOptions"]["timeBudgetMinutes"]
+    degradations = get_degradations(reportData)
+
+    return "Generated within a time budget of %s minutes. To finish in time the following were left out of this document: %s." %(format(timeBudgetMinutes, "g"), ", ".join(degradations))
@@ -0,0 +1,473 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_cache.py
+'''
+import logging, os, json, hashlib, shutil, time, glob, tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:
+    import msvcrt  # Windows
+
+import common.api.project.get_project_information
+import report_data
+import report_intern
+
+logger = logging.getLogger(__name__)
+
+cacheDirectory = os.path.join(os.path.dirname(os.path.realpath(__file__)), "_report_cache")
+
+LOCKTIMEOUT = 3600  # Seconds to wait for another run of the same report before going ahead anyway
+CHECKPOINTMAXAGE = 7 * 24 * 3600  # Seconds before a checkpoint from a failed run is discarded
+
+#-------------------------------------------------------------------#
+def create_freshness_key(baseURL, authToken, reportData):
+    logger.info("Entering create_freshness_key")
+
+    reportOptions = reportData["reportOptions"]
+    projectInventories = {}
+    projectStates = {}
+
+    # A child project with many parents only needs to be checked once
+    projectIDs = list(dict.fromkeys(project["projectID"] for project in reportData["projectList"]))
+
+    # Details already collected at startup are not requested again
+    knownProjectInformation = reportData.get("projectInformation", {})
+    knownProjectInventories = reportData.get("projectInventories", {})
+
+    def get_known_project_details(projectID):
+        if projectID in knownProjectInformation:
+            projectInformation = knownProjectInformation[projectID]
+        else:
+            projectInformation = get_project_information(baseURL, projectID, authToken)
+
+        if projectID in knownProjectInventories:
+            projectInventory = knownProjectInventories[projectID]
+        else:
+            projectInventory = report_data.get_project_inventory(baseURL, projectID, authToken, reportOptions["includeCopyrightsData"], reportOptions["includeNonRuntimeInventory"])
+
+        return projectInformation, projectInventory
+
+    # The projects are independent so they are requested at the same time.  The API
+    # concurrency controller decides how many of these requests are actually in flight
+    try:
+        with ThreadPoolExecutor(max_workers=reportData.get("apiConcurrency", 1)) as executor:
+            projectDetails = list(executor.map(get_known_project_details, projectIDs))
+    except:
+        logger.warning("Unable to determine the current state of the projects")
+        return None
+
+    # The key covers everything that changes the content of the report
+    for projectID, (projectInformation, projectInventory) in zip(projectIDs, projectDetails):
+
+        # Keep the inventory so it does not need to be collected again if the report is rebuilt
+        projectInventories[projectID] = projectInventory
+
+        projectState = {}
+        projectState["projectID"] = projectID
+        projectState["projectInformation"] = projectInformation
+        projectState["inventory"] = create_fingerprint(projectInventory)
+        projectStates[projectID] = create_fingerprint(projectState)
+
+    reportData["projectInventories"] = projectInventories
+    reportData["projectStates"] = projectStates
+
+    freshnessDetails = {}
+    freshnessDetails["reportVersion"] = reportData["reportVersion"]
+    freshnessDetails["releaseVersion"] = reportData["releaseVersion"]
+    freshnessDetails["reportOptions"] = reportOptions
+    freshnessDetails["projectStates"] = projectStates
+
+    freshnessKey = create_fingerprint(freshnessDetails)
+    logger.info("    Freshness key: %s" %freshnessKey)
+
+    return freshnessKey
+
+#-------------------------------------------------------------------#
+def get_project_information(baseURL, projectID, authToken):
+
+    return common.api.project.get_project_information.get_project_information_summary(baseURL, projectID, authToken)
+
+#-------------------------------------------------------------------#
+def create_fingerprint(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+#-------------------------------------------------------------------#
+def get_cached_report_files(requestKey, freshnessKey):
+
+    # A report is only reused for the same request of the same project data
+    cachedReportBase = os.path.join(cacheDirectory, "reports", requestKey + "-" + freshnessKey)
+
+    return cachedReportBase + ".json", cachedReportBase + ".zip"
+
+#-------------------------------------------------------------------#
+def get_cached_report(requestKey, freshnessKey):
+
+    if requestKey is None or freshnessKey is None:
+        return None
+
+    cachedReportDetailsFile, cachedReportFile = get_cached_report_files(requestKey, freshnessKey)
+
+    # The details are written after the archive so an archive without them is incomplete
+    if not os.path.exists(cachedReportDetailsFile):
+        logger.info("    No cached report for request %s" %requestKey)
+        return None
+
+    try:
+        file_ptr = open(cachedReportDetailsFile, "r")
+        cachedReportDetails = json.load(file_ptr)
+        file_ptr.close()
+    except:
+        logger.warning("Unable to read cached report details: %s" %cachedReportDetailsFile)
+        return None
+
+    # Copy rather than move so the cached archive can be used by later runs
+    uploadZipfile = cachedReportDetails["uploadZipfile"]
+    try:
+        shutil.copyfile(cachedReportFile, uploadZipfile)
+    except OSError:
+        logger.warning("Unable to copy cached report: %s" %cachedReportFile)
+        return None
+
+    logger.info("    Reusing cached report created %s" %cachedReportDetails["reportTimeStamp"])
+
+    return uploadZipfile
+
+#-------------------------------------------------------------------#
+def save_cached_report(requestKey, freshnessKey, uploadZipfile, reportData):
+
+    if requestKey is None or freshnessKey is None:
+        return
+
+    # A report that left content out to meet its time budget should not be reused
+    if reportData.get("timeBudget", {}).get("degradations"):
+        logger.info("    Report content was reduced for the time budget - not caching the report")
+        return
+
+    reportCacheDirectory = os.path.join(cacheDirectory, "reports")
+    cachedReportDetailsFile, cachedReportFile = get_cached_report_files(requestKey, freshnessKey)
+
+    cachedReportDetails = {}
+    cachedReportDetails["requestKey"] = requestKey
+    cachedReportDetails["freshnessKey"] = freshnessKey
+    cachedReportDetails["uploadZipfile"] = os.path.basename(uploadZipfile)
+    cachedReportDetails["reportTimeStamp"] = reportData["reportTimeStamp"]
+    cachedReportDetails["savedTime"] = time.time()
+
+    try:
+        os.makedirs(reportCacheDirectory, exist_ok=True)
+        replace_cache_file(cachedReportFile, lambda temporaryFile: shutil.copyfile(uploadZipfile, temporaryFile))
+        save_json_file(cachedReportDetailsFile, cachedReportDetails)
+    except OSError:
+        logger.error("Unable to save cached report for request %s" %requestKey)
+        return
+
+    logger.info("    Cached report saved for request %s" %requestKey)
+
+    # Reports of earlier project data for the same request will not be used again
+    for previousReportFile in glob.glob(os.path.join(reportCacheDirectory, requestKey + "-*")):
+        if previousReportFile not in (cachedReportDetailsFile, cachedReportFile) and not previousReportFile.endswith(".tmp"):
+            try:
+                os.remove(previousReportFile)
+            except OSError:
+                pass
+
+#-------------------------------------------------------------------#
+def replace_cache_file(cacheFile, write_function):
+
+    # Each run writes to its own temporary file in the same directory and moves it into
+    # place in one step so concurrent runs never share a partial file
+    file_descriptor, temporaryFile = tempfile.mkstemp(dir=os.path.dirname(cacheFile), prefix=os.path.basename(cacheFile) + ".", suffix=".tmp")
+    os.close(file_descriptor)
+
+    try:
+        write_function(temporaryFile)
+        os.replace(temporaryFile, cacheFile)
+    except:
+        if os.path.exists(temporaryFile):
+            os.remove(temporaryFile)
+        raise
+
+#-------------------------------------------------------------------#
+def save_json_file(cacheFile, data):
+
+    def write_json_file(temporaryFile):
+        file_ptr = open(temporaryFile, "w")
+        json.dump(data, file_ptr)
+        file_ptr.close()
+
+    replace_cache_file(cacheFile, write_json_file)
+
+#-------------------------------------------------------------------#
+def create_request_key(projectID, reportOptions, reportVersion):
+    # The options have already been verified so the same request always gives the same key
+    requestDetails = {}
+    requestDetails["projectID"] = str(projectID)
+    requestDetails["reportOptions"] = reportOptions
+    requestDetails["reportVersion"] = reportVersion
+
+    return create_fingerprint(requestDetails)
+
+#-------------------------------------------------------------------#
+def acquire_report_lock(requestKey):
+    logger.info("Entering acquire_report_lock")
+
+    lockDirectory = os.path.join(cacheDirectory, "locks")
+    lockFile = os.path.join(lockDirectory, requestKey + ".lock")
+
+    try:
+        os.makedirs(lockDirectory, exist_ok=True)
+        lock_ptr = open(lockFile, "a+")
+    except OSError:
+        logger.error("Unable to open report lock file: %s" %lockFile)
+        return None, None
+
+    waitStartTime = time.time()
+    waited = False
+
+    # The lock is released by the OS if the run holding it exits for any reason
+    while not lock_file(lock_ptr):
+        if not waited:
+            logger.info("    The same report is already being generated - waiting for it to complete")
+            print("    The same report is already being generated - waiting for it to complete")
+            waited = True
+
+        if time.time() - waitStartTime > LOCKTIMEOUT:
+            logger.warning("    Timed out waiting for report lock %s - continuing without it" %requestKey)
+            lock_ptr.close()
+            return None, None
+
+        time.sleep(1)
+
+    logger.info("    Report lock acquired for %s" %requestKey)
+
+    # Only a run that had to wait can reuse the report from the run it waited for
+    if not waited:
+        waitStartTime = None
+
+    return lock_ptr, waitStartTime
+
+#-------------------------------------------------------------------#
+def lock_file(lock_ptr):
+
+    try:
+        if "fcntl" in globals():
+            fcntl.flock(lock_ptr.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_ptr.seek(0)
+            msvcrt.locking(lock_ptr.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+
+    return True
+
+#-------------------------------------------------------------------#
+def release_report_lock(lock_ptr):
+
+    if lock_ptr is None:
+        return
+
+    try:
+        if "fcntl" in globals():
+            fcntl.flock(lock_ptr.fileno(), fcntl.LOCK_UN)
+        else:
+            lock_ptr.seek(0)
+            msvcrt.locking(lock_ptr.fileno(), msvcrt.LK_UNLCK, 1)
+    except OSError:
+        logger.warning("Unable to release report lock")
+
+    lock_ptr.close()
+    logger.info("    Report lock released")
+
+#-------------------------------------------------------------------#
+def get_coalesced_report(requestKey, waitStartTime):
+
+    if not waitStartTime:
+        return None
+
+    # Only reuse a report for the same request that was completed while this run was waiting
+    for cachedReportDetailsFile in glob.glob(os.path.join(cacheDirectory, "reports", requestKey + "-*.json")):
+        try:
+            file_ptr = open(cachedReportDetailsFile, "r")
+            cachedReportDetails = json.load(file_ptr)
+            file_ptr.close()
+        except:
+            logger.warning("Unable to read cached report details: %s" %cachedReportDetailsFile)
+            continue
+
+        if cachedReportDetails.get("savedTime", 0) >= waitStartTime:
+            return get_cached_report(requestKey, cachedReportDetails["freshnessKey"])
+
+    return None
+
+#-------------------------------------------------------------------#
+def load_inventory_cache(projectID):
+
+    inventoryCacheFile = os.path.join(cacheDirectory, "inventory", str(projectID) + ".json")
+
+    if not os.path.exists(inventoryCacheFile):
+        return {}
+
+    try:
+        file_ptr = open(inventoryCacheFile, "r")
+        cachedInventoryItems = json.load(file_ptr)
+        file_ptr.close()
+    except:
+        logger.warning("Unable to read cached inventory details: %s" %inventoryCacheFile)
+        return {}
+
+    return cachedInventoryItems
+
+#-------------------------------------------------------------------#
+def save_inventory_cache(projectID, inventoryItems):
+
+    inventoryCacheDirectory = os.path.join(cacheDirectory, "inventory")
+    inventoryCacheFile = os.path.join(inventoryCacheDirectory, str(projectID) + ".json")
+
+    # Only the items in the current inventory are kept so removed items do not accumulate
+    try:
+        os.makedirs(inventoryCacheDirectory, exist_ok=True)
+        save_json_file(inventoryCacheFile, inventoryItems)
+    except OSError:
+        logger.error("Unable to save cached inventory details for project %s" %projectID)
+
+#-------------------------------------------------------------------#
+def load_project_data(projectID, projectDataKey, checkpointDirectory=None):
+
+    if projectDataKey is None:
+        return None
+
+    # The checkpoint of a failed attempt at the same report is checked first since
+    # a report with other options may have replaced the shared copy since then
+    projectCacheFiles = [os.path.join(cacheDirectory, "projects", str(projectID) + ".json")]
+    if checkpointDirectory is not None:
+        projectCacheFiles.insert(0, os.path.join(checkpointDirectory, "projects", str(projectID) + ".json"))
+
+    for projectCacheFile in projectCacheFiles:
+        if not os.path.exists(projectCacheFile):
+            continue
+
+        try:
+            file_ptr = open(projectCacheFile, "r")
+            cachedProjectData = json.load(file_ptr, object_hook=report_intern.intern_json_object)
+            file_ptr.close()
+        except:
+            logger.warning("Unable to read cached project data: %s" %projectCacheFile)
+            continue
+
+        if cachedProjectData["projectDataKey"] != projectDataKey:
+            logger.info("    Cached data for project %s is out of date" %projectID)
+            continue
+
+        return cachedProjectData["projectData"]
+
+    return None
+
+#-------------------------------------------------------------------#
+def save_project_data(projectID, projectDataKey, projectData, checkpointDirectory=None):
+
+    if projectDataKey is None:
+        return
+
+    projectCacheDirectory = os.path.join(cacheDirectory, "projects")
+    projectCacheFile = os.path.join(projectCacheDirectory, str(projectID) + ".json")
+
+    cachedProjectData = {}
+    cachedProjectData["projectDataKey"] = projectDataKey
+    cachedProjectData["projectData"] = projectData
+
+    try:
+        os.makedirs(projectCacheDirectory, exist_ok=True)
+        save_json_file(projectCacheFile, cachedProjectData)
+    except OSError:
+        logger.error("Unable to save cached data for project %s" %projectID)
+        return
+
+    if checkpointDirectory is not None:
+        save_checkpoint_file(projectCacheFile, os.path.join(checkpointDirectory, "projects", str(projectID) + ".json"))
+
+#-------------------------------------------------------------------#
+def start_checkpoint(requestKey, freshnessKey):
+
+    # Each project is checkpointed once its data has been processed so a retry after
+    # a failure only collects and processes the projects the failed attempt had not finished
+    remove_old_checkpoints()
+
+    if freshnessKey is None:
+        return None
+
+    checkpointDirectory = os.path.join(cacheDirectory, "checkpoints", requestKey)
+    checkpointDetailsFile = os.path.join(checkpointDirectory, "checkpoint.json")
+
+    try:
+        file_ptr = open(checkpointDetailsFile, "r")
+        checkpointDetails = json.load(file_ptr)
+        file_ptr.close()
+    except:
+        checkpointDetails = None
+
+    if checkpointDetails is not None and checkpointDetails["freshnessKey"] == freshnessKey:
+        checkpointedProjects = glob.glob(os.path.join(checkpointDirectory, "projects", "*.json"))
+
+        if checkpointedProjects:
+            print("    Resuming from checkpoint of a previous attempt with %s processed project(s)" %len(checkpointedProjects))
+            logger.info("    Resuming from checkpoint with %s processed project(s)" %len(checkpointedProjects))
+    elif os.path.exists(checkpointDirectory):
+        # The project data has changed since the failed attempt so nothing can be reused
+        logger.info("    Checkpoint for request %s is out of date" %requestKey)
+        shutil.rmtree(checkpointDirectory, ignore_errors=True)
+
+    try:
+        os.makedirs(os.path.join(checkpointDirectory, "projects"), exist_ok=True)
+        file_ptr = open(checkpointDetailsFile, "w")
+        json.dump({"freshnessKey" : freshnessKey, "savedTime" : time.time()}, file_ptr)
+        file_ptr.close()
+    except OSError:
+        logger.error("Unable to create checkpoint directory %s" %checkpointDirectory)
+        return None
+
+    return checkpointDirectory
+
+#-------------------------------------------------------------------#
+def save_checkpoint_file(projectCacheFile, checkpointFile):
+
+    # The shared copy is always replaced rather than rewritten so a link to it keeps
+    # this version without writing the project data a second time
+    def link_checkpoint_file(temporaryFile):
+        os.remove(temporaryFile)
+        os.link(projectCacheFile, temporaryFile)
+
+    try:
+        replace_cache_file(checkpointFile, link_checkpoint_file)
+    except OSError:
+        try:
+            replace_cache_file(checkpointFile, lambda temporaryFile: shutil.copyfile(projectCacheFile, temporaryFile))
+        except OSError:
+            logger.error("Unable to checkpoint %s" %projectCacheFile)
+
+#-------------------------------------------------------------------#
+def remove_checkpoint(requestKey):
+
+    # The report has been delivered so there is nothing left to resume
+    checkpointDirectory = os.path.join(cacheDirectory, "checkpoints", requestKey)
+
+    if os.path.exists(checkpointDirectory):
+        shutil.rmtree(checkpointDirectory, ignore_errors=True)
+        logger.info("    Checkpoint removed for request %s" %requestKey)
+
+#-------------------------------------------------------------------#
+def remove_old_checkpoints():
+
+    for checkpointDirectory in glob.glob(os.path.join(cacheDirectory, "checkpoints", "*")):
+        try:
+            if time.time() - os.path.getmtime(checkpointDirectory) > CHECKPOINTMAXAGE:
+                shutil.rmtree(checkpointDirectory, ignore_errors=True)
+                logger.info("    Removed old checkpoint %s" %checkpointDirectory)
+        except OSError:
+            pass
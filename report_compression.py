@@ -0,0 +1,141 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_compression.py
+'''
+import logging, io, zlib, gzip, lzma, collections
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+BLOCKSIZE = 1024 * 1024  # Uncompressed bytes per independently compressed block
+DICTIONARYSIZE = 32 * 1024  # Deflate window primed from the end of the previous block
+STANDALONEFORMATS = ["gzip", "xz"]
+
+#-------------------------------------------------------------------#
+class ParallelDeflateCompressor(object):
+    # A drop in replacement for a raw deflate zlib.compressobj that compresses blocks on
+    # several threads. Each block ends with a sync flush so the compressed blocks can
+    # simply be joined together into one deflate stream. zlib releases the GIL while
+    # compressing so the blocks really do run at the same time.
+
+    def __init__(self, compressionLevel, compressionThreads):
+        self.compressionLevel = compressionLevel
+        self.executor = ThreadPoolExecutor(max_workers=compressionThreads)
+        self.maxPendingBlocks = compressionThreads * 2  # Limits the memory held for blocks in progress
+        self.pendingBlocks = collections.deque()
+        self.buffer = bytearray()
+        self.dictionary = b""
+
+    def compress(self, data):
+        self.buffer += data
+
+        while len(self.buffer) >= BLOCKSIZE:
+            block = bytes(self.buffer[:BLOCKSIZE])
+            del self.buffer[:BLOCKSIZE]
+            self.submit_block(block, zlib.Z_SYNC_FLUSH)
+
+        return self.collect_blocks(wait=False)
+
+    def flush(self, mode=zlib.Z_FINISH):
+        # Like zlib, only Z_FINISH ends the stream.  The other modes return what is ready,
+        # with Z_SYNC_FLUSH and Z_FULL_FLUSH first compressing everything given so far
+        if mode == zlib.Z_NO_FLUSH:
+            return self.collect_blocks(wait=False)
+
+        self.submit_block(bytes(self.buffer), mode)
+        self.buffer = bytearray()
+
+        # Data after a full flush must not refer back to what came before it
+        if mode == zlib.Z_FULL_FLUSH:
+            self.dictionary = b""
+
+        compressedData = self.collect_blocks(wait=True)
+
+        if mode == zlib.Z_FINISH:
+            self.executor.shutdown()
+
+        return compressedData
+
+    def submit_block(self, block, flushMode):
+        self.pendingBlocks.append(self.executor.submit(compress_block, block, self.dictionary, self.compressionLevel, flushMode))
+        self.dictionary = block[-DICTIONARYSIZE:]
+
+    def collect_blocks(self, wait):
+        # Blocks are returned in order, waiting on the oldest one if too many are in progress
+        compressedBlocks = []
+
+        while self.pendingBlocks and (wait or self.pendingBlocks[0].done() or len(self.pendingBlocks) > self.maxPendingBlocks):
+            compressedBlocks.append(self.pendingBlocks.popleft().result())
+
+        return b"".join(compressedBlocks)
+
+#-------------------------------------------------------------------#
+def compress_block(block, dictionary, compressionLevel, flushMode):
+
+    if dictionary:
+        compressor = zlib.compressobj(compressionLevel, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=dictionary)
+    else:
+        compressor = zlib.compressobj(compressionLevel, zlib.DEFLATED, -zlib.MAX_WBITS)
+
+    return compressor.compress(block) + compressor.flush(flushMode)
+
+#-------------------------------------------------------------------#
+def use_parallel_compression(file_ptr, compressionLevel, compressionThreads):
+
+    # Both zipfile entries opened for writing and gzip files pass the data through
+    # a raw deflate compressor, found as _compressor and compress respectively
+    if compressionThreads <= 1 or compressionLevel == 0:
+        return file_ptr
+
+    for compressorAttribute in ["_compressor", "compress"]:
+        if getattr(file_ptr, compressorAttribute, None) is not None and hasattr(getattr(file_ptr, compressorAttribute), "flush"):
+            setattr(file_ptr, compressorAttribute, ParallelDeflateCompressor(compressionLevel, compressionThreads))
+            return file_ptr
+
+    logger.warning("Parallel compression is not available - using single threaded compression")
+
+    return file_ptr
+
+#-------------------------------------------------------------------#
+def open_standalone_file(file_ptr, standaloneFormat, compressionLevel, compressionThreads):
+
+    # Write a complete .gz or .xz file into an already open binary file
+    if standaloneFormat == "gzip":
+        compressed_ptr = gzip.GzipFile(fileobj=file_ptr, mode="wb", compresslevel=compressionLevel, mtime=0)
+        compressed_ptr = use_parallel_compression(compressed_ptr, compressionLevel, compressionThreads)
+    elif standaloneFormat == "xz":
+        compressed_ptr = lzma.LZMAFile(file_ptr, mode="wb", preset=compressionLevel)
+    else:
+        raise ValueError("Unsupported standalone compression format: %s" %standaloneFormat)
+
+    return StandaloneFile(compressed_ptr, file_ptr)
+
+#-------------------------------------------------------------------#
+class StandaloneFile(io.BufferedIOBase):
+    # Neither GzipFile nor LZMAFile close a file object they were given so close both here
+
+    def __init__(self, compressed_ptr, file_ptr):
+        self.compressed_ptr = compressed_ptr
+        self.file_ptr = file_ptr
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.compressed_ptr.write(data)
+
+    def close(self):
+        if not self.closed:
+            self.compressed_ptr.close()
+            self.file_ptr.close()
+        super().close()
+
+#-------------------------------------------------------------------#
+def get_standalone_extension(standaloneFormat):
+
+    return {"gzip" : ".gz", "xz" : ".xz"}[standaloneFormat]
@@ -0,0 +1,294 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_concurrency.py
+'''
+import logging, re, sys, threading, time, weakref
+import requests
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULTMAXCONCURRENCY = 4  # Per host ceiling if report.api.concurrency is not set
+LATENCYTOLERANCE = 2.0  # Back off once a request takes this many times the fastest seen for its endpoint
+LATENCYSLACK = 0.25  # Seconds of latency increase always allowed so fast endpoints do not back off on noise
+BACKOFFINTERVAL = 1.0  # Seconds between decreases so one slow period only halves the limit once
+MAXRETRYAFTER = 60  # Longest Retry-After pause honored in seconds
+
+controllers = {}
+controllerSettings = {"maxConcurrency" : DEFAULTMAXCONCURRENCY, "adapterClass" : None}
+controllersLock = threading.Lock()
+sessionState = {}
+
+#-------------------------------------------------------------------#
+class AdaptiveConcurrencyController(object):
+    # Limits the requests in flight to a single Code Insight server.  The limit grows
+    # by one after a full window of requests with flat latency and is halved when the
+    # latency rises or the server answers with 429 or 5xx (additive increase,
+    # multiplicative decrease) and never exceeds the configured ceiling.
+
+    def __init__(self, host, maxConcurrency):
+        self.host = host
+        self.maxConcurrency = maxConcurrency
+        self.limit = 1
+        self.inFlight = 0
+        self.successCount = 0
+        self.lastDecreaseTime = None
+        self.pausedUntil = 0
+        self.baselineLatencies = {}  # Fastest response seen for each endpoint
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while True:
+                pauseTime = self.pausedUntil - time.monotonic()
+                if pauseTime > 0:
+                    self.condition.wait(pauseTime)
+                elif self.inFlight >= self.limit:
+                    self.condition.wait()
+                else:
+                    break
+
+            self.inFlight += 1
+
+    def release(self, url, latency, statusCode, headers=None):
+        # A status code of None means the request or the transfer of its body failed
+        with self.condition:
+            self.inFlight -= 1
+
+            if statusCode is None:
+                self.decrease("connection error")
+            elif statusCode == 429 or statusCode >= 500:
+                self.pause(headers or {})
+                self.decrease("status %s" %statusCode)
+            else:
+                endpoint = get_endpoint(url)
+                baselineLatency = self.baselineLatencies.get(endpoint, latency)
+                self.baselineLatencies[endpoint] = min(baselineLatency, latency)
+
+                if latency > baselineLatency * LATENCYTOLERANCE + LATENCYSLACK:
+                    self.decrease("latency %.2fs against %.2fs for %s" %(latency, baselineLatency, endpoint))
+                else:
+                    self.increase()
+
+            self.condition.notify_all()
+
+    def increase(self):
+        self.successCount += 1
+
+        if self.successCount >= self.limit and self.limit < self.maxConcurrency:
+            self.limit += 1
+            self.successCount = 0
+            logger.info("API concurrency for %s increased to %s" %(self.host, self.limit))
+
+    def decrease(self, reason):
+        self.successCount = 0
+
+        # Responses already in flight during a slow period should not keep halving the limit
+        if self.lastDecreaseTime is not None and time.monotonic() - self.lastDecreaseTime < BACKOFFINTERVAL:
+            return
+
+        self.lastDecreaseTime = time.monotonic()
+        if self.limit > 1:
+            self.limit = max(1, self.limit // 2)
+            logger.info("API concurrency for %s decreased to %s (%s)" %(self.host, self.limit, reason))
+        else:
+            logger.info("API concurrency for %s remains at 1 (%s)" %(self.host, reason))
+
+    def pause(self, headers):
+        # Honor a Retry-After given in seconds before sending anything else to the server
+        try:
+            retryAfter = min(float(headers.get("Retry-After", 0)), MAXRETRYAFTER)
+        except ValueError:
+            return
+
+        if retryAfter > 0:
+            logger.info("API requests to %s paused for %s seconds" %(self.host, retryAfter))
+            self.pausedUntil = max(self.pausedUntil, time.monotonic() + retryAfter)
+
+#-------------------------------------------------------------------#
+class RequestSlot(object):
+    # A request holds its place with the controller until its body has been read or
+    # the response is closed, so a streamed response counts as in flight while it is
+    # being transferred.  The latency used to adapt the limit is the time to the headers
+
+    def __init__(self, controller, url, latency, response):
+        self.controller = controller
+        self.url = url
+        self.latency = latency
+        self.statusCode = response.status_code
+        self.headers = response.headers
+        self.lock = threading.Lock()
+        self.released = False
+
+    def release(self, transferFailed=False):
+        with self.lock:
+            if self.released:
+                return
+            self.released = True
+
+        self.controller.release(self.url, self.latency, None if transferFailed else self.statusCode, self.headers)
+
+#-------------------------------------------------------------------#
+class AdaptiveHTTPAdapter(requests.adapters.HTTPAdapter):
+    # Mounted on the report session so every request the report and the common helpers
+    # make passes through the controller for the host
+
+    def send(self, request, **kwargs):
+        controller = get_controller(request.url)
+        controller.acquire()
+        startTime = time.monotonic()
+
+        try:
+            response = super().send(request, **kwargs)
+        except:
+            controller.release(request.url, None, None)
+            raise
+
+        hold_slot_until_read(response, RequestSlot(controller, request.url, time.monotonic() - startTime, response))
+
+        return response
+
+#-------------------------------------------------------------------#
+def hold_slot_until_read(response, requestSlot):
+
+    # The body is read after the adapter returns, even without stream=True, so the
+    # slot is released once it has all been read, the response is closed or the
+    # response is discarded without either
+    iter_content = response.iter_content
+    close = response.close
+
+    def releasing_iter_content(*args, **kwargs):
+        try:
+            yield from iter_content(*args, **kwargs)
+        except:
+            requestSlot.release(transferFailed=True)
+            raise
+        requestSlot.release()
+
+    def releasing_close():
+        try:
+            close()
+        finally:
+            requestSlot.release()
+
+    response.iter_content = releasing_iter_content
+    response.close = releasing_close
+    weakref.finalize(response, requestSlot.release)
+
+#-------------------------------------------------------------------#
+class SessionRequests(object):
+    # Stands in for the requests module within the common helpers so the requests they
+    # make go through the report session like the report's own.  Anything other than
+    # making a request (exceptions, status codes) comes from the requests module itself
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+    def request(self, method, url, **kwargs):
+        return get_session().request(method, url, **kwargs)
+
+    def get(self, url, params=None, **kwargs):
+        return get_session().get(url, params=params, **kwargs)
+
+    def options(self, url, **kwargs):
+        return get_session().options(url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return get_session().head(url, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+        return get_session().post(url, data=data, json=json, **kwargs)
+
+    def put(self, url, data=None, **kwargs):
+        return get_session().put(url, data=data, **kwargs)
+
+    def patch(self, url, data=None, **kwargs):
+        return get_session().patch(url, data=data, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return get_session().delete(url, **kwargs)
+
+#-------------------------------------------------------------------#
+def route_helper_requests(packageName="common"):
+
+    # The common helpers call requests directly, so each of their modules is given the
+    # stand in above.  Every request they make is then limited by the controller, which
+    # sees its real status code and Retry-After header
+    sessionRequests = SessionRequests()
+    routedModules = 0
+
+    for moduleName, module in list(sys.modules.items()):
+        if moduleName != packageName and not moduleName.startswith(packageName + "."):
+            continue
+
+        if getattr(module, "requests", None) is requests:
+            module.requests = sessionRequests
+            routedModules += 1
+
+    logger.info("Routed the requests of %s %s module(s) through the report session" %(routedModules, packageName))
+
+#-------------------------------------------------------------------#
+def install_adaptive_concurrency(maxConcurrency):
+
+    maxConcurrency = max(1, int(maxConcurrency))
+    logger.info("Limiting API requests to %s in flight per server" %maxConcurrency)
+
+    controllerSettings["maxConcurrency"] = maxConcurrency
+
+    # A new session so the connection pool is sized for the limit and nothing is
+    # shared with a session inherited from a parent process
+    mount_adapter(AdaptiveHTTPAdapter)
+    route_helper_requests()
+
+    return maxConcurrency
+
+#-------------------------------------------------------------------#
+def mount_adapter(adapterClass):
+
+    controllerSettings["adapterClass"] = adapterClass
+
+    with controllersLock:
+        previousSession = sessionState.pop("session", None)
+
+    if previousSession is not None:
+        previousSession.close()
+
+#-------------------------------------------------------------------#
+def get_session():
+    # One session for the process so the requests of all of its threads and reports
+    # share a connection pool.  Nothing outside the report uses its adapter
+
+    with controllersLock:
+        if "session" not in sessionState:
+            adapterClass = controllerSettings["adapterClass"] or AdaptiveHTTPAdapter
+            adapter = adapterClass(pool_maxsize=controllerSettings["maxConcurrency"])
+
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            sessionState["session"] = session
+
+        return sessionState["session"]
+
+#-------------------------------------------------------------------#
+def get_controller(url):
+
+    host = urlparse(url).netloc
+
+    with controllersLock:
+        if host not in controllers:
+            controllers[host] = AdaptiveConcurrencyController(host, controllerSettings["maxConcurrency"])
+
+        return controllers[host]
+
+#-------------------------------------------------------------------#
+def get_endpoint(url):
+
+    # Other IDs are removed so requests for the same kind of item share a latency
+    # baseline, but each project keeps its own since project sizes differ so widely
+    return re.sub(r"(?<!/projects)/\d+", "/{id}", urlparse(url).path)
@@ -8,44 +8,75 @@ Created On : Tue Aug 29 2023
 File : report_data.py
 '''
 
-import logging, unicodedata, uuid, re, hashlib
+import logging, unicodedata, uuid, re, hashlib, itertools
+from concurrent.futures import ThreadPoolExecutor
 import common.application_details
 import common.project_heirarchy
 import common.api.project.get_project_inventory
 import SPDX_license_mappings, purl
 import report_data_files
+import report_cache
+import report_parallel
+import report_store
+import report_budget
 
 logger = logging.getLogger(__name__)
 
+# The inventory item fields used to create the report
+INVENTORYFIELDS = ["id", "type", "name", "componentId", "componentName", "componentVersionName", "componentForgeName", "componentUrl", "purl",
+                   "customFields", "possibleLicenses", "selectedLicenseSPDXIdentifier", "selectedLicenseName", "copyrights", "filePaths", "dependencyScope"]
+
 #-------------------------------------------------------------------#
 def gather_data_for_report(baseURL, projectID, authToken, reportData):
     logger.info("Entering gather_data_for_report")
 
-    SPDXIDPackageNamePattern = r"[^a-zA-Z0-9\-\.]"  # PackageName is a unique string containing letters, numbers, ., and/or - so get rid of the rest
     reportDetails={}
     packages = []
-    #packageFiles = {} # Needed for tag/value format since files needed to be inline with packages
     hasExtractedLicensingInfos = {}
-    relationships = []
-    files = []
-    filesNotInInventory = []
-    filePathsNotInInventoryToID = {}
-    projectCopyrights = []
+    projectCopyrights = {}  # dict used as an ordered set
+
+    # The file level data can be held in a report store on disk for very large projects
+    reportStore = reportData.get("reportStore")
+    relationships = report_store.create_list(reportStore)
+    files = report_store.create_list(reportStore)
+    filesNotInInventory = report_store.create_list(reportStore)
+    filePathsNotInInventoryToID = report_store.create_dict(reportStore)
+
+    # Track what has already been added to avoid linear scans of the lists above
+    packagesBySPDXID = {}
+    fileSPDXIDs = report_store.create_set(reportStore)
+    filesNotInInventoryIDs = report_store.create_set(reportStore)
+    packageRelationships = set()
+    gatheredProjectIDs = set()
+
+    # Content may be left out if the report would not finish within its time budget
+    report_budget.start_time_budget(reportData)
+
+    # The evidence of each distinct file content, normalized once for all projects in the report
+    if reportData["reportOptions"].get("deduplicateFiles", False):
+        reportData["normalizedFileEvidence"] = report_store.create_dict(reportStore)
 
     reportOptions = reportData["reportOptions"]
     releaseVersion = reportData["releaseVersion"]
 
     # Parse report options
     includeChildProjects = reportOptions["includeChildProjects"]  # True/False
-    includeNonRuntimeInventory = reportOptions["includeNonRuntimeInventory"]  # True/False
     includeFileDetails = reportOptions["includeFileDetails"]  # True/False
     includeUnassociatedFiles = reportOptions["includeUnassociatedFiles"]  # True/False
     createOtherFilesPackage = reportOptions["createOtherFilesPackage"]  # True/False
     includeCopyrightsData = reportOptions["includeCopyrightsData"] # True/False
+    useHasFiles = reportOptions.get("useHasFiles", False)  # True/False
 
-    applicationDetails = common.application_details.determine_application_details(projectID, baseURL, authToken)
+    # The application details may have already been collected along with the other startup details
+    if "applicationDetails" in reportData:
+        applicationDetails = reportData["applicationDetails"]
+    else:
+        applicationDetails = common.application_details.determine_application_details(projectID, baseURL, authToken)
     documentName = applicationDetails["applicationDocumentString"].replace(" ", "_")
-    projectList = common.project_heirarchy.create_project_heirarchy(baseURL, authToken, projectID, includeChildProjects)
+    if "projectList" in reportData:
+        projectList = reportData["projectList"]
+    else:
+        projectList = common.project_heirarchy.create_project_heirarchy(baseURL, authToken, projectID, includeChildProjects)
     topLevelProjectName = projectList[0]["projectName"]
 
     SPDXVersion = "SPDX-2.2"
@@ -71,6 +102,7 @@ def gather_data_for_report(baseURL, projectID, authToken, reportData):
     
 
     packages.append(packageDetails)
+    packagesBySPDXID[rootSPDXID] = packageDetails
 
     # Manange the relationship for this top level package
     packageRelationship = {}
@@ -78,259 +110,128 @@ def gather_data_for_report(baseURL, projectID, authToken, reportData):
     packageRelationship["relationshipType"] = "DESCRIBES"
     packageRelationship["relatedSpdxElement"] = rootSPDXID
     
-    if packageRelationship not in relationships:
-        relationships.append(packageRelationship)
+    relationships.append(packageRelationship)
+    packageRelationships.add((documentSPDXID, "DESCRIBES", rootSPDXID))
+
+    # Request the inventory of every project not already collected at startup or for the freshness check up front
+    if reportData.get("apiConcurrency", 1) > 1:
+        prefetch_project_inventories(baseURL, authToken, reportData, projectList)
+
+    report_budget.set_project_weights(reportData, projectList)
 
     #  Gather the details for each project and summerize the data
     for project in projectList:
         projectID = project["projectID"]
         projectName = project["projectName"]
 
-        print("        Collect data for project: %s" %projectName)
-
-        if includeFileDetails:
-
-            # Collect file level details for files associated to this project
-            print("            Collect file level details.")
-            logger.info("            Collect file level details.")
-            filePathtoID, projectFileDetails, hasExtractedLicensingInfos = report_data_files.manage_file_details(baseURL, authToken, projectID, hasExtractedLicensingInfos, includeUnassociatedFiles, includeCopyrightsData)
+        # Make sure a child project is only added once in case it has many parents
+        if projectID in gatheredProjectIDs:
+            continue
+        gatheredProjectIDs.add(projectID)
 
-            # Create a full list of filename to ID mappings for non inventory items
-            if includeUnassociatedFiles:
-                filePathsNotInInventoryToID.update(filePathtoID["notInInventory"])
-
-            print("            File level details for project has been collected")
-            logger.info("            File level details for project has been collected")
+        print("        Collect data for project: %s" %projectName)
 
-        print("            Collect inventory details.")
-        logger.info("            Collect inventory details")
-        if includeCopyrightsData: 
-            projectInventory = common.api.project.get_project_inventory.get_project_inventory_details_with_copyrights(baseURL, projectID, authToken)
+        # Has this project been processed with the same data and options by a previous report?
+        # Not used with a report store since the cached data would be loaded into memory
+        projectDataKey = None
+        projectData = None
+        if projectID in reportData.get("projectStates", {}) and reportStore is None:
+            projectDataKey = create_project_data_fingerprint(projectID, reportData)
+            projectData = report_cache.load_project_data(projectID, projectDataKey, reportData.get("checkpointDirectory"))
+
+        if projectData is not None:
+            print("            Project data has not changed - using previously processed data")
+            logger.info("            Using cached project data for project %s" %projectID)
         else:
-            projectInventory = common.api.project.get_project_inventory.get_project_inventory_details_without_vulnerabilities(baseURL, projectID, authToken)   
-        inventoryItems = projectInventory["inventoryItems"]
-        print("            Inventory has been collected.")
-        logger.info("            Inventory has been collected.")      
-
-        for inventoryItem in inventoryItems:
-            supplier = None # Set a default value to compare with
-            inventoryType = inventoryItem["type"]
-
-            # Check to see if this is a runtime dependency or not (added in 2023R3)
-            if "dependencyScope" in inventoryItem:              
-                if inventoryItem["dependencyScope"] == "Non Runtime":
-                    # This is a non runtime dependency so should it be included or not?
-                    if not includeNonRuntimeInventory:
-                        continue
-
-
-            externalRefs = []  # For now just holds the purl but in the future could hold more items
-
-            inventoryID = inventoryItem["id"]
-
-            # See if there is a custom filed at the inventory level for the "Package Supplier"
-            if "customFields" in inventoryItem:
-                customFields = inventoryItem["customFields"]
-
-                # See if the custom project fields were populated for this inventory item
-                for customField in customFields:
+            degradationCount = len(report_budget.get_degradations(reportData))
+            projectData = gather_project_data(baseURL, authToken, projectID, reportData)
 
-                    # Is there the reqired custom field available?
-                    if customField["fieldLabel"] == "Package Supplier":
-                        if customField["value"] is not None and customField["value"] != "":
-                            supplier = customField["value"]
-            
-
-            if inventoryType != "Component":
-                name =  inventoryItem["name"].split("(")[0] # Get rid of ( SPDX ID ) from name
-                SPDXIDPackageName = name + "-" + str(inventoryID)  # Inventory ensure the value is unique
-                SPDXIDPackageName = re.sub(SPDXIDPackageNamePattern, "-", SPDXIDPackageName)          # Remove special characters
-                componentName = name
+            # Data collected while content was being left out does not match the key
+            if len(report_budget.get_degradations(reportData)) == degradationCount:
+                report_cache.save_project_data(projectID, projectDataKey, projectData, reportData.get("checkpointDirectory"))
 
-                if supplier is None:
-                    supplier = "Organization: Various, People: Various" 
+        hasExtractedLicensingInfos = merge_extracted_licensing_infos(hasExtractedLicensingInfos, projectData["extractedLicensingInfos"])
+        filePathsNotInInventoryToID.update(projectData["filePathsNotInInventoryToID"])
 
-            else:
-                componentName = inventoryItem["componentName"].strip()
-                versionName = str(inventoryItem["componentVersionName"]).strip()
-                SPDXIDPackageName = componentName + "-" + versionName + "-" + str(inventoryID)  # Inventory ensure the value is unique
-                SPDXIDPackageName = re.sub(SPDXIDPackageNamePattern, "-", SPDXIDPackageName)          # Remove special characters
-
-                forge = inventoryItem["componentForgeName"]
-
-                ##########################################
-                # Create supplier string from forge and component 
-                if supplier is None:
-                    supplier = create_supplier_string(forge, componentName)
-
-                # Manage the purl value - 2024R1 added purl in response
-                if reportData["releaseVersion"] > "2024R1":
-                    purlString = inventoryItem["purl"]
-                    if purlString == "N/A":
-                        purlString = ""
-                else:
-                    try:
-                        purlString = purl.get_purl_string(inventoryItem, baseURL, authToken)
-                    except:
-                        logger.warning("Unable to create purl string for inventory item %s." %SPDXIDPackageName)
-                        purlString = ""
-
-                if "@" in purlString:
-                    perlRef = {}
-                    perlRef["referenceCategory"] = "PACKAGE-MANAGER"
-                    perlRef["referenceLocator"] = purlString
-                    perlRef["referenceType"] = "purl"
-                    externalRefs.append(perlRef)    
-
-            # Common for Components and License Only items
-            packageSPDXID = "SPDXRef-Pkg-" + SPDXIDPackageName
-            
-            # Manage the homepage value
-            if inventoryItem["componentUrl"] not in ["", "N/A", "NA", None]:
-                homepage = inventoryItem["componentUrl"]
-            else:
-                homepage = "NOASSERTION"
-    
-            ##########################################
-            # Manage Declared Licenses - These are the "possible" license based on data collection
-            declaredLicenses, hasExtractedLicensingInfos = manage_package_declared_licenses(inventoryItem, hasExtractedLicensingInfos)
+        for packageEntry in projectData["packages"]:
+            packageDetails = packageEntry["packageDetails"]
+            packageSPDXID = packageDetails["SPDXID"]
 
-            ##########################################
-            # Manage Concluded license
-            concludedLicense, hasExtractedLicensingInfos = manage_package_concluded_license(inventoryItem, hasExtractedLicensingInfos)
-    
-            packageDetails = {}
-            packageDetails["SPDXID"] = packageSPDXID
-            packageDetails["name"] = componentName
-
-            if inventoryType == "Component":
-                packageDetails["versionInfo"] = versionName
-
-            if externalRefs:
-                packageDetails["externalRefs"] = externalRefs
-            packageDetails["homepage"] = homepage
-            packageDetails["downloadLocation"] = "NOASSERTION"  # TODO - use a inventory custom field to store this?
-            packageDetails["copyrightText"] = (process_copyrights(inventoryItem["copyrights"]) if includeCopyrightsData else "NOASSERTION")
-            packageDetails["licenseDeclared"] = declaredLicenses
-            packageDetails["licenseConcluded"] = concludedLicense
-            packageDetails["supplier"] = supplier
-
-            # Manage file details related to this package
-            filePaths = inventoryItem["filePaths"]
-            
             # Manange the relationship for this pacakge to the root item
             packageRelationship = {}
             packageRelationship["spdxElementId"] = packageSPDXID
             packageRelationship["relationshipType"] = "PACKAGE_OF"
             packageRelationship["relatedSpdxElement"] = rootSPDXID
             
-            if packageRelationship not in relationships:
+            if (packageSPDXID, "PACKAGE_OF", rootSPDXID) not in packageRelationships:
                 relationships.append(packageRelationship)
+                packageRelationships.add((packageSPDXID, "PACKAGE_OF", rootSPDXID))
 
+            relationships.extend(packageEntry["fileRelationships"])
 
-            # Are there any files assocaited to this inventory item?
-            if len(filePaths) == 0 or not includeFileDetails: 
-                packageDetails["filesAnalyzed"] = False
-            else:
-                packageDetails["filesAnalyzed"] = True
-
-                #packageFiles[packageSPDXID] = [] # Create array to hold all required file data for tag/value report
-
-                licenseInfoFromFiles = []
-                fileHashes = []
-                for filePath in filePaths:
-                    if filePath in filePathtoID["inInventory"]:
-                        uniqueFileID = filePathtoID["inInventory"][filePath]["uniqueFileID"]
-                        fileHashes.append(filePathtoID["inInventory"][filePath]["fileSHA1"])
-                    elif filePath in filePathtoID["notInInventory"]:
-                        uniqueFileID = filePathtoID["notInInventory"][filePath]["uniqueFileID"]
-                        logger.critical("File path associated to inventory but not according to file details response!!")
-                        logger.critical("    File ID: %s   File Path: %s" %(uniqueFileID, filePath))
-
-                        fileHashes.append(filePathtoID["notInInventory"][filePath]["fileSHA1"])
-                    else:
-                        logger.critical("File path does not seem to be in or out of inventory!!")
-                        logger.critical("    File Path: %s" %(filePath))
-                        continue
-                    
-                    fileDetail = projectFileDetails[uniqueFileID]
-                    fileSPDXID = fileDetail["SPDXID"]
-
-                    #packageFiles[packageSPDXID].append(fileDetail) # add for tag/value output
-                    # See if the file has alrady been added for another package or not for json output
-                    if fileDetail not in files:   
-                        files.append(fileDetail)  # add for json output
-
-                    # Define the relationship of the file to the package
-                    fileRelationship = {}
-                    fileRelationship["spdxElementId"] = packageSPDXID
-                    fileRelationship["relationshipType"] = "CONTAINS"
-                    fileRelationship["relatedSpdxElement"] = fileSPDXID
-                    relationships.append(fileRelationship)
+            if packageSPDXID not in packagesBySPDXID:
+                packages.append(packageDetails)
+                packagesBySPDXID[packageSPDXID] = packageDetails
+            elif "hasFiles" in packageDetails:
+                # The files are listed on the package itself so combine them with those already added
+                addedPackageDetails = packagesBySPDXID[packageSPDXID]
+                hasFiles = addedPackageDetails.setdefault("hasFiles", [])
+                addedFileSPDXIDs = set(hasFiles)
+                hasFiles.extend(fileSPDXID for fileSPDXID in packageDetails["hasFiles"] if fileSPDXID not in addedFileSPDXIDs)
 
-                    # Surfaces the file level evidence to the assocaited package
-                    licenseInfoFromFiles = licenseInfoFromFiles + fileDetail["licenseInfoInFiles"]
-    
-                # Create a hash of the file hashes for PackageVerificationCode 
-                try:
-                    stringHash = ''.join(sorted(fileHashes))
-                except:
-                    logger.error("Failure sorting file hashes for %s" %SPDXIDPackageName)
-                    logger.debug(stringHash)
-                    stringHash = ''.join(fileHashes)
-                
-                packageVerificationCodeValue = (hashlib.sha1(stringHash.encode('utf-8'))).hexdigest()
+        # See if the file has alrady been added by another project or not for json output
+        for fileDetail in projectData["files"]:
+            if fileDetail["SPDXID"] not in fileSPDXIDs:
+                files.append(fileDetail)
+                fileSPDXIDs.add(fileDetail["SPDXID"])
 
-                # Was there any file level information
-                if len(licenseInfoFromFiles) == 0 :
-                    licenseInfoFromFiles = ["NOASSERTION"]
-                else:
-                    licenseInfoFromFiles = sorted(list(dict.fromkeys(licenseInfoFromFiles)))
-                
-                packageDetails["licenseInfoFromFiles"] = licenseInfoFromFiles
-                packageDetails["packageVerificationCode"] = {}
-                packageDetails["packageVerificationCode"]["packageVerificationCodeValue"] = packageVerificationCodeValue
-            
-            if packageDetails not in packages:
-                packages.append(packageDetails)
-            
-            # Collect copyrights for project
-            if includeCopyrightsData:
-                projectCopyrights = list(set(projectCopyrights) | set(inventoryItem["copyrights"]))
+        for fileDetail in projectData["filesNotInInventory"]:
+            if fileDetail["SPDXID"] not in filesNotInInventoryIDs:
+                filesNotInInventory.append(fileDetail)
+                filesNotInInventoryIDs.add(fileDetail["SPDXID"])
 
-    
-        # See if there are any files that are not contained in inventory
-        if includeFileDetails:
-            # Manage the items from this project that were not associated to inventory
-            for filePath in filePathtoID["notInInventory"]:
-                uniqueFileID = filePathtoID["notInInventory"][filePath]["uniqueFileID"]
+        projectCopyrights.update(dict.fromkeys(projectData["projectCopyrights"]))
+
+        report_budget.check_time_budget(reportData, projectID)
+
+    # With content addressed file IDs a file associated to inventory in one project and not
+    # in another has the same SPDXID in both lists.  It is only kept with the associated files
+    if reportOptions.get("deduplicateFiles", False):
+        filesNotInInventory = remove_associated_files(filesNotInInventory, fileSPDXIDs, reportStore)
 
-                # Make sure it's only being added once in case a child project has many parents
-                if projectFileDetails[uniqueFileID] not in filesNotInInventory:
-                    filesNotInInventory.append(projectFileDetails[uniqueFileID])
+    # Last chance to reduce the content before the documents are written
+    report_budget.check_time_budget(reportData)
 
+    if report_budget.get_degradations(reportData):
+        includeFileDetails = reportOptions["includeFileDetails"]
+        includeUnassociatedFiles = reportOptions["includeUnassociatedFiles"]
+        includeCopyrightsData = reportOptions["includeCopyrightsData"]
+
+        # Projects collected before the content was reduced still have the details left out
+        relationships, files, filesNotInInventory = remove_degraded_details(packages, relationships, files, filesNotInInventory, reportOptions, reportStore)
 
     ##############################
     if includeFileDetails and includeUnassociatedFiles and len(filesNotInInventory) > 0:
-        unassociatedFilesPackage, unassociatedFilesRelationships = manage_unassociated_files(filesNotInInventory, filePathsNotInInventoryToID, rootSPDXID, createOtherFilesPackage, projectCopyrights, includeCopyrightsData)
+        unassociatedFilesPackage, unassociatedFilesRelationships = manage_unassociated_files(filesNotInInventory, filePathsNotInInventoryToID, rootSPDXID, createOtherFilesPackage, projectCopyrights, includeCopyrightsData, useHasFiles)
 
         if unassociatedFilesPackage["SPDXID"] == rootSPDXID:
             # Since this is the top level pacakge we need to update a few things for the package
             packages[0].pop("filesAnalyzed")
             packages[0]["licenseInfoFromFiles"] = unassociatedFilesPackage["licenseInfoFromFiles"]
             packages[0]["packageVerificationCode"] = unassociatedFilesPackage["packageVerificationCode"]
+            if useHasFiles:
+                packages[0]["hasFiles"] = unassociatedFilesPackage["hasFiles"]
         else:
             packages.append(unassociatedFilesPackage)
 
-        relationships= relationships + unassociatedFilesRelationships
-        files = files + filesNotInInventory
-        #packageFiles[unassociatedFilesPackage["SPDXID"]] = filesNotInInventory # add for tag/value output
+        relationships.extend(unassociatedFilesRelationships)
+        files.extend(filesNotInInventory)
 
     # Grabbing Copyrights in Package is Copyright in associated files and unassociated files in inventory
     if includeCopyrightsData:
         for item in packages:
             if item["copyrightText"] == "NOASSERTION":
-                item["copyrightText"] = process_copyrights(projectCopyrights)
+                item["copyrightText"] = process_copyrights(list(projectCopyrights))
 
     # Clean up the hasExtractedLicensingInfos comment field to remove the array and make a string
     for extractedLicense in hasExtractedLicensingInfos:
@@ -348,21 +249,533 @@ def gather_data_for_report(baseURL, projectID, authToken, reportData):
     reportDetails["dataLicense"] = dataLicense
     reportDetails["documentNamespace"] = documentNamespace
 
+    if report_budget.get_degradations(reportData):
+        reportDetails["comment"] = report_budget.create_degradation_comment(reportData)
+
     reportDetails["hasExtractedLicensingInfos"] = list(hasExtractedLicensingInfos.values())  # remove the keys since not needed
     reportDetails["packages"] = packages
     
     if includeFileDetails:
         reportDetails["files"] = files
 
+        # Needed for tag/value format since files are written inline with their packages
+        reportData["packageFiles"] = create_package_files_index(files, packages, relationships, reportStore)
+
     reportDetails["relationships"] = relationships
 
     reportData["topLevelProjectName"] = topLevelProjectName
     reportData["reportDetails"] = reportDetails
     reportData["projectList"] = projectList
-    #reportData["packageFiles"] = packageFiles
+    reportData.pop("normalizedFileEvidence", None)  # Only needed while collecting the project data
 
     return reportData
 
+#-------------------------------------------------------------------#
+def gather_project_data(baseURL, authToken, projectID, reportData):
+
+    # Everything collected for a single project.  None of it depends on the parent
+    # project so it can be cached and reused in any report that includes the project
+    reportStore = reportData.get("reportStore")
+    packages = []
+    files = report_store.create_list(reportStore)
+    filesNotInInventory = report_store.create_list(reportStore)
+    filePathsNotInInventoryToID = report_store.create_dict(reportStore)
+    extractedLicensingInfos = {}
+    projectCopyrights = {}  # dict used as an ordered set
+    fileSPDXIDs = report_store.create_set(reportStore)
+
+    reportOptions = reportData["reportOptions"]
+    includeNonRuntimeInventory = reportOptions["includeNonRuntimeInventory"]  # True/False
+    includeFileDetails = reportOptions["includeFileDetails"]  # True/False
+    includeCopyrightsData = reportOptions["includeCopyrightsData"] # True/False
+    useHasFiles = reportOptions.get("useHasFiles", False)  # True/False
+
+    fetchPlan = create_fetch_plan(reportOptions)
+    logger.info("            Fetch plan: %s" %fetchPlan)
+
+    print("            Collect inventory details.")
+    logger.info("            Collect inventory details")
+    # The inventory may have already been collected when checking if the report was current
+    if projectID in reportData.get("projectInventories", {}):
+        projectInventory = reportData["projectInventories"][projectID]
+    else:
+        projectInventory = get_project_inventory(baseURL, projectID, authToken, fetchPlan["inventoryCopyrights"], fetchPlan["nonRuntimeInventory"])
+    inventoryItems = projectInventory["inventoryItems"]
+    print("            Inventory has been collected.")
+    logger.info("            Inventory has been collected.")      
+
+    # The file level data may need to be left out if the project will take too long
+    report_budget.check_time_budget(reportData, projectID, "inventory")
+    includeFileDetails = reportOptions["includeFileDetails"]
+    includeCopyrightsData = reportOptions["includeCopyrightsData"]
+    fetchPlan = create_fetch_plan(reportOptions)
+
+    # Package entries created for this project by a previous run
+    cachedInventoryItems = report_cache.load_inventory_cache(projectID)
+    currentInventoryItems = {}
+    reusedInventoryItems = 0
+
+    includedInventoryItems = []
+    changedInventoryItems = []
+
+    for inventoryItem in inventoryItems:
+
+        # Check to see if this is a runtime dependency or not (added in 2023R3)
+        if "dependencyScope" in inventoryItem:              
+            if inventoryItem["dependencyScope"] == "Non Runtime":
+                # This is a non runtime dependency so should it be included or not?
+                if not includeNonRuntimeInventory:
+                    continue
+
+
+        inventoryID = str(inventoryItem["id"])
+        inventoryFingerprint = create_inventory_fingerprint(inventoryItem, reportData)
+        includedInventoryItems.append((inventoryItem, inventoryID, inventoryFingerprint))
+
+        # Reuse the package entry from the previous run if the inventory item has not changed
+        if inventoryID in cachedInventoryItems and cachedInventoryItems[inventoryID]["fingerprint"] == inventoryFingerprint:
+            reusedInventoryItems += 1
+        else:
+            changedInventoryItems.append(inventoryItem)
+
+    if fetchPlan["scannedFiles"]:
+
+        # Only the files of the included inventory items (and the unassociated files if wanted) are kept
+        requiredFilePaths = set()
+        for inventoryItem, inventoryID, inventoryFingerprint in includedInventoryItems:
+            requiredFilePaths.update(inventoryItem["filePaths"])
+
+        # Collect file level details for files associated to this project
+        print("            Collect file level details.")
+        logger.info("            Collect file level details.")
+        filePathtoID, projectFileDetails, extractedLicensingInfos = report_data_files.manage_file_details(baseURL, authToken, projectID, extractedLicensingInfos, fetchPlan["unassociatedFiles"], includeCopyrightsData, reportStore, reportData.get("transformProcesses", 1), requiredFilePaths, reportData.get("normalizedFileEvidence"))
+
+        # Create a full list of filename to ID mappings for non inventory items
+        if fetchPlan["unassociatedFiles"]:
+            filePathsNotInInventoryToID.update(filePathtoID["notInInventory"])
+
+        print("            File level details for project has been collected")
+        logger.info("            File level details for project has been collected")
+
+        report_budget.check_time_budget(reportData, projectID, "scannedFiles")
+
+    # Creating the package entries is independent for each item so it can be spread over processes.
+    # Releases up to 2024R1 look up the purl on the server so those stay in this process
+    transformProcesses = reportData.get("transformProcesses", 1) if reportData["releaseVersion"] > "2024R1" else 1
+    packageDetailsReportData = {"reportOptions" : reportOptions, "releaseVersion" : reportData["releaseVersion"]}
+    createdPackageDetails = report_parallel.map_items(create_package_details, changedInventoryItems, transformProcesses, baseURL, authToken, packageDetailsReportData)
+    createdPackageDetails = iter(createdPackageDetails)  # Returned in the same order as changedInventoryItems
+
+    for inventoryItem, inventoryID, inventoryFingerprint in includedInventoryItems:
+
+        if inventoryID in cachedInventoryItems and cachedInventoryItems[inventoryID]["fingerprint"] == inventoryFingerprint:
+            inventoryItemDetails = cachedInventoryItems[inventoryID]
+        else:
+            packageDetails, itemExtractedLicensingInfos = next(createdPackageDetails)
+
+            inventoryItemDetails = {}
+            inventoryItemDetails["fingerprint"] = inventoryFingerprint
+            inventoryItemDetails["packageDetails"] = packageDetails
+            inventoryItemDetails["extractedLicensingInfos"] = itemExtractedLicensingInfos
+
+        currentInventoryItems[inventoryID] = inventoryItemDetails
+
+        # Copy since the file details are added to the package below
+        packageDetails = dict(inventoryItemDetails["packageDetails"])
+        packageSPDXID = packageDetails["SPDXID"]
+        extractedLicensingInfos = merge_extracted_licensing_infos(extractedLicensingInfos, inventoryItemDetails["extractedLicensingInfos"])
+
+        # Manage file details related to this package
+        filePaths = inventoryItem["filePaths"]
+        fileRelationships = report_store.create_list(reportStore)
+
+        # Are there any files assocaited to this inventory item?
+        if len(filePaths) == 0 or not includeFileDetails: 
+            packageDetails["filesAnalyzed"] = False
+        else:
+            packageDetails["filesAnalyzed"] = True
+
+            licenseInfoFromFiles = []
+            fileHashes = []
+            hasFiles = []
+            for filePath in filePaths:
+                if filePath in filePathtoID["inInventory"]:
+                    uniqueFileID = filePathtoID["inInventory"][filePath]["uniqueFileID"]
+                    fileHashes.append(filePathtoID["inInventory"][filePath]["fileSHA1"])
+                elif filePath in filePathtoID["notInInventory"]:
+                    uniqueFileID = filePathtoID["notInInventory"][filePath]["uniqueFileID"]
+                    logger.critical("File path associated to inventory but not according to file details response!!")
+                    logger.critical("    File ID: %s   File Path: %s" %(uniqueFileID, filePath))
+
+                    fileHashes.append(filePathtoID["notInInventory"][filePath]["fileSHA1"])
+                else:
+                    logger.critical("File path does not seem to be in or out of inventory!!")
+                    logger.critical("    File Path: %s" %(filePath))
+                    continue
+                
+                fileDetail = projectFileDetails[uniqueFileID]
+                fileSPDXID = fileDetail["SPDXID"]
+
+                # See if the file has alrady been added for another package or not for json output
+                if fileSPDXID not in fileSPDXIDs:
+                    files.append(fileDetail)  # add for json output
+                    fileSPDXIDs.add(fileSPDXID)
+
+                # Define the relationship of the file to the package
+                if useHasFiles:
+                    hasFiles.append(fileSPDXID)
+                else:
+                    fileRelationship = {}
+                    fileRelationship["spdxElementId"] = packageSPDXID
+                    fileRelationship["relationshipType"] = "CONTAINS"
+                    fileRelationship["relatedSpdxElement"] = fileSPDXID
+                    fileRelationships.append(fileRelationship)
+
+                # Surfaces the file level evidence to the assocaited package
+                licenseInfoFromFiles.extend(fileDetail["licenseInfoInFiles"])
+
+            # Create a hash of the file hashes for PackageVerificationCode 
+            try:
+                stringHash = ''.join(sorted(fileHashes))
+            except:
+                logger.error("Failure sorting file hashes for %s" %packageSPDXID)
+                logger.debug(stringHash)
+                stringHash = ''.join(fileHashes)
+            
+            packageVerificationCodeValue = (hashlib.sha1(stringHash.encode('utf-8'))).hexdigest()
+
+            # Was there any file level information
+            if len(licenseInfoFromFiles) == 0 :
+                licenseInfoFromFiles = ["NOASSERTION"]
+            else:
+                licenseInfoFromFiles = sorted(list(dict.fromkeys(licenseInfoFromFiles)))
+            
+            packageDetails["licenseInfoFromFiles"] = licenseInfoFromFiles
+            packageDetails["packageVerificationCode"] = {}
+            packageDetails["packageVerificationCode"]["packageVerificationCodeValue"] = packageVerificationCodeValue
+
+            # The files are listed on the package rather than as CONTAINS relationships
+            if useHasFiles:
+                packageDetails["hasFiles"] = hasFiles
+        
+        packageEntry = {}
+        packageEntry["packageDetails"] = packageDetails
+        packageEntry["fileRelationships"] = fileRelationships
+        packages.append(packageEntry)
+        
+        # Collect copyrights for project
+        if includeCopyrightsData:
+            projectCopyrights.update(dict.fromkeys(inventoryItem["copyrights"]))
+
+    logger.info("            Reused %s of %s package entries from the previous run" %(reusedInventoryItems, len(currentInventoryItems)))
+    report_cache.save_inventory_cache(projectID, currentInventoryItems)
+
+    # See if there are any files that are not contained in inventory
+    if fetchPlan["unassociatedFiles"]:
+        # Manage the items from this project that were not associated to inventory
+        for filePath in filePathtoID["notInInventory"]:
+            uniqueFileID = filePathtoID["notInInventory"][filePath]["uniqueFileID"]
+
+            filesNotInInventory.append(projectFileDetails[uniqueFileID])
+
+    projectData = {}
+    projectData["packages"] = packages
+    projectData["files"] = files
+    projectData["filesNotInInventory"] = filesNotInInventory
+    projectData["filePathsNotInInventoryToID"] = filePathsNotInInventoryToID
+    projectData["extractedLicensingInfos"] = extractedLicensingInfos
+    projectData["projectCopyrights"] = list(projectCopyrights)
+
+    return projectData
+
+#-------------------------------------------------------------------#
+def create_package_files_index(files, packages, relationships, reportStore):
+
+    # Group the files under the package that contains them using a single pass over
+    # the files and one over the package file lists and relationships.  A file contained
+    # by more than one package is only listed under the first since tag/value can only
+    # hold it once
+    fileDetailsByID = report_store.create_dict(reportStore)
+    for fileDetail in files:
+        fileDetailsByID[fileDetail["SPDXID"]] = fileDetail
+
+    packageFileIDs = ((packageDetails["SPDXID"], fileSPDXID) for packageDetails in packages for fileSPDXID in packageDetails.get("hasFiles", []))
+    containsFileIDs = ((relationship["spdxElementId"], relationship["relatedSpdxElement"]) for relationship in relationships if relationship["relationshipType"] == "CONTAINS")
+
+    packageFiles = {}
+    for packageSPDXID, fileSPDXID in itertools.chain(packageFileIDs, containsFileIDs):
+        if fileSPDXID not in fileDetailsByID:
+            continue  # A package within a package or a file already listed
+
+        if packageSPDXID not in packageFiles:
+            packageFiles[packageSPDXID] = report_store.create_list(reportStore)
+
+        packageFiles[packageSPDXID].append(fileDetailsByID.pop(fileSPDXID))
+
+    logger.info("    Grouped files under %s package(s) with %s file(s) not contained by a package" %(len(packageFiles), len(fileDetailsByID)))
+
+    # Anything left is not contained by a package and is kept under None
+    if len(fileDetailsByID) > 0:
+        packageFiles[None] = report_store.create_list(reportStore)
+        packageFiles[None].extend(fileDetailsByID.values())
+
+    return packageFiles
+
+#-------------------------------------------------------------------#
+def remove_associated_files(filesNotInInventory, fileSPDXIDs, reportStore):
+
+    unassociatedFiles = report_store.create_list(reportStore)
+    unassociatedFiles.extend(fileDetail for fileDetail in filesNotInInventory if fileDetail["SPDXID"] not in fileSPDXIDs)
+
+    if len(unassociatedFiles) < len(filesNotInInventory):
+        logger.info("    %s unassociated file(s) are associated to inventory in another project" %(len(filesNotInInventory) - len(unassociatedFiles)))
+
+    return unassociatedFiles
+
+#-------------------------------------------------------------------#
+def remove_degraded_details(packages, relationships, files, filesNotInInventory, reportOptions, reportStore):
+
+    if not reportOptions["includeFileDetails"]:
+        for packageDetails in packages:
+            packageDetails.pop("licenseInfoFromFiles", None)
+            packageDetails.pop("packageVerificationCode", None)
+            packageDetails.pop("hasFiles", None)
+            packageDetails["filesAnalyzed"] = False
+
+        # Only the package level relationships remain
+        packageRelationships = report_store.create_list(reportStore)
+        packageRelationships.extend(relationship for relationship in relationships if relationship["relationshipType"] != "CONTAINS")
+        relationships = packageRelationships
+
+    if not reportOptions["includeCopyrightsData"]:
+        for packageDetails in packages:
+            packageDetails["copyrightText"] = "NOASSERTION"
+
+        files = remove_file_copyrights(files, reportStore)
+        filesNotInInventory = remove_file_copyrights(filesNotInInventory, reportStore)
+
+    return relationships, files, filesNotInInventory
+
+#-------------------------------------------------------------------#
+def remove_file_copyrights(files, reportStore):
+
+    # Copied since the same file details may be held by the cached project data
+    updatedFiles = report_store.create_list(reportStore)
+    updatedFiles.extend(dict(fileDetail, copyrightText="NOASSERTION") for fileDetail in files)
+
+    return updatedFiles
+
+#-------------------------------------------------------------------#
+def prefetch_project_inventories(baseURL, authToken, reportData, projectList):
+
+    reportOptions = reportData["reportOptions"]
+    projectInventories = reportData.setdefault("projectInventories", {})
+    projectIDs = list(dict.fromkeys(project["projectID"] for project in projectList if project["projectID"] not in projectInventories))
+
+    if not projectIDs:
+        return
+
+    logger.info("    Prefetching the inventory for %s project(s)" %len(projectIDs))
+
+    # The API concurrency controller decides how many of these requests are actually in flight
+    with ThreadPoolExecutor(max_workers=reportData["apiConcurrency"]) as executor:
+        prefetchedInventories = executor.map(lambda projectID: get_project_inventory(baseURL, projectID, authToken, reportOptions["includeCopyrightsData"], reportOptions["includeNonRuntimeInventory"]), projectIDs)
+        projectInventories.update(zip(projectIDs, prefetchedInventories))
+
+#-------------------------------------------------------------------#
+def create_fetch_plan(reportOptions):
+
+    # What needs to be collected from Code Insight for the selected report options
+    includeFileDetails = reportOptions["includeFileDetails"]
+
+    fetchPlan = {}
+    fetchPlan["inventoryCopyrights"] = reportOptions["includeCopyrightsData"]
+    fetchPlan["nonRuntimeInventory"] = reportOptions["includeNonRuntimeInventory"]
+    fetchPlan["scannedFiles"] = includeFileDetails  # Scanned files and their evidence
+    fetchPlan["unassociatedFiles"] = includeFileDetails and reportOptions["includeUnassociatedFiles"]
+
+    return fetchPlan
+
+#-------------------------------------------------------------------#
+def create_project_data_fingerprint(projectID, reportData):
+
+    reportOptions = reportData["reportOptions"]
+
+    # The project state along with the options that change the project data
+    fingerprintDetails = {}
+    fingerprintDetails["projectState"] = reportData["projectStates"][projectID]
+    fingerprintDetails["reportVersion"] = reportData["reportVersion"]
+    fingerprintDetails["releaseVersion"] = reportData["releaseVersion"]
+    fingerprintDetails["includeNonRuntimeInventory"] = reportOptions["includeNonRuntimeInventory"]
+    fingerprintDetails["includeFileDetails"] = reportOptions["includeFileDetails"]
+    fingerprintDetails["includeUnassociatedFiles"] = reportOptions["includeUnassociatedFiles"]
+    fingerprintDetails["includeCopyrightsData"] = reportOptions["includeCopyrightsData"]
+    fingerprintDetails["deduplicateFiles"] = reportOptions.get("deduplicateFiles", False)
+    fingerprintDetails["useHasFiles"] = reportOptions.get("useHasFiles", False)
+
+    return report_cache.create_fingerprint(fingerprintDetails)
+
+#----------------------------------------------
+def create_package_details(inventoryItem, baseURL, authToken, reportData):
+
+    SPDXIDPackageNamePattern = r"[^a-zA-Z0-9\-\.]"  # PackageName is a unique string containing letters, numbers, ., and/or - so get rid of the rest
+    includeCopyrightsData = reportData["reportOptions"]["includeCopyrightsData"]
+    extractedLicensingInfos = {}  # Only the LicenseRefs used by this item so they can be cached with it
+
+    supplier = None # Set a default value to compare with
+    inventoryType = inventoryItem["type"]
+
+    externalRefs = []  # For now just holds the purl but in the future could hold more items
+
+    inventoryID = inventoryItem["id"]
+
+    # See if there is a custom filed at the inventory level for the "Package Supplier"
+    if "customFields" in inventoryItem:
+        customFields = inventoryItem["customFields"]
+
+        # See if the custom project fields were populated for this inventory item
+        for customField in customFields:
+
+            # Is there the reqired custom field available?
+            if customField["fieldLabel"] == "Package Supplier":
+                if customField["value"] is not None and customField["value"] != "":
+                    supplier = customField["value"]
+    
+
+    if inventoryType != "Component":
+        name =  inventoryItem["name"].split("(")[0] # Get rid of ( SPDX ID ) from name
+        SPDXIDPackageName = name + "-" + str(inventoryID)  # Inventory ensure the value is unique
+        SPDXIDPackageName = re.sub(SPDXIDPackageNamePattern, "-", SPDXIDPackageName)          # Remove special characters
+        componentName = name
+
+        if supplier is None:
+            supplier = "Organization: Various, People: Various" 
+
+    else:
+        componentName = inventoryItem["componentName"].strip()
+        versionName = str(inventoryItem["componentVersionName"]).strip()
+        SPDXIDPackageName = componentName + "-" + versionName + "-" + str(inventoryID)  # Inventory ensure the value is unique
+        SPDXIDPackageName = re.sub(SPDXIDPackageNamePattern, "-", SPDXIDPackageName)          # Remove special characters
+
+        forge = inventoryItem["componentForgeName"]
+
+        ##########################################
+        # Create supplier string from forge and component 
+        if supplier is None:
+            supplier = create_supplier_string(forge, componentName)
+
+        # Manage the purl value - 2024R1 added purl in response
+        if reportData["releaseVersion"] > "2024R1":
+            purlString = inventoryItem["purl"]
+            if purlString == "N/A":
+                purlString = ""
+        else:
+            try:
+                purlString = purl.get_purl_string(inventoryItem, baseURL, authToken)
+            except:
+                logger.warning("Unable to create purl string for inventory item %s." %SPDXIDPackageName)
+                purlString = ""
+
+        if "@" in purlString:
+            perlRef = {}
+            perlRef["referenceCategory"] = "PACKAGE-MANAGER"
+            perlRef["referenceLocator"] = purlString
+            perlRef["referenceType"] = "purl"
+            externalRefs.append(perlRef)    
+
+    # Common for Components and License Only items
+    packageSPDXID = "SPDXRef-Pkg-" + SPDXIDPackageName
+    
+    # Manage the homepage value
+    if inventoryItem["componentUrl"] not in ["", "N/A", "NA", None]:
+        homepage = inventoryItem["componentUrl"]
+    else:
+        homepage = "NOASSERTION"
+
+    ##########################################
+    # Manage Declared Licenses - These are the "possible" license based on data collection
+    declaredLicenses, extractedLicensingInfos = manage_package_declared_licenses(inventoryItem, extractedLicensingInfos)
+
+    ##########################################
+    # Manage Concluded license
+    concludedLicense, extractedLicensingInfos = manage_package_concluded_license(inventoryItem, extractedLicensingInfos)
+
+    packageDetails = {}
+    packageDetails["SPDXID"] = packageSPDXID
+    packageDetails["name"] = componentName
+
+    if inventoryType == "Component":
+        packageDetails["versionInfo"] = versionName
+
+    if externalRefs:
+        packageDetails["externalRefs"] = externalRefs
+    packageDetails["homepage"] = homepage
+    packageDetails["downloadLocation"] = "NOASSERTION"  # TODO - use a inventory custom field to store this?
+    packageDetails["copyrightText"] = (process_copyrights(inventoryItem["copyrights"]) if includeCopyrightsData else "NOASSERTION")
+    packageDetails["licenseDeclared"] = declaredLicenses
+    packageDetails["licenseConcluded"] = concludedLicense
+    packageDetails["supplier"] = supplier
+
+    return packageDetails, extractedLicensingInfos
+
+#----------------------------------------------
+def create_inventory_fingerprint(inventoryItem, reportData):
+
+    # Anything other than the inventory item itself that changes the package entry
+    fingerprintDetails = {}
+    fingerprintDetails["inventoryItem"] = inventoryItem
+    fingerprintDetails["reportVersion"] = reportData["reportVersion"]
+    fingerprintDetails["releaseVersion"] = reportData["releaseVersion"]
+    fingerprintDetails["includeCopyrightsData"] = reportData["reportOptions"]["includeCopyrightsData"]
+
+    return report_cache.create_fingerprint(fingerprintDetails)
+
+#----------------------------------------------
+def merge_extracted_licensing_infos(hasExtractedLicensingInfos, extractedLicensingInfos):
+
+    for licenseReference in extractedLicensingInfos:
+        extractedLicense = extractedLicensingInfos[licenseReference]
+
+        if licenseReference not in hasExtractedLicensingInfos:
+            # It's not there so create a new entry
+            hasExtractedLicensingInfos[licenseReference] = dict(extractedLicense)
+            hasExtractedLicensingInfos[licenseReference]["comment"] = list(extractedLicense["comment"])
+        else:
+            # It's aready there so but is the comment the same as any previous entry
+            for comment in extractedLicense["comment"]:
+                if comment not in hasExtractedLicensingInfos[licenseReference]["comment"]:
+                    hasExtractedLicensingInfos[licenseReference]["comment"].append(comment)
+
+    return hasExtractedLicensingInfos
+
+#----------------------------------------------
+def get_project_inventory(baseURL, projectID, authToken, includeCopyrightsData, includeNonRuntimeInventory=True):
+
+    if includeCopyrightsData: 
+        projectInventory = common.api.project.get_project_inventory.get_project_inventory_details_with_copyrights(baseURL, projectID, authToken)
+    else:
+        projectInventory = common.api.project.get_project_inventory.get_project_inventory_details_without_vulnerabilities(baseURL, projectID, authToken)   
+
+    # The inventory APIs have no scope or field selection so trim the response as soon as
+    # it arrives.  Nothing later in the report (cache checks, fingerprints, transformation)
+    # then holds on to items or fields that are not part of the report
+    inventoryItems = []
+    skippedItems = 0
+
+    for inventoryItem in projectInventory["inventoryItems"]:
+
+        if not includeNonRuntimeInventory and inventoryItem.get("dependencyScope") == "Non Runtime":
+            skippedItems += 1
+            continue
+
+        inventoryItems.append({field : inventoryItem[field] for field in INVENTORYFIELDS if field in inventoryItem})
+
+    logger.info("    Inventory for project %s: kept %s items, skipped %s Non Runtime items" %(projectID, len(inventoryItems), skippedItems))
+
+    projectInventory["inventoryItems"] = inventoryItems
+
+    return projectInventory
+
 #----------------------------------------------
 def manage_package_declared_licenses(inventoryItem, hasExtractedLicensingInfos):
 
@@ -474,10 +887,11 @@ def manage_package_concluded_license(inventoryItem, hasExtractedLicensingInfos):
 
 
 #-------------------------------------------------------
-def manage_unassociated_files(filesNotInInventory, filePathtoID, rootSPDXID, createOtherFilesPackage, projectCopyrights, includeCopyrightsData):
+def manage_unassociated_files(filesNotInInventory, filePathtoID, rootSPDXID, createOtherFilesPackage, projectCopyrights, includeCopyrightsData, useHasFiles=False):
 
     packageDetails = {}
     relationships = []
+    hasFiles = []
     fileHashes = []
     licenseInfoFromFiles = []
     unassociatedFilesCopyrights =[]
@@ -506,19 +920,23 @@ def manage_unassociated_files(filesNotInInventory, filePathtoID, rootSPDXID, cre
         fileHashes.append(filePathtoID[fileName]["fileSHA1"])
 
         # Surfaces the file level evidence to the assocaited package
-        licenseInfoFromFiles = licenseInfoFromFiles + fileDetails["licenseInfoInFiles"]
+        licenseInfoFromFiles.extend(fileDetails["licenseInfoInFiles"])
   
        # Define the relationship of the file to the package
-        fileRelationship = {}
-        fileRelationship["spdxElementId"] = packageSPDXID
-        fileRelationship["relationshipType"] = "CONTAINS"
-        fileRelationship["relatedSpdxElement"] = fileSPDXID
-        relationships.append(fileRelationship)
+        if useHasFiles:
+            hasFiles.append(fileSPDXID)
+        else:
+            fileRelationship = {}
+            fileRelationship["spdxElementId"] = packageSPDXID
+            fileRelationship["relationshipType"] = "CONTAINS"
+            fileRelationship["relatedSpdxElement"] = fileSPDXID
+            relationships.append(fileRelationship)
         
         # Collecting all unassociated files copyrights
         if includeCopyrightsData and fileDetails["copyrightText"] != "NONE":
-            unassociatedFilesCopyrights.extend(fileDetails["copyrightText"] if isinstance(fileDetails["copyrightText"], list) else [fileDetails["copyrightText"]])
-            projectCopyrights.extend(fileDetails["copyrightText"] if isinstance(fileDetails["copyrightText"], list) else [fileDetails["copyrightText"]])
+            fileCopyrights = fileDetails["copyrightText"] if isinstance(fileDetails["copyrightText"], list) else [fileDetails["copyrightText"]]
+            unassociatedFilesCopyrights.extend(fileCopyrights)
+            projectCopyrights.update(dict.fromkeys(fileCopyrights))
 
     # Create a hash of the file hashes for PackageVerificationCode 
     try:
@@ -548,6 +966,9 @@ def manage_unassociated_files(filesNotInInventory, filePathtoID, rootSPDXID, cre
     packageDetails["packageVerificationCode"] = {}
     packageDetails["packageVerificationCode"]["packageVerificationCodeValue"] = packageVerificationCodeValue
 
+    if useHasFiles:
+        packageDetails["hasFiles"] = hasFiles
+
     return packageDetails, relationships
 
 #-------------------------------------------------------
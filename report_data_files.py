@@ -7,40 +7,47 @@ Author : sgeary
 Created On : Tue Aug 29 2023
 File : report_data_files.py
 '''
-import logging, unicodedata, re
-import common.api.project.get_scanned_files
-import common.api.project.get_project_evidence
+import logging, unicodedata, re, hashlib
 import SPDX_license_mappings
+import report_data
+import report_intern
+import report_parallel
+import report_store
+import report_stream
 
 logger = logging.getLogger(__name__)
 
 #-------------------------------------------------
-def manage_file_details(baseURL, authToken, projectID, hasExtractedLicensingInfos, includeUnassociatedFiles, includeCopyrightsData):
+def manage_file_details(baseURL, authToken, projectID, hasExtractedLicensingInfos, includeUnassociatedFiles, includeCopyrightsData, reportStore=None, transformProcesses=1, requiredFilePaths=None, normalizedFileEvidence=None):
 
-    filePathToID, fileDetails = get_scanned_file_details(baseURL, authToken, projectID, includeUnassociatedFiles)
+    # With normalizedFileEvidence the files are identified by their content rather than their scan ID
+    filePathToID, fileDetails = get_scanned_file_details(baseURL, authToken, projectID, includeUnassociatedFiles, reportStore, requiredFilePaths, normalizedFileEvidence is not None)
 
-    fileDetails, hasExtractedLicensingInfos = get_file_evidence(baseURL, authToken, projectID, fileDetails, hasExtractedLicensingInfos, includeCopyrightsData)
+    fileDetails, hasExtractedLicensingInfos = get_file_evidence(baseURL, authToken, projectID, fileDetails, hasExtractedLicensingInfos, includeCopyrightsData, transformProcesses, normalizedFileEvidence)
 
     return filePathToID, fileDetails, hasExtractedLicensingInfos
 
 
 #-----------------------------
-def get_scanned_file_details(baseURL, authToken, projectID, includeUnassociatedFiles):
+def get_scanned_file_details(baseURL, authToken, projectID, includeUnassociatedFiles, reportStore=None, requiredFilePaths=None, contentAddressedFiles=False):
 
+    # With a report store the file details are kept on disk rather than in memory
     filePathToID = {} # Allow for mapping from inventory file path to details about the file itself
-    filePathToID["inInventory"] = {}
-    filePathToID["notInInventory"] = {}
-    fileDetails = {}
+    filePathToID["inInventory"] = report_store.create_dict(reportStore)
+    filePathToID["notInInventory"] = report_store.create_dict(reportStore)
+    fileDetails = report_store.create_dict(reportStore)
 
     # Collect a list of the scanned files
     print("                + Collect data for all scanned files.")
     logger.info("                Collect data for all scanned.")
-    scannedFiles = common.api.project.get_scanned_files.get_scanned_files_details_with_MD5_and_SHA1(baseURL, projectID, authToken)
-    print("                - Collected data for %s scanned file(s)." %len(scannedFiles))
-    logger.info("                Collected data for %s files." %len(scannedFiles))
+    scannedFiles = report_stream.get_scanned_files(baseURL, projectID, authToken)
 
-    # Cycle through each scanned file
+    scannedFileCount = 0
+    skippedFiles = 0
+
+    # Cycle through each scanned file as it is received
     for scannedFile in scannedFiles:
+        scannedFileCount += 1
         scannedFileDetails = {}
 
         scannedFileId = scannedFile["fileId"]
@@ -48,9 +55,12 @@ def get_scanned_file_details(baseURL, authToken, projectID, includeUnassociatedF
         inInventory = scannedFile["inInventory"]
         remoteFile = scannedFile["remote"]
 
-        # # Don't collect any data for the files we don't care about
-        # if inInventory == "false" and not includeUnassociatedFiles:
-        #     continue 
+        # Don't collect any data for the files that will not be in the report.  Without
+        # a list of required paths (files of included inventory items) keep everything
+        if requiredFilePaths is not None and fileName not in requiredFilePaths:
+            if inInventory == "true" or not includeUnassociatedFiles:
+                skippedFiles += 1
+                continue
 
         # Create a unique identifier based on fileID and scan location
         if remoteFile == "false":
@@ -58,7 +68,11 @@ def get_scanned_file_details(baseURL, authToken, projectID, includeUnassociatedF
         else:
             uniqueFileID = str(scannedFileId) + "-r"
 
-        scannedFileDetails["SPDXID"] = "SPDXRef-File-" + uniqueFileID
+        if contentAddressedFiles and scannedFile["fileSHA1"] is not None:
+            # The same file in any project of the report gets the same ID so it is only included once
+            scannedFileDetails["SPDXID"] = create_content_file_spdxid(fileName, scannedFile["fileSHA1"])
+        else:
+            scannedFileDetails["SPDXID"] = "SPDXRef-File-" + uniqueFileID
         scannedFileDetails["fileName"] = fileName
         scannedFileDetails["checksums"] = []
         
@@ -88,97 +102,176 @@ def get_scanned_file_details(baseURL, authToken, projectID, includeUnassociatedF
             filePathToID["inInventory"][fileName] = filePathDetails
         else:
             filePathToID["notInInventory"][fileName] = filePathDetails
+
+    print("                - Collected data for %s scanned file(s)." %scannedFileCount)
+    logger.info("                Collected data for %s files." %scannedFileCount)
+    logger.info("                Skipped %s file(s) not needed for the report." %skippedFiles)
       
     return filePathToID, fileDetails
 
 
 #-----------------------------
-def get_file_evidence(baseURL, authToken, projectID, fileDetails, hasExtractedLicensingInfos, includeCopyrightsData):
+def get_file_evidence(baseURL, authToken, projectID, fileDetails, hasExtractedLicensingInfos, includeCopyrightsData, transformProcesses=1, normalizedFileEvidence=None):
+
+    # No need to ask for the evidence if none of the files will be in the report
+    if len(fileDetails) == 0:
+        logger.info("            No files require evidence - skipping file level evidence")
+        return fileDetails, hasExtractedLicensingInfos
 
     # Collect the copyright/license data per file and create dict based on
     print("                + Collect file level evidence.")
     logger.info("            + Collect file level evidence")
-    projectEvidenceDetails = common.api.project.get_project_evidence.get_project_evidence(baseURL, projectID, authToken)
+    projectEvidenceDetails = report_stream.get_project_evidence(baseURL, projectID, authToken)
+
+    # Only the evidence for files in the file details is needed
+    fileEvidence = (fileEvidenceDetails for fileEvidenceDetails in projectEvidenceDetails if get_evidence_file_id(fileEvidenceDetails) in fileDetails)
+
+    # Normalizing the evidence is independent for each file so it can be spread over processes.
+    # With a single process each record is transformed as it is received
+    if normalizedFileEvidence is None:
+        transformedFileEvidence = report_parallel.map_items(transform_file_evidence, fileEvidence, transformProcesses, includeCopyrightsData)
+    else:
+        transformedFileEvidence = transform_distinct_file_evidence(fileEvidence, fileDetails, normalizedFileEvidence, transformProcesses, includeCopyrightsData)
+
+    # Merge in the original order so the results are the same however the work was split
+    for uniqueFileID, copyrightText, licenseInfoInFiles, extractedLicensingInfos in transformedFileEvidence:
+        hasExtractedLicensingInfos = report_data.merge_extracted_licensing_infos(hasExtractedLicensingInfos, extractedLicensingInfos)
+
+        # Add the evidence details to the appropriate area for this file
+        fileDetail = fileDetails[uniqueFileID]
+        # Most files share their copyrights and licenses with many others so hold each value once
+        fileDetail["copyrightText"] = report_intern.intern_string(copyrightText)
+        fileDetail["licenseConcluded"]= "NOASSERTION"
+        fileDetail["licenseInfoInFiles"]= report_intern.share_list(licenseInfoInFiles)
+        fileDetails[uniqueFileID] = fileDetail  # Write back in case the details are held in a report store
+
     print("                - File level evidence has been collected.") 
     logger.info("               - File level evidence has been collected.") 
 
-    for fileEvidenceDetails in projectEvidenceDetails["data"]:
+    return fileDetails, hasExtractedLicensingInfos
 
-        remoteFile = bool(fileEvidenceDetails["remote"])
-        scannedFileId = fileEvidenceDetails["scannedFileId"]
-        if includeCopyrightsData:
-            copyrightEvidenceFound= fileEvidenceDetails["copyRightMatches"]
-        licenseEvidenceFound = list(set(fileEvidenceDetails["licenseMatches"]))
+#-----------------------------
+def transform_distinct_file_evidence(fileEvidence, fileDetails, normalizedFileEvidence, transformProcesses, includeCopyrightsData):
+
+    # Files with the same content have the same evidence so it is only normalized once
+    # for each SHA1 across every project in the report.  The copyright setting is part of
+    # the key since the time budget may turn it off part way through the report
+    if transformProcesses > 1:
+        fileEvidence = list(fileEvidence)
+        distinctFileEvidence = {}
+
+        for fileEvidenceDetails in fileEvidence:
+            contentKey = get_content_key(fileDetails[get_evidence_file_id(fileEvidenceDetails)], includeCopyrightsData)
+            if contentKey is not None and contentKey not in normalizedFileEvidence and contentKey not in distinctFileEvidence:
+                distinctFileEvidence[contentKey] = fileEvidenceDetails
+
+        transformedFileEvidence = report_parallel.map_items(transform_file_evidence, list(distinctFileEvidence.values()), transformProcesses, includeCopyrightsData)
+        for contentKey, (uniqueFileID, copyrightText, licenseInfoInFiles, extractedLicensingInfos) in zip(distinctFileEvidence, transformedFileEvidence):
+            normalizedFileEvidence[contentKey] = [copyrightText, licenseInfoInFiles, extractedLicensingInfos]
+
+    for fileEvidenceDetails in fileEvidence:
+        uniqueFileID = get_evidence_file_id(fileEvidenceDetails)
+        contentKey = get_content_key(fileDetails[uniqueFileID], includeCopyrightsData)
+
+        if contentKey is None:
+            yield transform_file_evidence(fileEvidenceDetails, includeCopyrightsData)
+            continue
 
-        uniqueFileID = str(scannedFileId) + ("-r" if remoteFile else "-s")
+        if contentKey not in normalizedFileEvidence:
+            normalizedFileEvidence[contentKey] = list(transform_file_evidence(fileEvidenceDetails, includeCopyrightsData)[1:])
 
-        # If the fileID is not in the dict move on (includeUnassociatedFiles?)
-        if uniqueFileID not in fileDetails:
-            continue
+        copyrightText, licenseInfoInFiles, extractedLicensingInfos = normalizedFileEvidence[contentKey]
+        yield uniqueFileID, copyrightText, licenseInfoInFiles, extractedLicensingInfos
 
-        if includeCopyrightsData:
-            ##########################################
-            # Manage File Level Copyrights
-            # Normalize the copyrights in case there are any encoding issues 
-            copyrightEvidenceFound = [unicodedata.normalize('NFKD', x).encode('ASCII', 'ignore').decode('utf-8') for x in copyrightEvidenceFound]
+#-----------------------------
+def get_content_key(fileDetail, includeCopyrightsData):
 
-            if copyrightEvidenceFound:
-                logger.info("            Copyright evidence discovered")
-                # The response has the copyright details as a list so convert to a string
-                copyrightEvidenceFound = " | ".join(copyrightEvidenceFound)
-            else:
-                logger.info("            No copyright evidence discovered")
-                copyrightEvidenceFound = "NONE"
+    # Files without a SHA1 are normalized on their own
+    for checksum in fileDetail["checksums"]:
+        if checksum["algorithm"] == "SHA1":
+            return "%s-%s" %(checksum["checksumValue"], "c" if includeCopyrightsData else "n")
 
-        ##########################################
-        # Manage File Level Licenses
-        if licenseEvidenceFound:
+    return None
 
-            # Remove duplicates and sort data
-            licenseEvidenceFound = sorted(list(dict.fromkeys(licenseEvidenceFound)))
-            
-            # Remove Public Domain license if present
-            if  "Public Domain" in licenseEvidenceFound: 
-                licenseEvidenceFound.remove("Public Domain")  
-                # The license evidence is not in SPDX form so consolidate and map       
-            for index, licenseEvidence in enumerate(licenseEvidenceFound):
-                if licenseEvidence in SPDX_license_mappings.LICENSEMAPPINGS:
-                    licenseEvidenceFound[index] = SPDX_license_mappings.LICENSEMAPPINGS[licenseEvidence]
-                    logger.info("                \"%s\" maps to SPDX ID: \"%s\"" %(licenseEvidence, SPDX_license_mappings.LICENSEMAPPINGS[licenseEvidence] ))
-                else:
+#-----------------------------
+def create_content_file_spdxid(fileName, fileSHA1):
+
+    # A file element has a single name so the same content at different paths stays separate
+    return "SPDXRef-File-%s-%s" %(fileSHA1, hashlib.sha1(fileName.encode("utf-8")).hexdigest()[:8])
+
+#-----------------------------
+def get_evidence_file_id(fileEvidenceDetails):
+
+    return str(fileEvidenceDetails["scannedFileId"]) + ("-r" if bool(fileEvidenceDetails["remote"]) else "-s")
+
+#-----------------------------
+def transform_file_evidence(fileEvidenceDetails, includeCopyrightsData):
+
+    hasExtractedLicensingInfos = {}  # Only the LicenseRefs found in this file so they can be merged in order
+
+    uniqueFileID = get_evidence_file_id(fileEvidenceDetails)
+    if includeCopyrightsData:
+        copyrightEvidenceFound= fileEvidenceDetails["copyRightMatches"]
+    licenseEvidenceFound = list(set(fileEvidenceDetails["licenseMatches"]))
 
-                    # There was not a valid SPDX license name returned
-                    logger.warning("                \"%s\" is not a valid SPDX identifier for file level license. - Using LicenseRef." %(licenseEvidence))
-                    licenseEvidence = licenseEvidence.split("(", 1)[0].rstrip()  # If there is a ( in string remove everything after and space
-                    licenseEvidence = re.sub('[^a-zA-Z0-9 \n\.]', '-', licenseEvidence) # Replace spec chars with dash
-                    licenseEvidence = licenseEvidence.replace(" ", "-") # Replace space with dash
-                    licenseReference = "LicenseRef-%s" %licenseEvidence
-                    licenseEvidenceFound[index]  = licenseReference
-                    
-                    licenseReferenceComment = "SCA Revenera - Observed license details within file"
-
-                    # Since this is an non SPDX ID we need to add to the hasExtractedLicensingInfos section
-                    if licenseReference not in hasExtractedLicensingInfos:
-                        # It's not there so create a new entry
-                        hasExtractedLicensingInfos[licenseReference] = {}
-                        hasExtractedLicensingInfos[licenseReference]["licenseId"] = licenseReference
-                        hasExtractedLicensingInfos[licenseReference]["name"] = licenseEvidence
-                        hasExtractedLicensingInfos[licenseReference]["extractedText"] = licenseEvidence
-                        hasExtractedLicensingInfos[licenseReference]["comment"] = [licenseReferenceComment]
-                    else:
-                        # It's aready there but is the comment the same as any previous entry
-                        if licenseReferenceComment not in hasExtractedLicensingInfos[licenseReference]["comment"]:
-                            hasExtractedLicensingInfos[licenseReference]["comment"].append(licenseReferenceComment)
+    if includeCopyrightsData:
+        ##########################################
+        # Manage File Level Copyrights
+        # Normalize the copyrights in case there are any encoding issues 
+        copyrightEvidenceFound = [unicodedata.normalize('NFKD', x).encode('ASCII', 'ignore').decode('utf-8') for x in copyrightEvidenceFound]
+
+        if copyrightEvidenceFound:
+            logger.info("            Copyright evidence discovered")
+            # The response has the copyright details as a list so convert to a string
+            copyrightEvidenceFound = " | ".join(copyrightEvidenceFound)
         else:
-            licenseEvidenceFound = ["NONE"]
+            logger.info("            No copyright evidence discovered")
+            copyrightEvidenceFound = "NONE"
 
-        # Catch any corner cases?
-        if len(licenseEvidenceFound) == 0:
-            licenseEvidenceFound = ["NONE"]
-            
-        # Add the evidence details to the appropriate area for this file
-        fileDetails[uniqueFileID]["copyrightText"] = (copyrightEvidenceFound if includeCopyrightsData else "NOASSERTION")
-        fileDetails[uniqueFileID]["licenseConcluded"]= "NOASSERTION"
-        fileDetails[uniqueFileID]["licenseInfoInFiles"]= licenseEvidenceFound
+    ##########################################
+    # Manage File Level Licenses
+    if licenseEvidenceFound:
+
+        # Remove duplicates and sort data
+        licenseEvidenceFound = sorted(list(dict.fromkeys(licenseEvidenceFound)))
+        
+        # Remove Public Domain license if present
+        if  "Public Domain" in licenseEvidenceFound: 
+            licenseEvidenceFound.remove("Public Domain")  
+            # The license evidence is not in SPDX form so consolidate and map       
+        for index, licenseEvidence in enumerate(licenseEvidenceFound):
+            if licenseEvidence in SPDX_license_mappings.LICENSEMAPPINGS:
+                licenseEvidenceFound[index] = SPDX_license_mappings.LICENSEMAPPINGS[licenseEvidence]
+                logger.info("                \"%s\" maps to SPDX ID: \"%s\"" %(licenseEvidence, SPDX_license_mappings.LICENSEMAPPINGS[licenseEvidence] ))
+            else:
 
-    return fileDetails, hasExtractedLicensingInfos
\ No newline at end of file
+                # There was not a valid SPDX license name returned
+                logger.warning("                \"%s\" is not a valid SPDX identifier for file level license. - Using LicenseRef." %(licenseEvidence))
+                licenseEvidence = licenseEvidence.split("(", 1)[0].rstrip()  # If there is a ( in string remove everything after and space
+                licenseEvidence = re.sub('[^a-zA-Z0-9 \n\.]', '-', licenseEvidence) # Replace spec chars with dash
+                licenseEvidence = licenseEvidence.replace(" ", "-") # Replace space with dash
+                licenseReference = report_intern.intern_string("LicenseRef-%s" %licenseEvidence)
+                licenseEvidenceFound[index]  = licenseReference
+                
+                licenseReferenceComment = "SCA Revenera - Observed license details within file"
+
+                # Since this is an non SPDX ID we need to add to the hasExtractedLicensingInfos section
+                if licenseReference not in hasExtractedLicensingInfos:
+                    # It's not there so create a new entry
+                    hasExtractedLicensingInfos[licenseReference] = {}
+                    hasExtractedLicensingInfos[licenseReference]["licenseId"] = licenseReference
+                    hasExtractedLicensingInfos[licenseReference]["name"] = licenseEvidence
+                    hasExtractedLicensingInfos[licenseReference]["extractedText"] = licenseEvidence
+                    hasExtractedLicensingInfos[licenseReference]["comment"] = [licenseReferenceComment]
+                else:
+                    # It's aready there but is the comment the same as any previous entry
+                    if licenseReferenceComment not in hasExtractedLicensingInfos[licenseReference]["comment"]:
+                        hasExtractedLicensingInfos[licenseReference]["comment"].append(licenseReferenceComment)
+    else:
+        licenseEvidenceFound = ["NONE"]
+
+    # Catch any corner cases?
+    if len(licenseEvidenceFound) == 0:
+        licenseEvidenceFound = ["NONE"]
+        
+    return uniqueFileID, (copyrightEvidenceFound if includeCopyrightsData else "NOASSERTION"), licenseEvidenceFound, hasExtractedLicensingInfos
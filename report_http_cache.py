@@ -0,0 +1,344 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_http_cache.py
+'''
+import logging, os, io, re, json, time, hashlib, sqlite3, tempfile, threading
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import report_concurrency
+
+logger = logging.getLogger(__name__)
+
+DEFAULTCACHESIZE = 1024  # MB of response bodies kept before the least recently used are removed
+DEFAULTCACHETTL = 600  # Seconds a response without validators is reused for the endpoints below
+MAXENTRYFRACTION = 0.25  # Largest single response stored as a fraction of the cache size
+SPOOLSIZE = 8 * 1024 * 1024  # Response bytes held in memory while being stored before using a temp file
+STORECHUNKSIZE = 1024 * 1024  # Bytes copied into the cache at a time when a response is stored
+
+# Responses from these endpoints change rarely enough to be reused for the TTL when
+# the server gives no ETag or Last-Modified to revalidate them with.  The project
+# hierarchy is not one of them since a child added or removed changes the report
+TTLENDPOINTS = [r"/system/", r"/components/\{id\}", r"/customfields"]
+
+# Describe the transfer rather than the stored body which is kept decoded
+TRANSFERHEADERS = ["content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"]
+
+cacheState = {}
+cacheStatistics = {"requests" : 0, "fresh" : 0, "revalidated" : 0, "stored" : 0}
+statisticsLock = threading.Lock()
+
+#-------------------------------------------------------------------#
+class ResponseCache(object):
+    # Response bodies and their validators in a SQLite file shared by every run so
+    # reports for different projects and batch workers benefit from each other
+
+    def __init__(self, cacheFile, maxSize, ttl):
+        self.cacheFile = cacheFile
+        self.maxSize = maxSize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(cacheFile, timeout=60, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS responses (cache_key TEXT PRIMARY KEY, url TEXT, etag TEXT, last_modified TEXT, headers TEXT, body BLOB, size INTEGER, stored_time REAL, last_used REAL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.connection.commit()
+
+    def get(self, cacheKey):
+        # The body is only read once it is known to be needed
+        with self.lock:
+            row = self.connection.execute("SELECT etag, last_modified, headers, stored_time FROM responses WHERE cache_key = ?", (cacheKey,)).fetchone()
+
+        if row is None:
+            return None
+
+        cachedResponse = {}
+        cachedResponse["etag"], cachedResponse["lastModified"], headers, cachedResponse["storedTime"] = row
+        cachedResponse["headers"] = json.loads(headers)
+
+        return cachedResponse
+
+    def open_body(self, cacheKey):
+        # The body is read a chunk at a time as the caller consumes it.  It has its own
+        # connection so the body being read is not changed by other requests storing or
+        # touching the same response.  Without incremental blob reads (Python 3.11) the
+        # body is read whole, which is then no larger than the in-memory spool
+        connection = sqlite3.connect(self.cacheFile, timeout=60, check_same_thread=False)
+        canReadBlob = hasattr(connection, "blobopen")
+
+        try:
+            if canReadBlob:
+                row = connection.execute("SELECT rowid FROM responses WHERE cache_key = ?", (cacheKey,)).fetchone()
+            else:
+                row = connection.execute("SELECT rowid, body FROM responses WHERE cache_key = ?", (cacheKey,)).fetchone()
+
+            # Another run may have removed the response since it was looked up
+            if row is not None and canReadBlob:
+                return CachedBody(connection, connection.blobopen("responses", "body", row[0], readonly=True))
+        except sqlite3.Error:
+            row = None
+
+        connection.close()
+
+        return None if row is None else io.BytesIO(bytes(row[1]))
+
+    def touch(self, cacheKey, revalidated):
+        with self.lock:
+            if revalidated:
+                self.connection.execute("UPDATE responses SET last_used = ?, stored_time = ? WHERE cache_key = ?", (time.time(), time.time(), cacheKey))
+            else:
+                self.connection.execute("UPDATE responses SET last_used = ? WHERE cache_key = ?", (time.time(), cacheKey))
+            self.connection.commit()
+
+    def store(self, cacheKey, url, headers, body_ptr, size):
+        # The body is copied into the row a chunk at a time so a large response is never
+        # held in memory.  Without incremental blob writes (Python 3.11) only a response
+        # small enough to have stayed in memory is stored
+        canWriteBlob = hasattr(self.connection, "blobopen")
+        if not canWriteBlob and size > SPOOLSIZE:
+            logger.debug("    Not caching the %s byte response for %s" %(size, url))
+            return False
+
+        body_ptr.seek(0)
+
+        with self.lock:
+            try:
+                if canWriteBlob:
+                    cursor = self.connection.execute("INSERT OR REPLACE INTO responses (cache_key, url, etag, last_modified, headers, body, size, stored_time, last_used) VALUES (?, ?, ?, ?, ?, zeroblob(?), ?, ?, ?)",
+                        (cacheKey, url, headers.get("ETag"), headers.get("Last-Modified"), json.dumps(dict(headers)), size, size, time.time(), time.time()))
+
+                    with self.connection.blobopen("responses", "body", cursor.lastrowid) as blob:
+                        for chunk in iter(lambda: body_ptr.read(STORECHUNKSIZE), b""):
+                            blob.write(chunk)
+                else:
+                    self.connection.execute("INSERT OR REPLACE INTO responses (cache_key, url, etag, last_modified, headers, body, size, stored_time, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (cacheKey, url, headers.get("ETag"), headers.get("Last-Modified"), json.dumps(dict(headers)), sqlite3.Binary(body_ptr.read()), size, time.time(), time.time()))
+
+                self.evict()
+                self.connection.commit()
+            except:
+                self.connection.rollback()
+                raise
+
+        return True
+
+    def evict(self):
+        # Remove the least recently used responses until the cache is back within its size
+        cacheSize = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        while cacheSize > self.maxSize:
+            row = self.connection.execute("SELECT cache_key, size FROM responses ORDER BY last_used LIMIT 1").fetchone()
+            if row is None:
+                break
+
+            self.connection.execute("DELETE FROM responses WHERE cache_key = ?", (row[0],))
+            cacheSize -= row[1]
+            logger.debug("    Removed cached response %s to stay within the cache size" %row[0])
+
+#-------------------------------------------------------------------#
+class CachedBody(object):
+    # Stands in for the raw response of a cached body so iter_content reads it from the
+    # cache in chunks.  The blob and its connection are closed once it has all been read
+
+    def __init__(self, connection, blob):
+        self.connection = connection
+        self.blob = blob
+
+    def read(self, size=-1):
+        if self.blob is None:
+            return b""
+
+        chunk = self.blob.read(-1 if size is None else size)
+        if not chunk:
+            self.close()
+
+        return chunk
+
+    def close(self):
+        if self.blob is not None:
+            self.blob.close()
+            self.connection.close()
+            self.blob = None
+
+#-------------------------------------------------------------------#
+class CachingHTTPAdapter(report_concurrency.AdaptiveHTTPAdapter):
+    # GET responses are stored with their ETag and Last-Modified validators and later
+    # requests ask the server whether they have changed.  An unchanged response (304)
+    # is served from the cache without transferring the body again
+
+    def send(self, request, **kwargs):
+        responseCache = cacheState.get("responseCache")
+        if responseCache is None or request.method != "GET":
+            return super().send(request, **kwargs)
+
+        count_request("requests")
+        cacheKey = create_cache_key(request)
+        cachedResponse = responseCache.get(cacheKey)
+
+        if cachedResponse is not None:
+            # Without validators the response is reused as is for a short time on the safe endpoints
+            if not cachedResponse["etag"] and not cachedResponse["lastModified"]:
+                body = None
+                if time.time() - cachedResponse["storedTime"] < responseCache.ttl and is_ttl_endpoint(request.url):
+                    body = responseCache.open_body(cacheKey)
+
+                if body is not None:
+                    count_request("fresh")
+                    responseCache.touch(cacheKey, False)
+                    logger.debug("    Using cached response for %s" %request.url)
+                    return create_cached_response(request, cachedResponse, body)
+            else:
+                if cachedResponse["etag"]:
+                    request.headers["If-None-Match"] = cachedResponse["etag"]
+                if cachedResponse["lastModified"]:
+                    request.headers["If-Modified-Since"] = cachedResponse["lastModified"]
+
+        response = super().send(request, **kwargs)
+
+        if response.status_code == 304 and cachedResponse is not None:
+            body = responseCache.open_body(cacheKey)
+            response.close()
+
+            if body is not None:
+                count_request("revalidated")
+                responseCache.touch(cacheKey, True)
+                logger.debug("    Cached response for %s has not changed" %request.url)
+                return create_cached_response(request, cachedResponse, body)
+
+            # Removed by another run since it was looked up so request the full response again
+            request.headers.pop("If-None-Match", None)
+            request.headers.pop("If-Modified-Since", None)
+            response = super().send(request, **kwargs)
+
+        if response.status_code == 200 and is_cacheable(response):
+            store_while_reading(response, responseCache, cacheKey)
+
+        return response
+
+#-------------------------------------------------------------------#
+def install_http_cache(cacheDirectory, maxSize=DEFAULTCACHESIZE, ttl=DEFAULTCACHETTL):
+
+    os.makedirs(cacheDirectory, exist_ok=True)
+    cacheFile = os.path.join(cacheDirectory, "responses.sqlite")
+
+    try:
+        cacheState["responseCache"] = ResponseCache(cacheFile, float(maxSize) * 1024 * 1024, float(ttl))
+    except sqlite3.Error as error:
+        logger.error("Unable to open the HTTP response cache %s: %s" %(cacheFile, error))
+        return
+
+    logger.info("Caching Code Insight API responses in %s (%s MB, %s second TTL)" %(cacheFile, maxSize, ttl))
+
+    # Mounted on the report's own session, which keeps the concurrency limits since the
+    # caching adapter extends them.  Must follow install_adaptive_concurrency
+    report_concurrency.mount_adapter(CachingHTTPAdapter)
+
+#-------------------------------------------------------------------#
+def log_cache_statistics():
+
+    if "responseCache" not in cacheState:
+        return
+
+    with statisticsLock:
+        requestCount = cacheStatistics["requests"]
+        hitCount = cacheStatistics["fresh"] + cacheStatistics["revalidated"]
+
+        hitRate = 100.0 * hitCount / requestCount if requestCount else 0
+        logger.info("HTTP response cache: %s requests, %s served from the cache, %s revalidated, %s stored - %.1f%% hit rate" %(requestCount, cacheStatistics["fresh"], cacheStatistics["revalidated"], cacheStatistics["stored"], hitRate))
+
+#-------------------------------------------------------------------#
+def count_request(statistic):
+    with statisticsLock:
+        cacheStatistics[statistic] += 1
+
+#-------------------------------------------------------------------#
+def create_cache_key(request):
+
+    # The same URL can return different data for different users so the token is part
+    # of the key.  Only its hash is kept
+    authorization = request.headers.get("Authorization", "")
+
+    return hashlib.sha256((request.url + "\n" + authorization).encode("utf-8")).hexdigest()
+
+#-------------------------------------------------------------------#
+def is_ttl_endpoint(url):
+
+    endpoint = report_concurrency.get_endpoint(url).lower()
+
+    return any(re.search(pattern.lower(), endpoint) for pattern in TTLENDPOINTS)
+
+#-------------------------------------------------------------------#
+def is_cacheable(response):
+
+    cacheControl = response.headers.get("Cache-Control", "").lower()
+    if "no-store" in cacheControl:
+        return False
+
+    if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+        return True
+
+    return is_ttl_endpoint(response.url)
+
+#-------------------------------------------------------------------#
+def store_while_reading(response, responseCache, cacheKey):
+    # Copy the body into the cache as the caller reads it, so streamed responses are
+    # still processed as they arrive.  A response that is not read to the end or is
+    # too large is not stored
+
+    iter_content = response.iter_content
+    maxEntrySize = responseCache.maxSize * MAXENTRYFRACTION
+
+    def caching_iter_content(chunk_size=1, decode_unicode=False):
+        if decode_unicode:
+            yield from iter_content(chunk_size, decode_unicode)
+            return
+
+        body_ptr = tempfile.SpooledTemporaryFile(max_size=SPOOLSIZE)
+        bodySize = 0
+
+        try:
+            for chunk in iter_content(chunk_size, decode_unicode):
+                if body_ptr is not None:
+                    bodySize += len(chunk)
+                    if bodySize > maxEntrySize:
+                        body_ptr.close()
+                        body_ptr = None
+                    else:
+                        body_ptr.write(chunk)
+
+                yield chunk
+
+            if body_ptr is not None:
+                headers = {key : value for key, value in response.headers.items() if key.lower() not in TRANSFERHEADERS}
+                if responseCache.store(cacheKey, response.url, headers, body_ptr, bodySize):
+                    count_request("stored")
+        except sqlite3.Error as error:
+            logger.warning("Unable to store the response for %s: %s" %(response.url, error))
+        finally:
+            if body_ptr is not None:
+                body_ptr.close()
+
+    response.iter_content = caching_iter_content
+
+#-------------------------------------------------------------------#
+def create_cached_response(request, cachedResponse, body):
+
+    response = requests.models.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response.headers = CaseInsensitiveDict(cachedResponse["headers"])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+
+    # Read from the cache as the caller consumes the response, like a streamed response
+    response.raw = body
+
+    return response
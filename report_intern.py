@@ -0,0 +1,58 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_intern.py
+'''
+import logging, sys
+
+logger = logging.getLogger(__name__)
+
+# Identical license lists are held once.  They are tuples so a list shared by
+# many files can never be changed through one of them
+sharedLists = {}
+
+#-------------------------------------------------------------------#
+def intern_string(value):
+
+    # Equal strings built separately (concatenation, JSON parsing, pickling between
+    # processes) are separate objects until interned
+    if type(value) is str:
+        return sys.intern(value)
+
+    return value
+
+#-------------------------------------------------------------------#
+def share_list(values):
+
+    values = tuple(intern_string(value) for value in values)
+
+    return sharedLists.setdefault(values, values)
+
+#-------------------------------------------------------------------#
+def clear_shared_lists():
+
+    # The lists are only shared within a report.  A process that creates many reports
+    # would otherwise keep every list from every report it has created
+    logger.info("Releasing %s shared license lists" %len(sharedLists))
+    sharedLists.clear()
+
+#-------------------------------------------------------------------#
+def intern_json_object(jsonObject):
+    # object_hook for json.load so the repeated values of cached data are not held
+    # once per file or relationship.  The keys are already shared by the decoder
+
+    for key, value in jsonObject.items():
+        if type(value) is str:
+            jsonObject[key] = sys.intern(value)
+        elif key == "licenseInfoInFiles":
+            jsonObject[key] = share_list(value)
+        elif type(value) is list:
+            for index, item in enumerate(value):
+                if type(item) is str:
+                    value[index] = sys.intern(item)
+
+    return jsonObject
@@ -0,0 +1,61 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_parallel.py
+'''
+import logging, functools, itertools, multiprocessing
+
+logger = logging.getLogger(__name__)
+
+MINPARALLELITEMS = 5000  # Below this the cost of starting the processes outweighs the gain
+CHUNKSPERPROCESS = 4
+WINDOWSIZE = 5000  # Items handed to the processes at a time
+
+#-------------------------------------------------------------------#
+def map_items(function, items, transformProcesses, *arguments):
+
+    # A single process transforms each item as the results are consumed so the
+    # items can be a generator, for example records streamed from the server
+    if transformProcesses <= 1:
+        return (function(item, *arguments) for item in items)
+
+    # Small projects just run in this process.  Only enough items to tell are read
+    items = iter(items)
+    firstItems = list(itertools.islice(items, MINPARALLELITEMS))
+    if len(firstItems) < MINPARALLELITEMS:
+        return [function(item, *arguments) for item in firstItems]
+
+    return map_items_in_processes(function, itertools.chain(firstItems, items), transformProcesses, arguments)
+
+#-------------------------------------------------------------------#
+def map_items_in_processes(function, items, transformProcesses, arguments):
+
+    # The items are handed to the pool a window at a time since imap on the whole
+    # iterator would read all of it into the task queue straight away.  The next window
+    # is submitted before the results of the current one are returned so the processes
+    # are kept busy while the caller consumes them
+    chunkSize = max(1, WINDOWSIZE // (transformProcesses * CHUNKSPERPROCESS))
+    logger.info("    Transforming items with %s processes in windows of %s and chunks of %s" %(transformProcesses, WINDOWSIZE, chunkSize))
+
+    # imap returns the results in the same order as the items
+    with multiprocessing.Pool(transformProcesses) as pool:
+        currentResults = None
+
+        while True:
+            windowItems = list(itertools.islice(items, WINDOWSIZE))
+            nextResults = pool.imap(functools.partial(apply_function, function, arguments), windowItems, chunkSize) if windowItems else None
+
+            if currentResults is not None:
+                yield from currentResults
+
+            if nextResults is None:
+                break
+            currentResults = nextResults
+
+#-------------------------------------------------------------------#
+def apply_function(function, arguments, item):
+    return function(item, *arguments)
@@ -0,0 +1,160 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_replay.py
+'''
+import logging, gzip, json, threading
+
+import common.application_details
+import common.project_heirarchy
+import common.api.system.release
+import common.api.project.get_project_inventory
+import common.api.project.get_scanned_files
+import common.api.project.get_project_evidence
+import common.api.component.get_component_details
+
+logger = logging.getLogger(__name__)
+
+BUNDLEVERSION = 1
+
+# The Code Insight API helpers used to collect the report data.  Each of these
+# is wrapped so the responses can be captured to or served from a bundle file
+APIFUNCTIONS = [
+    (common.api.system.release, "get_release_details"),
+    (common.application_details, "determine_application_details"),
+    (common.project_heirarchy, "create_project_heirarchy"),
+    (common.api.project.get_project_inventory, "get_project_inventory_details_with_copyrights"),
+    (common.api.project.get_project_inventory, "get_project_inventory_details_without_vulnerabilities"),
+    (common.api.project.get_scanned_files, "get_scanned_files_details_with_MD5_and_SHA1"),
+    (common.api.project.get_project_evidence, "get_project_evidence"),
+    (common.api.component.get_component_details, "get_component_details_v3_summary"),
+]
+
+originalFunctions = {}
+bundleState = {}
+
+#-------------------------------------------------------------------#
+def start_recording(bundleFile, baseURL, authToken, reportArguments):
+    logger.info("Recording API responses to %s" %bundleFile)
+
+    bundleState["bundle_ptr"] = gzip.open(bundleFile, "wt", encoding="utf-8")
+    bundleState["lock"] = threading.Lock()
+    bundleState["recordedCalls"] = set()
+
+    # The first line describes the report run so a replay does not need the original arguments
+    bundleHeader = {}
+    bundleHeader["bundleVersion"] = BUNDLEVERSION
+    bundleHeader["reportArguments"] = reportArguments
+    bundleState["bundle_ptr"].write(json.dumps(bundleHeader) + "\n")
+
+    for module, functionName in APIFUNCTIONS:
+        wrap_api_function(module, functionName, create_recording_function(module, functionName, baseURL, authToken))
+
+#-------------------------------------------------------------------#
+def stop_recording():
+
+    if "bundle_ptr" not in bundleState:
+        return
+
+    restore_api_functions()
+    bundleState.pop("bundle_ptr").close()
+    logger.info("API response recording completed for %s calls" %len(bundleState["recordedCalls"]))
+
+#-------------------------------------------------------------------#
+def start_replay(bundleFile, baseURL, authToken):
+    logger.info("Replaying API responses from %s" %bundleFile)
+
+    bundleHeader, recordedResponses = load_bundle(bundleFile)
+
+    for module, functionName in APIFUNCTIONS:
+        wrap_api_function(module, functionName, create_replay_function(functionName, recordedResponses, baseURL, authToken))
+
+    return bundleHeader["reportArguments"]
+
+#-------------------------------------------------------------------#
+def load_bundle(bundleFile):
+
+    recordedResponses = {}
+
+    bundle_ptr = gzip.open(bundleFile, "rt", encoding="utf-8")
+    bundleHeader = json.loads(bundle_ptr.readline())
+
+    if bundleHeader.get("bundleVersion") != BUNDLEVERSION:
+        bundle_ptr.close()
+        raise ValueError("Unsupported API response bundle version in %s" %bundleFile)
+
+    try:
+        for line in bundle_ptr:
+            recordedCall = json.loads(line)
+            recordedResponses[recordedCall["callKey"]] = recordedCall["response"]
+    except (EOFError, ValueError):
+        # A run that stopped before closing the bundle still leaves every complete record usable
+        logger.warning("API response bundle %s is truncated - using the %s complete responses" %(bundleFile, len(recordedResponses)))
+
+    bundle_ptr.close()
+    logger.info("Loaded %s recorded API responses" %len(recordedResponses))
+
+    return bundleHeader, recordedResponses
+
+#-------------------------------------------------------------------#
+def create_recording_function(module, functionName, baseURL, authToken):
+    apiFunction = getattr(module, functionName)
+
+    def recording_function(*args):
+        response = apiFunction(*args)
+        callKey = create_call_key(functionName, args, baseURL, authToken)
+
+        with bundleState["lock"]:
+            if callKey not in bundleState["recordedCalls"] and "bundle_ptr" in bundleState:
+                bundleState["recordedCalls"].add(callKey)
+                bundleState["bundle_ptr"].write(json.dumps({"callKey" : callKey, "response" : response}) + "\n")
+
+        return response
+
+    return recording_function
+
+#-------------------------------------------------------------------#
+def create_replay_function(functionName, recordedResponses, baseURL, authToken):
+
+    def replay_function(*args):
+        callKey = create_call_key(functionName, args, baseURL, authToken)
+
+        if callKey not in recordedResponses:
+            logger.error("No recorded API response for %s" %callKey)
+            raise KeyError("No recorded API response for %s" %callKey)
+
+        return recordedResponses[callKey]
+
+    return replay_function
+
+#-------------------------------------------------------------------#
+def create_call_key(functionName, args, baseURL, authToken):
+    # The server and token are not part of the key so a bundle can be replayed anywhere
+    callArguments = [str(arg) for arg in args if arg is not None and arg != baseURL and arg != authToken]
+
+    return functionName + "(" + ", ".join(callArguments) + ")"
+
+#-------------------------------------------------------------------#
+def wrap_api_function(module, functionName, wrapperFunction):
+
+    if (module, functionName) not in originalFunctions:
+        originalFunctions[(module, functionName)] = getattr(module, functionName)
+
+    setattr(module, functionName, wrapperFunction)
+
+#-------------------------------------------------------------------#
+def restore_api_functions():
+
+    for (module, functionName), apiFunction in originalFunctions.items():
+        setattr(module, functionName, apiFunction)
+
+    originalFunctions.clear()
+
+#-------------------------------------------------------------------#
+def is_active():
+    # True while the API helpers are being recorded or replayed
+    return len(originalFunctions) > 0
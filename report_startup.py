@@ -0,0 +1,88 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_startup.py
+'''
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import common.api.system.release
+import common.application_details
+import common.project_heirarchy
+import report_cache
+import report_data
+import report_replay
+
+logger = logging.getLogger(__name__)
+
+STARTUPWORKERS = 4  # One for each of the independent requests made before any data is collected
+
+#-------------------------------------------------------------------#
+def collect_startup_details(baseURL, projectID, authToken, reportOptions):
+    # The release, the application details, the project hierarchy and the top level
+    # project's own details do not depend on each other so they are requested at the
+    # same time.  The details of each child project are requested as soon as the
+    # hierarchy has been received, while the other requests may still be in flight
+
+    startupDetails = {}
+
+    # The project summaries are only needed to check for a cached report, which is never
+    # used when recording or replaying, and are not part of a recorded bundle
+    includeInformation = not report_replay.is_active()
+
+    with ThreadPoolExecutor(max_workers=STARTUPWORKERS) as executor:
+        releaseDetails = executor.submit(common.api.system.release.get_release_details, baseURL, authToken)
+
+        # Nothing else is needed if the report will only describe the invalid options
+        if "errorMsg" not in reportOptions:
+            applicationDetails = executor.submit(common.application_details.determine_application_details, projectID, baseURL, authToken)
+            projectList = executor.submit(common.project_heirarchy.create_project_heirarchy, baseURL, authToken, projectID, reportOptions["includeChildProjects"])
+
+            # The top level project is known before the hierarchy so its inventory is collected while the children are found
+            projectDetails = {}
+            projectDetails[str(projectID)] = executor.submit(get_project_details, baseURL, projectID, authToken, reportOptions, includeInformation)
+
+            for project in projectList.result():
+                if str(project["projectID"]) not in projectDetails:
+                    projectDetails[str(project["projectID"])] = executor.submit(get_project_details, baseURL, project["projectID"], authToken, reportOptions, includeInformation)
+
+            startupDetails["applicationDetails"] = applicationDetails.result()
+            startupDetails["projectList"] = projectList.result()
+            startupDetails["projectInventories"] = {}
+
+            if includeInformation:
+                startupDetails["projectInformation"] = {}
+
+            # Keyed by the project IDs as the hierarchy gives them, like the rest of the report data
+            for project in startupDetails["projectList"]:
+                projectInformation, projectInventory = projectDetails[str(project["projectID"])].result()
+                startupDetails["projectInventories"][project["projectID"]] = projectInventory
+
+                # A summary that could not be collected is requested again by the freshness check
+                if projectInformation is not None:
+                    startupDetails["projectInformation"][project["projectID"]] = projectInformation
+
+        startupDetails["releaseDetails"] = releaseDetails.result()
+
+    logger.info("Collected the startup details for project %s" %projectID)
+
+    return startupDetails
+
+#-------------------------------------------------------------------#
+def get_project_details(baseURL, projectID, authToken, reportOptions, includeInformation):
+
+    projectInventory = report_data.get_project_inventory(baseURL, projectID, authToken, reportOptions["includeCopyrightsData"], reportOptions["includeNonRuntimeInventory"])
+
+    # The summary is only used to check for a cached report so the report goes on without it
+    projectInformation = None
+    if includeInformation:
+        try:
+            projectInformation = report_cache.get_project_information(baseURL, projectID, authToken)
+        except:
+            logger.warning("Unable to collect the project information for project %s" %projectID)
+
+    return projectInformation, projectInventory
@@ -0,0 +1,182 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_store.py
+'''
+import logging, os, json, sqlite3
+
+logger = logging.getLogger(__name__)
+
+PAGESIZE = 1000  # Rows read or written per statement
+
+#-------------------------------------------------------------------#
+class ReportStore(object):
+    # A single SQLite file holding the file level data for a report so projects
+    # larger than the available memory can still be processed. Each dict, list
+    # or set created from the store is a container id within a shared table.
+
+    def __init__(self, storeFile):
+        logger.info("Using intermediate report store: %s" %storeFile)
+
+        self.storeFile = storeFile
+        self.containerCount = 0
+
+        self.connection = sqlite3.connect(storeFile)
+        # The store only lives as long as the report so durability is not needed
+        self.connection.execute("PRAGMA journal_mode=OFF")
+        self.connection.execute("PRAGMA synchronous=OFF")
+        self.connection.execute("CREATE TABLE dict_items (dict_id INTEGER, key TEXT, value TEXT, PRIMARY KEY (dict_id, key))")
+        self.connection.execute("CREATE TABLE list_items (list_id INTEGER, position INTEGER, value TEXT, PRIMARY KEY (list_id, position))")
+        self.connection.execute("CREATE TABLE set_items (set_id INTEGER, key TEXT, PRIMARY KEY (set_id, key))")
+
+    def next_container_id(self):
+        self.containerCount += 1
+        return self.containerCount
+
+    def create_dict(self):
+        return StoreDict(self.connection, self.next_container_id())
+
+    def create_list(self):
+        return StoreList(self.connection, self.next_container_id())
+
+    def create_set(self):
+        return StoreSet(self.connection, self.next_container_id())
+
+    def close(self):
+        self.connection.close()
+
+        try:
+            os.remove(self.storeFile)
+        except OSError:
+            logger.error("Error removing %s" %self.storeFile)
+
+#-------------------------------------------------------------------#
+class StoreDict(object):
+    # The parts of the dict interface used for the file details, kept in insertion order
+
+    def __init__(self, connection, dictID):
+        self.connection = connection
+        self.dictID = dictID
+
+    def __getitem__(self, key):
+        row = self.connection.execute("SELECT value FROM dict_items WHERE dict_id = ? AND key = ?", (self.dictID, key)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __setitem__(self, key, value):
+        # Update in place so the key keeps its original position
+        value = json.dumps(value)
+        if not self.connection.execute("UPDATE dict_items SET value = ? WHERE dict_id = ? AND key = ?", (value, self.dictID, key)).rowcount:
+            self.connection.execute("INSERT INTO dict_items (dict_id, key, value) VALUES (?, ?, ?)", (self.dictID, key, value))
+
+    def __contains__(self, key):
+        return self.connection.execute("SELECT 1 FROM dict_items WHERE dict_id = ? AND key = ?", (self.dictID, key)).fetchone() is not None
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM dict_items WHERE dict_id = ?", (self.dictID,)).fetchone()[0]
+
+    def __iter__(self):
+        for key, value in self.items():
+            yield key
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key):
+        value = self[key]
+        self.connection.execute("DELETE FROM dict_items WHERE dict_id = ? AND key = ?", (self.dictID, key))
+        return value
+
+    def items(self):
+        # Read a page at a time so other containers can be written to while iterating
+        lastRowID = 0
+        while True:
+            rows = self.connection.execute("SELECT rowid, key, value FROM dict_items WHERE dict_id = ? AND rowid > ? ORDER BY rowid LIMIT ?", (self.dictID, lastRowID, PAGESIZE)).fetchall()
+            if not rows:
+                break
+            for rowID, key, value in rows:
+                yield key, json.loads(value)
+            lastRowID = rows[-1][0]
+
+    def values(self):
+        for key, value in self.items():
+            yield value
+
+    def update(self, otherDict):
+        for key, value in otherDict.items():
+            self[key] = value
+
+#-------------------------------------------------------------------#
+class StoreList(object):
+    # An append only list read back in order
+
+    def __init__(self, connection, listID):
+        self.connection = connection
+        self.listID = listID
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        # Read a page at a time so other containers can be written to while iterating
+        for position in range(0, self.length, PAGESIZE):
+            rows = self.connection.execute("SELECT value FROM list_items WHERE list_id = ? AND position >= ? AND position < ? ORDER BY position", (self.listID, position, position + PAGESIZE)).fetchall()
+            for row in rows:
+                yield json.loads(row[0])
+
+    def append(self, value):
+        self.connection.execute("INSERT INTO list_items (list_id, position, value) VALUES (?, ?, ?)", (self.listID, self.length, json.dumps(value)))
+        self.length += 1
+
+    def extend(self, values):
+        rows = []
+        for value in values:
+            rows.append((self.listID, self.length, json.dumps(value)))
+            self.length += 1
+
+            if len(rows) == PAGESIZE:
+                self.connection.executemany("INSERT INTO list_items (list_id, position, value) VALUES (?, ?, ?)", rows)
+                rows = []
+
+        self.connection.executemany("INSERT INTO list_items (list_id, position, value) VALUES (?, ?, ?)", rows)
+
+#-------------------------------------------------------------------#
+class StoreSet(object):
+
+    def __init__(self, connection, setID):
+        self.connection = connection
+        self.setID = setID
+
+    def __contains__(self, key):
+        return self.connection.execute("SELECT 1 FROM set_items WHERE set_id = ? AND key = ?", (self.setID, key)).fetchone() is not None
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM set_items WHERE set_id = ?", (self.setID,)).fetchone()[0]
+
+    def add(self, key):
+        self.connection.execute("INSERT OR IGNORE INTO set_items (set_id, key) VALUES (?, ?)", (self.setID, key))
+
+#-------------------------------------------------------------------#
+def create_dict(reportStore):
+    return {} if reportStore is None else reportStore.create_dict()
+
+#-------------------------------------------------------------------#
+def create_list(reportStore):
+    return [] if reportStore is None else reportStore.create_list()
+
+#-------------------------------------------------------------------#
+def create_set(reportStore):
+    return set() if reportStore is None else reportStore.create_set()
+
+#-------------------------------------------------------------------#
+def is_list(value):
+    return isinstance(value, (list, StoreList))
@@ -0,0 +1,214 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_stream.py
+'''
+import logging, codecs, json
+import requests
+
+import common.api.project.get_scanned_files
+import common.api.project.get_project_evidence
+import report_concurrency
+
+logger = logging.getLogger(__name__)
+
+STREAMCHUNKSIZE = 1024 * 1024  # Bytes read from the response at a time
+COMPACTSIZE = 1024 * 1024  # Parsed characters kept in the buffer before it is trimmed
+SCANNEDFILESENDPOINT = "/codeinsight/api/projects/%s/allscannedfiles?includeMD5Hash=true&includeSHA1Hash=true"
+EVIDENCEENDPOINT = "/codeinsight/api/projects/%s/evidence"
+SCANNEDFILEFIELDS = ["fileId", "filePath", "inInventory", "remote", "fileMD5", "fileSHA1"]
+EVIDENCEFIELDS = ["scannedFileId", "remote", "copyRightMatches", "licenseMatches"]
+
+# The common helpers the streamed requests above stand in for, as they were before anything replaced them
+originalHelpers = {}
+originalHelpers[(common.api.project.get_scanned_files, "get_scanned_files_details_with_MD5_and_SHA1")] = common.api.project.get_scanned_files.get_scanned_files_details_with_MD5_and_SHA1
+originalHelpers[(common.api.project.get_project_evidence, "get_project_evidence")] = common.api.project.get_project_evidence.get_project_evidence
+
+#-------------------------------------------------------------------#
+def get_scanned_files(baseURL, projectID, authToken):
+
+    helper = (common.api.project.get_scanned_files, "get_scanned_files_details_with_MD5_and_SHA1")
+    fallback_function = lambda: getattr(*helper)(baseURL, projectID, authToken)
+
+    return stream_api_records(baseURL + SCANNEDFILESENDPOINT %projectID, authToken, SCANNEDFILEFIELDS, "fileId", helper, fallback_function)
+
+#-------------------------------------------------------------------#
+def get_project_evidence(baseURL, projectID, authToken):
+
+    helper = (common.api.project.get_project_evidence, "get_project_evidence")
+    fallback_function = lambda: getattr(*helper)(baseURL, projectID, authToken)["data"]
+
+    return stream_api_records(baseURL + EVIDENCEENDPOINT %projectID, authToken, EVIDENCEFIELDS, "scannedFileId", helper, fallback_function)
+
+#-------------------------------------------------------------------#
+def stream_api_records(RESTAPI_URL, authToken, requiredFields, idField, helper, fallback_function):
+    # Yield the records of a large response as they arrive rather than parsing
+    # the whole response first.  If the streamed request fails the common helper
+    # is used instead, skipping any records that were already returned
+
+    streamedRecordKeys = set()
+
+    # Recording and replaying replace the helper, so once it has been replaced the
+    # replacement is used rather than requesting the same data directly
+    if getattr(*helper) is originalHelpers[helper]:
+        logger.debug("    Streaming RESTAPI_URL: %s" %RESTAPI_URL)
+        headers = {"Authorization": "Bearer " + authToken, "Accept": "application/json"}
+
+        try:
+            response = report_concurrency.get_session().get(RESTAPI_URL, headers=headers, stream=True)
+
+            try:
+                if response.status_code != 200:
+                    raise ValueError("Response status %s" %response.status_code)
+
+                for record in parse_json_records(response.iter_content(STREAMCHUNKSIZE)):
+                    # Make sure the response has the expected shape before handing out any records
+                    if not streamedRecordKeys and any(field not in record for field in requiredFields):
+                        raise ValueError("Response records do not contain the expected fields")
+
+                    streamedRecordKeys.add(get_record_key(record, idField))
+                    yield record
+            finally:
+                response.close()
+
+            logger.info("    Streamed %s records" %len(streamedRecordKeys))
+            return
+
+        except (requests.exceptions.RequestException, ValueError) as error:
+            logger.warning("    Unable to stream %s after %s records: %s - using the standard request" %(RESTAPI_URL, len(streamedRecordKeys), error))
+
+    # The standard response may not list the records in the same order so it is read
+    # from the start and the records already returned are recognized by their ID
+    for record in fallback_function():
+        if get_record_key(record, idField) not in streamedRecordKeys:
+            yield record
+
+#-------------------------------------------------------------------#
+def get_record_key(record, idField):
+
+    # A local and a remote file can have the same ID.  An integer key keeps the set of
+    # streamed records small for projects with millions of files
+    return int(record[idField]) * 2 + (1 if str(record["remote"]).lower() == "true" else 0)
+
+#-------------------------------------------------------------------#
+def parse_json_records(chunks, arrayKey="data"):
+    # Incrementally parse either a JSON array or an object holding the array under
+    # arrayKey, yielding one element at a time.  Only the element being parsed is
+    # held in memory along with the unparsed part of the current chunk
+
+    parser = JSONRecordParser(chunks)
+
+    startCharacter = parser.next_character()
+    if startCharacter == "{":
+        parser.position += 1
+        parser.find_array(arrayKey)
+    elif startCharacter != "[":
+        raise ValueError("Response is not a JSON array or object")
+
+    parser.position += 1  # Past the [
+
+    if parser.next_character() == "]":
+        parser.read_to_end()
+        return
+
+    while True:
+        yield parser.decode_value()
+
+        separator = parser.next_character()
+        parser.position += 1
+        if separator == "]":
+            parser.read_to_end()
+            return
+        if separator != ",":
+            raise ValueError("Expected , or ] at position %s of the response" %parser.position)
+
+#-------------------------------------------------------------------#
+class JSONRecordParser(object):
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.utf8Decoder = codecs.getincrementaldecoder("utf-8")()
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.exhausted = False
+
+    def read_chunk(self):
+        # Returns False once the response has been completely read
+        if self.exhausted:
+            return False
+
+        # Drop what has already been parsed so the buffer stays small
+        if self.position >= COMPACTSIZE:
+            self.buffer = self.buffer[self.position:]
+            self.position = 0
+
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.buffer += self.utf8Decoder.decode(b"", final=True)
+            self.exhausted = True
+        else:
+            self.buffer += self.utf8Decoder.decode(chunk)
+
+        return True
+
+    def read_to_end(self):
+        # Receive whatever follows the array so the complete response is read
+        # (and can be cached) rather than being cut off when the connection closes
+        while self.read_chunk():
+            self.buffer = ""
+            self.position = 0
+
+    def next_character(self):
+        # Skip whitespace and return the next character without consuming it
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in " \t\r\n":
+                self.position += 1
+
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+
+            if not self.read_chunk():
+                raise ValueError("Unexpected end of response")
+
+    def decode_value(self):
+        self.next_character()
+
+        while True:
+            try:
+                value, endPosition = self.decoder.raw_decode(self.buffer, self.position)
+
+                # A number at the end of the buffer may continue in the next chunk
+                if endPosition < len(self.buffer) or self.exhausted:
+                    self.position = endPosition
+                    return value
+            except json.JSONDecodeError:
+                if self.exhausted:
+                    raise
+
+            self.read_chunk()
+
+    def find_array(self, arrayKey):
+        # Skip the members of the object before the array
+        while True:
+            if self.next_character() != "\"":
+                raise ValueError("Response does not contain a %s array" %arrayKey)
+
+            key = self.decode_value()
+
+            if self.next_character() != ":":
+                raise ValueError("Expected : at position %s of the response" %self.position)
+            self.position += 1
+
+            if key == arrayKey and self.next_character() == "[":
+                return
+
+            self.decode_value()
+
+            if self.next_character() != ",":
+                raise ValueError("Response does not contain a %s array" %arrayKey)
+            self.position += 1
@@ -0,0 +1,124 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : report_upload.py
+'''
+import logging, os, time, uuid
+import requests
+
+import report_concurrency
+
+logger = logging.getLogger(__name__)
+
+UPLOADCHUNKSIZE = 1024 * 1024
+MAXRETRIES = 3
+RETRYDELAY = 5  # Seconds, doubled after each failed attempt
+
+#-------------------------------------------------------------------#
+def upload_project_report_data(baseURL, projectID, reportID, authToken, uploadZipfile):
+    logger.info("Entering upload_project_report_data")
+
+    apiOptions = "/codeinsight/api/projects/%s/reports/%s/data" %(projectID, reportID)
+    RESTAPI_URL = baseURL + apiOptions
+    logger.debug("    RESTAPI_URL: %s" %RESTAPI_URL)
+
+    boundary = uuid.uuid4().hex
+    headers = {"Authorization": "Bearer " + authToken, "Content-Type": "multipart/form-data; boundary=%s" %boundary}
+    retryDelay = RETRYDELAY
+
+    for attempt in range(1, MAXRETRIES + 1):
+
+        # The archive is read from disk in chunks so memory use does not depend on its size.
+        # The server only accepts the archive as a single request so a retry starts over
+        uploadStream = MultipartFileStream(uploadZipfile, boundary)
+
+        try:
+            response = report_concurrency.get_session().post(RESTAPI_URL, headers=headers, data=uploadStream)
+        except requests.exceptions.RequestException as error:
+            logger.warning("    Upload attempt %s of %s failed: %s" %(attempt, MAXRETRIES, error))
+            response = None
+        finally:
+            uploadStream.close()
+
+        if response is not None:
+            if response.status_code in [200, 201, 204]:
+                logger.info("    Report data uploaded for report %s" %reportID)
+                return
+
+            logger.warning("    Upload attempt %s of %s failed with status %s: %s" %(attempt, MAXRETRIES, response.status_code, response.text))
+
+            if response.status_code < 500:
+                break  # The request itself was rejected so sending it again will not help
+
+        if attempt < MAXRETRIES:
+            print("        Upload failed - retrying in %s seconds" %retryDelay)
+            time.sleep(retryDelay)
+            retryDelay *= 2
+
+    # The common upload reads the whole archive into memory so it is not used as a fallback
+    logger.error("    Unable to upload the report data for report %s after %s attempt(s)" %(reportID, attempt))
+    print("    *** ERROR  ***  Unable to upload the report to Code Insight")
+    raise RuntimeError("Unable to upload %s to report %s of project %s" %(os.path.basename(uploadZipfile), reportID, projectID))
+
+#-------------------------------------------------------------------#
+class MultipartFileStream(object):
+    # A multipart/form-data body with the archive as the "file" field that is read on demand
+
+    def __init__(self, uploadZipfile, boundary):
+        fileName = os.path.basename(uploadZipfile)
+
+        self.header = ("--%s\r\nContent-Disposition: form-data; name=\"file\"; filename=\"%s\"\r\nContent-Type: application/zip\r\n\r\n" %(boundary, fileName)).encode("utf-8")
+        self.footer = ("\r\n--%s--\r\n" %boundary).encode("utf-8")
+        self.fileSize = os.path.getsize(uploadZipfile)
+        self.file_ptr = open(uploadZipfile, "rb")
+
+        self.bytesSent = 0
+        self.nextProgress = 10
+
+    def __len__(self):
+        return len(self.header) + self.fileSize + len(self.footer)
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(UPLOADCHUNKSIZE)
+            if not chunk:
+                break
+            yield chunk
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self)
+
+        chunk = b""
+        position = self.bytesSent
+
+        if position < len(self.header):
+            chunk += self.header[position:position + size]
+
+        if len(chunk) < size and position + len(chunk) < len(self.header) + self.fileSize:
+            chunk += self.file_ptr.read(size - len(chunk))
+
+        if len(chunk) < size:
+            footerPosition = position + len(chunk) - len(self.header) - self.fileSize
+            if footerPosition >= 0:
+                chunk += self.footer[footerPosition:footerPosition + size - len(chunk)]
+
+        self.bytesSent += len(chunk)
+        self.report_progress()
+
+        return chunk
+
+    def report_progress(self):
+        percentSent = self.bytesSent * 100 // len(self)
+
+        if percentSent >= self.nextProgress:
+            logger.info("        Uploaded %s%% (%s of %s bytes)" %(percentSent, self.bytesSent, len(self)))
+            print("        Uploaded %s%%" %percentSent)
+            self.nextProgress = (percentSent // 10 + 1) * 10
+
+    def close(self):
+        self.file_ptr.close()
@@ -0,0 +1,165 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : conftest.py
+
+Stand-ins for the Code Insight API helpers of the common submodule so the
+report modules can be exercised without a server
+'''
+import sys, os, types
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+LICENSES = ["MIT", "Apache-2.0", "GPL-2.0-only", "Acme Commercial License (v2)", "Public Domain", "BSD-3-Clause"]
+
+# The size of the project returned by the helpers below.  Any of the sizes can be
+# changed for a single project through projectSizes
+fakeProject = {"inventoryItems" : 50, "filesPerItem" : 3, "unassociatedFiles" : 50, "childProjects" : 0, "sharedFilePaths" : False, "projectSizes" : {}}
+
+#----------------------------------------------------------------------#
+def get_project_list(baseURL, authToken, projectID, includeChildProjects):
+
+    projectList = [{"projectID" : str(projectID), "projectName" : "Project %s" %projectID}]
+
+    if includeChildProjects:
+        for childIndex in range(fakeProject["childProjects"]):
+            childProjectID = str(int(projectID) * 100 + childIndex + 1)
+            projectList.append({"projectID" : childProjectID, "projectName" : "Project %s" %childProjectID})
+
+    return projectList
+
+#----------------------------------------------------------------------#
+def get_inventory(baseURL, projectID, authToken, includeCopyrights=True):
+
+    inventoryItems = []
+    filesPerItem = get_size(projectID, "filesPerItem")
+
+    for itemIndex in range(get_size(projectID, "inventoryItems")):
+        inventoryItem = {}
+        inventoryItem["id"] = int(projectID) * 1000000 + itemIndex
+        inventoryItem["type"] = "License Only" if itemIndex % 10 == 0 else "Component"
+        inventoryItem["name"] = "component-%s (%s)" %(itemIndex, LICENSES[itemIndex % len(LICENSES)])
+        inventoryItem["componentId"] = itemIndex
+        inventoryItem["componentName"] = "component-%s" %itemIndex
+        inventoryItem["componentVersionName"] = "1.%s" %itemIndex
+        inventoryItem["componentForgeName"] = "npm"
+        inventoryItem["componentUrl"] = "https://example.com/component-%s" %itemIndex
+        inventoryItem["purl"] = "pkg:npm/component-%s@1.%s" %(itemIndex, itemIndex)
+        inventoryItem["customFields"] = [{"fieldLabel" : "Package Supplier", "value" : ""}]
+        inventoryItem["possibleLicenses"] = [{"licenseSPDXIdentifier" : LICENSES[itemIndex % len(LICENSES)]}]
+        inventoryItem["selectedLicenseSPDXIdentifier"] = LICENSES[itemIndex % len(LICENSES)]
+        inventoryItem["selectedLicenseName"] = LICENSES[itemIndex % len(LICENSES)]
+        inventoryItem["filePaths"] = [get_file_path(projectID, fileIndex) for fileIndex in range(itemIndex * filesPerItem, (itemIndex + 1) * filesPerItem)]
+        inventoryItem["dependencyScope"] = "Runtime"
+        if includeCopyrights:
+            inventoryItem["copyrights"] = ["Copyright (c) %s Example Corp" %(2000 + itemIndex % 20)]
+
+        inventoryItems.append(inventoryItem)
+
+    return {"inventoryItems" : inventoryItems}
+
+#----------------------------------------------------------------------#
+def get_scanned_files(baseURL, projectID, authToken):
+
+    scannedFiles = []
+    associatedFileCount = get_size(projectID, "inventoryItems") * get_size(projectID, "filesPerItem")
+
+    for fileIndex in range(associatedFileCount + get_size(projectID, "unassociatedFiles")):
+        scannedFile = {}
+        scannedFile["fileId"] = get_file_id(projectID, fileIndex)
+        scannedFile["filePath"] = get_file_path(projectID, fileIndex)
+        scannedFile["inInventory"] = "true" if fileIndex < associatedFileCount else "false"
+        scannedFile["remote"] = "false"
+        scannedFile["fileMD5"] = "%032x" %fileIndex
+        scannedFile["fileSHA1"] = "%040x" %fileIndex
+        scannedFiles.append(scannedFile)
+
+    return scannedFiles
+
+#----------------------------------------------------------------------#
+def get_evidence(baseURL, projectID, authToken):
+
+    evidence = []
+    fileCount = get_size(projectID, "inventoryItems") * get_size(projectID, "filesPerItem") + get_size(projectID, "unassociatedFiles")
+
+    for fileIndex in range(fileCount):
+        fileEvidence = {}
+        fileEvidence["scannedFileId"] = get_file_id(projectID, fileIndex)
+        fileEvidence["remote"] = False
+        fileEvidence["copyRightMatches"] = ["Copyright (c) %s Example Corp" %(2000 + fileIndex % 20)]
+        fileEvidence["licenseMatches"] = [LICENSES[fileIndex % len(LICENSES)]]
+        evidence.append(fileEvidence)
+
+    return {"data" : evidence}
+
+#----------------------------------------------------------------------#
+def stream_scanned_files(baseURL, projectID, authToken):
+    yield from get_scanned_files(baseURL, projectID, authToken)
+
+#----------------------------------------------------------------------#
+def stream_project_evidence(baseURL, projectID, authToken):
+    yield from get_evidence(baseURL, projectID, authToken)["data"]
+
+#----------------------------------------------------------------------#
+def get_file_id(projectID, fileIndex):
+    return int(projectID) * 10000000 + fileIndex
+
+#----------------------------------------------------------------------#
+def get_file_path(projectID, fileIndex):
+
+    # Shared paths have the same content in every project since the hashes come from the index
+    if fakeProject["sharedFilePaths"]:
+        return "src/directory-%s/file-%s.c" %(fileIndex // 100, fileIndex)
+
+    return "project-%s/src/directory-%s/file-%s.c" %(projectID, fileIndex // 100, fileIndex)
+
+#----------------------------------------------------------------------#
+def get_size(projectID, sizeName):
+    return fakeProject["projectSizes"].get(str(projectID), {}).get(sizeName, fakeProject[sizeName])
+
+#----------------------------------------------------------------------#
+def install_module(moduleName, **functions):
+
+    module = types.ModuleType(moduleName)
+    module.__dict__.update(functions)
+    sys.modules[moduleName] = module
+
+    # Make the module reachable as an attribute of its package as an import would
+    if "." in moduleName:
+        packageName, attributeName = moduleName.rsplit(".", 1)
+        setattr(sys.modules[packageName], attributeName, module)
+
+    return module
+
+#----------------------------------------------------------------------#
+for packageName in ["common", "common.api", "common.api.project", "common.api.system", "common.api.component"]:
+    install_module(packageName).__path__ = []
+
+install_module("common.application_details", determine_application_details=lambda projectID, baseURL, authToken: {"applicationDocumentString" : "Project %s" %projectID, "applicationPublisher" : "Example Corp"})
+install_module("common.project_heirarchy", create_project_heirarchy=get_project_list)
+install_module("common.report_archive", create_report_zipfile=lambda reportOutputs, reportFileNameBase: None)
+install_module("common.api.system.release", get_release_details=lambda baseURL, authToken: {"fnci.release.name" : "2024 R3"})
+install_module("common.api.project.get_project_inventory",
+    get_project_inventory_details_with_copyrights=lambda baseURL, projectID, authToken: get_inventory(baseURL, projectID, authToken, True),
+    get_project_inventory_details_without_vulnerabilities=lambda baseURL, projectID, authToken: get_inventory(baseURL, projectID, authToken, False))
+install_module("common.api.project.get_project_information", get_project_information_summary=lambda baseURL, projectID, authToken: {"projectId" : projectID, "lastScanDate" : "2026-01-01"})
+install_module("common.api.project.get_scanned_files", get_scanned_files_details_with_MD5_and_SHA1=get_scanned_files)
+install_module("common.api.project.get_project_evidence", get_project_evidence=get_evidence)
+install_module("common.api.project.upload_reports", upload_project_report_data=lambda baseURL, projectID, reportID, authToken, uploadZipfile: None)
+install_module("common.api.component.get_component_details", get_component_details_v3_summary=lambda baseURL, componentId, authToken: {"data" : {"title" : "component - title"}})
+
+#----------------------------------------------------------------------#
+@pytest.fixture
+def fake_streams(monkeypatch):
+    # The streamed scanned file and evidence responses come from the helpers above
+    # rather than from a server
+    import report_stream
+
+    monkeypatch.setattr(report_stream, "get_scanned_files", stream_scanned_files)
+    monkeypatch.setattr(report_stream, "get_project_evidence", stream_project_evidence)
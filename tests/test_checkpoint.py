@@ -0,0 +1,76 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : test_checkpoint.py
+
+Make sure a failed report resumes with the projects it had already processed
+'''
+import logging, os, shutil
+
+import pytest
+
+import conftest
+import report_cache
+import report_data
+
+BASEURL = "https://codeinsight.example.com"  # Never contacted since every request is stubbed
+
+#----------------------------------------------------------------------#
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch, fake_streams):
+    monkeypatch.setattr(report_cache, "cacheDirectory", str(tmp_path))
+    monkeypatch.setitem(conftest.fakeProject, "childProjects", 2)
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+#----------------------------------------------------------------------#
+def create_report_data():
+
+    reportOptions = {}
+    reportOptions["includeChildProjects"] = True
+    reportOptions["includeNonRuntimeInventory"] = False
+    reportOptions["includeFileDetails"] = True
+    reportOptions["includeUnassociatedFiles"] = True
+    reportOptions["createOtherFilesPackage"] = False
+    reportOptions["includeCopyrightsData"] = True
+
+    reportData = {"reportOptions" : reportOptions, "releaseVersion" : "2024R3", "spdxTimeStamp" : "2026-10-19T00:00:00Z", "projectID" : "1", "reportVersion" : "test"}
+    reportData["projectList"] = conftest.get_project_list(BASEURL, "token", "1", True)
+
+    freshnessKey = report_cache.create_freshness_key(BASEURL, "token", reportData)
+    reportData["checkpointDirectory"] = report_cache.start_checkpoint("request", freshnessKey)
+
+    return reportData
+
+#----------------------------------------------------------------------#
+def test_failed_report_resumes_from_checkpoint(monkeypatch):
+
+    gatheredProjectIDs = []
+    gather_project_data = report_data.gather_project_data
+
+    def fail_for_last_project(baseURL, authToken, projectID, reportData):
+        gatheredProjectIDs.append(projectID)
+        if projectID == "102" and gatheredProjectIDs.count("102") == 1:
+            raise RuntimeError("Unable to collect the project data")
+        return gather_project_data(baseURL, authToken, projectID, reportData)
+
+    monkeypatch.setattr(report_data, "gather_project_data", fail_for_last_project)
+
+    with pytest.raises(RuntimeError):
+        report_data.gather_data_for_report(BASEURL, "1", "token", create_report_data())
+
+    # Another report may replace the shared copy of the processed data in the meantime
+    shutil.rmtree(os.path.join(report_cache.cacheDirectory, "projects"))
+
+    reportDetails = report_data.gather_data_for_report(BASEURL, "1", "token", create_report_data())["reportDetails"]
+
+    # Only the project that failed is collected again and nothing is missing from the report.
+    # Each project has 50 items with 3 files each and 50 files not in inventory
+    assert gatheredProjectIDs == ["1", "101", "102", "102"]
+    assert len(reportDetails["packages"]) == 3 * 50 + 1
+    assert len(set(fileDetails["SPDXID"] for fileDetails in reportDetails["files"])) == len(reportDetails["files"]) == 3 * (50 * 3 + 50)
@@ -0,0 +1,94 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : test_concurrency.py
+
+Make sure the requests the common helpers make are limited by the concurrency controller
+'''
+import logging, sys, threading, time, types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import report_concurrency
+
+#----------------------------------------------------------------------#
+class BusyServerHandler(BaseHTTPRequestHandler):
+    # Answers /busy with a 429 and a Retry-After and anything else with a small JSON body
+
+    def do_GET(self):
+        if self.path == "/busy":
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = b'{"data" : []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+#----------------------------------------------------------------------#
+@pytest.fixture
+def server():
+    httpServer = ThreadingHTTPServer(("127.0.0.1", 0), BusyServerHandler)
+    threading.Thread(target=httpServer.serve_forever, daemon=True).start()
+    yield "http://127.0.0.1:%s" %httpServer.server_address[1]
+    httpServer.shutdown()
+    httpServer.server_close()
+
+#----------------------------------------------------------------------#
+@pytest.fixture
+def helper_module(monkeypatch):
+    # A common helper that uses requests directly as the real ones do
+    logging.disable(logging.CRITICAL)
+    monkeypatch.setattr(report_concurrency, "controllers", {})
+    monkeypatch.setattr(report_concurrency, "controllerSettings", dict(report_concurrency.controllerSettings))
+    monkeypatch.setattr(report_concurrency, "sessionState", {})
+
+    helperModule = types.ModuleType("common.api.project.get_test_data")
+    helperModule.requests = requests
+    helperModule.get_test_data = lambda baseURL, endpoint: helperModule.requests.get(baseURL + endpoint, headers={"Accept" : "application/json"})
+    monkeypatch.setitem(sys.modules, helperModule.__name__, helperModule)
+
+    report_concurrency.install_adaptive_concurrency(4)
+
+    yield helperModule
+    logging.disable(logging.NOTSET)
+
+#----------------------------------------------------------------------#
+def test_helper_requests_use_the_report_session(server, helper_module):
+
+    assert isinstance(helper_module.requests, report_concurrency.SessionRequests)
+    assert helper_module.requests.exceptions is requests.exceptions
+
+    response = helper_module.get_test_data(server, "/codeinsight/api/projects/1/inventory")
+    controller = report_concurrency.get_controller(server)
+
+    assert response.json() == {"data" : []}
+    assert controller.inFlight == 0
+    assert "/codeinsight/api/projects/1/inventory" in controller.baselineLatencies
+
+#----------------------------------------------------------------------#
+def test_helper_requests_back_off_when_the_server_is_busy(server, helper_module):
+
+    controller = report_concurrency.get_controller(server)
+    controller.limit = 4
+
+    response = helper_module.get_test_data(server, "/busy")
+
+    assert response.status_code == 429
+    assert controller.inFlight == 0
+    assert controller.limit == 2
+    assert controller.pausedUntil > time.monotonic()
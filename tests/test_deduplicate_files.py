@@ -0,0 +1,70 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : test_deduplicate_files.py
+
+Make sure a file included by content is only listed once in the report
+'''
+import logging, hashlib
+
+import pytest
+
+import conftest
+import report_cache
+import report_data
+
+BASEURL = "https://codeinsight.example.com"  # Never contacted since every request is stubbed
+
+#----------------------------------------------------------------------#
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch, fake_streams):
+    monkeypatch.setattr(report_cache, "cacheDirectory", str(tmp_path))
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+#----------------------------------------------------------------------#
+def create_report_data(useHasFiles):
+
+    reportOptions = {}
+    reportOptions["includeChildProjects"] = True
+    reportOptions["includeNonRuntimeInventory"] = False
+    reportOptions["includeFileDetails"] = True
+    reportOptions["includeUnassociatedFiles"] = True
+    reportOptions["createOtherFilesPackage"] = True
+    reportOptions["includeCopyrightsData"] = True
+    reportOptions["deduplicateFiles"] = True
+    reportOptions["useHasFiles"] = useHasFiles
+
+    return {"reportOptions" : reportOptions, "releaseVersion" : "2024R3", "spdxTimeStamp" : "2026-10-19T00:00:00Z", "projectID" : "1", "reportVersion" : "test"}
+
+#----------------------------------------------------------------------#
+@pytest.mark.parametrize("useHasFiles", [False, True])
+def test_shared_file_associated_in_one_project_only(monkeypatch, useHasFiles):
+
+    # Both projects have the same 15 files.  The first 9 are associated to inventory
+    # in the parent but only the first 6 are in the child
+    monkeypatch.setitem(conftest.fakeProject, "childProjects", 1)
+    monkeypatch.setitem(conftest.fakeProject, "sharedFilePaths", True)
+    monkeypatch.setitem(conftest.fakeProject, "projectSizes", {"1" : {"inventoryItems" : 3, "unassociatedFiles" : 6}, "101" : {"inventoryItems" : 2, "unassociatedFiles" : 9}})
+
+    reportDetails = report_data.gather_data_for_report(BASEURL, "1", "token", create_report_data(useHasFiles))["reportDetails"]
+
+    fileSPDXIDs = [fileDetail["SPDXID"] for fileDetail in reportDetails["files"]]
+    assert len(fileSPDXIDs) == len(set(fileSPDXIDs)) == 15
+
+    # Only the files associated in neither project belong to the unassociated files package
+    otherFilesPackage = [packageDetails for packageDetails in reportDetails["packages"] if packageDetails["SPDXID"] == "SPDXRef-Pkg-OtherFiles"][0]
+    if useHasFiles:
+        otherFileSPDXIDs = otherFilesPackage["hasFiles"]
+    else:
+        otherFileSPDXIDs = [relationship["relatedSpdxElement"] for relationship in reportDetails["relationships"] if relationship["spdxElementId"] == "SPDXRef-Pkg-OtherFiles"]
+
+    otherFileHashes = sorted("%040x" %fileIndex for fileIndex in range(9, 15))
+    assert len(otherFileSPDXIDs) == 6
+    assert all(fileSPDXID.split("-")[2] in otherFileHashes for fileSPDXID in otherFileSPDXIDs)
+    assert otherFilesPackage["packageVerificationCode"]["packageVerificationCodeValue"] == hashlib.sha1("".join(otherFileHashes).encode("utf-8")).hexdigest()
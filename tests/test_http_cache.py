@@ -0,0 +1,136 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : test_http_cache.py
+
+Make sure API responses are reused from the cache only when they can be
+'''
+import logging, sys, json, hashlib, threading, types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import report_concurrency
+import report_http_cache
+
+ITEMCOUNT = 20000  # Records in each response so the body is read from the cache in several chunks
+
+#----------------------------------------------------------------------#
+class APIServerHandler(BaseHTTPRequestHandler):
+    # Paths containing "etag" are answered with an ETag and a 304 once it is sent back.
+    # Everything else has no validators
+    protocol_version = "HTTP/1.1"
+    fullResponses = []
+
+    def do_GET(self):
+        body = json.dumps({"data" : [{"path" : self.path, "index" : index} for index in range(ITEMCOUNT)]}).encode("utf-8")
+        etag = '"%s"' %hashlib.md5(body).hexdigest()
+
+        if "etag" in self.path and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.fullResponses.append(self.path)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if "etag" in self.path:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+#----------------------------------------------------------------------#
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(APIServerHandler, "fullResponses", [])
+    httpServer = ThreadingHTTPServer(("127.0.0.1", 0), APIServerHandler)
+    threading.Thread(target=httpServer.serve_forever, daemon=True).start()
+    yield "http://127.0.0.1:%s" %httpServer.server_address[1]
+    httpServer.shutdown()
+    httpServer.server_close()
+
+#----------------------------------------------------------------------#
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    logging.disable(logging.CRITICAL)
+    monkeypatch.setattr(report_concurrency, "controllers", {})
+    monkeypatch.setattr(report_concurrency, "controllerSettings", dict(report_concurrency.controllerSettings))
+    monkeypatch.setattr(report_concurrency, "sessionState", {})
+    monkeypatch.setattr(report_http_cache, "cacheState", {})
+    monkeypatch.setattr(report_http_cache, "cacheStatistics", dict.fromkeys(report_http_cache.cacheStatistics, 0))
+
+    report_concurrency.install_adaptive_concurrency(4)
+    report_http_cache.install_http_cache(str(tmp_path), 64, 600)
+
+    yield report_concurrency.get_session()
+
+    report_concurrency.mount_adapter(None)
+    logging.disable(logging.NOTSET)
+
+#----------------------------------------------------------------------#
+def get_records(session, url):
+
+    response = session.get(url, stream=True)
+    records = json.loads(b"".join(response.iter_content(64 * 1024)))["data"]
+    response.close()
+
+    return records
+
+#----------------------------------------------------------------------#
+def test_unchanged_response_is_revalidated(server, session):
+
+    for attempt in range(2):
+        assert len(get_records(session, server + "/codeinsight/api/projects/1/etag")) == ITEMCOUNT
+
+    assert APIServerHandler.fullResponses == ["/codeinsight/api/projects/1/etag"]
+    assert report_http_cache.cacheStatistics["revalidated"] == 1
+
+#----------------------------------------------------------------------#
+def test_only_ttl_endpoints_are_reused_without_validators(server, session):
+
+    for attempt in range(2):
+        get_records(session, server + "/codeinsight/api/system/release")
+        get_records(session, server + "/codeinsight/api/project/hierarchy/1")
+
+    # The hierarchy is requested every time since children can be added at any time
+    assert APIServerHandler.fullResponses == ["/codeinsight/api/system/release", "/codeinsight/api/project/hierarchy/1", "/codeinsight/api/project/hierarchy/1"]
+    assert report_http_cache.cacheStatistics["fresh"] == 1
+
+#----------------------------------------------------------------------#
+def test_cached_body_is_read_in_chunks(server, session):
+
+    get_records(session, server + "/codeinsight/api/system/release")
+
+    response = session.get(server + "/codeinsight/api/system/release", stream=True)
+    assert isinstance(response.raw, report_http_cache.CachedBody)
+
+    chunks = list(response.iter_content(64 * 1024))
+    assert len(chunks) > 1
+    assert max(len(chunk) for chunk in chunks) == 64 * 1024
+    assert response.raw.blob is None  # Closed once it has all been read
+
+#----------------------------------------------------------------------#
+def test_helper_requests_are_cached(server, session, monkeypatch):
+
+    # A common helper that uses requests directly as the real ones do
+    helperModule = types.ModuleType("common.api.system.get_test_release")
+    helperModule.requests = requests
+    helperModule.get_release = lambda baseURL: helperModule.requests.get(baseURL + "/codeinsight/api/system/release").json()
+    monkeypatch.setitem(sys.modules, helperModule.__name__, helperModule)
+    report_concurrency.route_helper_requests()
+
+    for attempt in range(2):
+        assert len(helperModule.get_release(server)["data"]) == ITEMCOUNT
+
+    assert APIServerHandler.fullResponses == ["/codeinsight/api/system/release"]
@@ -0,0 +1,61 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : test_replay.py
+
+Make sure a replayed report gets everything it needs from the bundle
+'''
+import logging
+
+import pytest
+
+import common.api.project.get_project_information
+import conftest
+import report_replay
+import report_startup
+
+BASEURL = "http://127.0.0.1:9"
+
+#----------------------------------------------------------------------#
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+#----------------------------------------------------------------------#
+def create_report_options():
+    return {"includeChildProjects" : True, "includeNonRuntimeInventory" : False, "includeCopyrightsData" : True}
+
+#----------------------------------------------------------------------#
+def contact_server(*args):
+    raise AssertionError("The server was contacted during a replay")
+
+#----------------------------------------------------------------------#
+def test_startup_details_are_replayed(tmp_path, monkeypatch):
+
+    monkeypatch.setitem(conftest.fakeProject, "childProjects", 2)
+    bundleFile = str(tmp_path / "api_responses.jsonl.gz")
+
+    report_replay.start_recording(bundleFile, BASEURL, "token", {"projectID" : "1", "reportOptions" : "{}"})
+    recordedDetails = report_startup.collect_startup_details(BASEURL, "1", "token", create_report_options())
+    report_replay.stop_recording()
+
+    # Anything not served from the bundle would reach these
+    monkeypatch.setattr(common.api.project.get_project_information, "get_project_information_summary", contact_server)
+    for module, functionName in report_replay.APIFUNCTIONS:
+        monkeypatch.setattr(module, functionName, contact_server)
+
+    report_replay.start_replay(bundleFile, BASEURL, "token")
+    try:
+        replayedDetails = report_startup.collect_startup_details(BASEURL, "1", "token", create_report_options())
+    finally:
+        report_replay.restore_api_functions()
+
+    assert replayedDetails == recordedDetails
+    assert len(replayedDetails["projectInventories"]) == 3
+    assert "projectInformation" not in replayedDetails
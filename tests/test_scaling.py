@@ -0,0 +1,118 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : test_scaling.py
+
+Make sure the time to collect the report data grows in line with the size of
+the project rather than with its square, stage by stage
+'''
+import time
+import logging
+
+import pytest
+
+import conftest
+import report_cache
+import report_data
+import report_data_files
+
+BASEURL = "https://codeinsight.example.com"  # Never contacted since every request is stubbed
+SIZES = [250, 500, 1000]  # Inventory items in the project, each with its own files
+MAXGROWTH = 2.0  # Allowed slowdown over linear growth before the test fails
+MINSTAGETIME = 0.01  # Seconds below which a stage is too quick to time reliably
+
+# The stages of collecting the report data.  Anything not spent in these is the
+# assembly of the document in gather_data_for_report itself
+STAGES = [(report_data, "get_project_inventory"), (report_data_files, "get_scanned_file_details"), (report_data_files, "get_file_evidence"),
+          (report_data, "create_package_details"), (report_data, "manage_unassociated_files"), (report_data, "create_package_files_index")]
+
+#----------------------------------------------------------------------#
+@pytest.fixture(autouse=True)
+def quiet_logging(fake_streams):
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+#----------------------------------------------------------------------#
+def create_report_data():
+
+    reportOptions = {}
+    reportOptions["includeChildProjects"] = True
+    reportOptions["includeNonRuntimeInventory"] = False
+    reportOptions["includeFileDetails"] = True
+    reportOptions["includeUnassociatedFiles"] = True
+    reportOptions["createOtherFilesPackage"] = False
+    reportOptions["includeCopyrightsData"] = True
+
+    return {"reportOptions" : reportOptions, "releaseVersion" : "2024R3", "spdxTimeStamp" : "2026-10-19T00:00:00Z", "projectID" : "1", "reportVersion" : "test"}
+
+#----------------------------------------------------------------------#
+def time_stages(monkeypatch, stageTimes):
+
+    def create_timed_function(stageName, function):
+        def timed_function(*args, **kwargs):
+            startTime = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stageTimes[stageName] += time.perf_counter() - startTime
+
+        return timed_function
+
+    for module, functionName in STAGES:
+        stageTimes[functionName] = 0.0
+        monkeypatch.setattr(module, functionName, create_timed_function(functionName, getattr(module, functionName)))
+
+#----------------------------------------------------------------------#
+def time_report_data(inventoryItems, monkeypatch, tmp_path):
+
+    monkeypatch.setitem(conftest.fakeProject, "inventoryItems", inventoryItems)
+    monkeypatch.setitem(conftest.fakeProject, "unassociatedFiles", inventoryItems)
+    monkeypatch.setitem(conftest.fakeProject, "childProjects", 2)
+
+    # The best of a few runs for each stage so a busy machine does not fail the test
+    bestStageTimes = {}
+    for run in range(3):
+        # A new cache for each run so nothing is reused from the previous one
+        monkeypatch.setattr(report_cache, "cacheDirectory", str(tmp_path / ("%s-%s" %(inventoryItems, run))))
+
+        stageTimes = {}
+        with monkeypatch.context() as stageMonkeypatch:
+            time_stages(stageMonkeypatch, stageTimes)
+
+            startTime = time.perf_counter()
+            reportData = report_data.gather_data_for_report(BASEURL, "1", "token", create_report_data())
+            stageTimes["assembly"] = time.perf_counter() - startTime - sum(stageTimes.values())
+
+        for stageName, stageTime in stageTimes.items():
+            bestStageTimes[stageName] = min(stageTime, bestStageTimes.get(stageName, stageTime))
+
+    return bestStageTimes, reportData["reportDetails"]
+
+#----------------------------------------------------------------------#
+def test_report_data_is_complete(monkeypatch, tmp_path):
+
+    stageTimes, reportDetails = time_report_data(50, monkeypatch, tmp_path)
+
+    # 50 items in each of three projects plus the root package, and 4 files for each item
+    assert len(reportDetails["packages"]) == 151
+    assert len(reportDetails["files"]) == 3 * 50 * 4
+
+    # Every stage was reached
+    assert all(stageTime > 0 for stageTime in stageTimes.values()), stageTimes
+
+#----------------------------------------------------------------------#
+def test_report_data_scales_linearly(monkeypatch, tmp_path):
+
+    stageTimes = [time_report_data(size, monkeypatch, tmp_path)[0] for size in SIZES]
+
+    for size, sizeStageTimes in zip(SIZES[1:], stageTimes[1:]):
+        growth = size / SIZES[0]
+
+        for stageName, stageTime in sizeStageTimes.items():
+            baseTime = max(stageTimes[0][stageName], MINSTAGETIME)
+            assert stageTime < baseTime * growth * MAXGROWTH, "The %s stage took %.3fs for %s items against %.3fs for %s items" %(stageName, stageTime, size, stageTimes[0][stageName], SIZES[0])
@@ -0,0 +1,47 @@
+'''
+Copyright 2026 Flexera Software LLC
+See LICENSE.TXT for full license text
+SPDX-License-Identifier: MIT
+
+Author : agent
+Created On : Mon Oct 19 2026
+File : test_startup.py
+
+Make sure the details collected at startup do not stop a report that can go on without them
+'''
+import logging
+
+import pytest
+
+import common.api.project.get_project_information
+import conftest
+import report_startup
+
+BASEURL = "https://codeinsight.example.com"  # Never contacted since every request is stubbed
+
+#----------------------------------------------------------------------#
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+#----------------------------------------------------------------------#
+def test_missing_project_information_is_not_fatal(monkeypatch):
+
+    monkeypatch.setitem(conftest.fakeProject, "childProjects", 2)
+    get_project_information_summary = common.api.project.get_project_information.get_project_information_summary
+
+    def fail_for_child_project(baseURL, projectID, authToken):
+        if str(projectID) == "101":
+            raise RuntimeError("Unable to collect the project summary")
+        return get_project_information_summary(baseURL, projectID, authToken)
+
+    monkeypatch.setattr(common.api.project.get_project_information, "get_project_information_summary", fail_for_child_project)
+
+    reportOptions = {"includeChildProjects" : True, "includeNonRuntimeInventory" : False, "includeCopyrightsData" : True}
+    startupDetails = report_startup.collect_startup_details(BASEURL, "1", "token", reportOptions)
+
+    # Every inventory is collected and only the failed summary is missing
+    assert sorted(startupDetails["projectInventories"]) == ["1", "101", "102"]
+    assert sorted(startupDetails["projectInformation"]) == ["1", "102"]